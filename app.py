@@ -1,23 +1,44 @@
+import time
+_process_start = time.perf_counter()  # taken before any other import so the startup report covers them
+
+import argparse
+import importlib
 import os
 import ttkbootstrap as ttkb
 from ttkbootstrap.constants import *
 
-from ui.patient_page import PatientPage
-from ui.appointment_page import AppointmentPage
-from ui.billing_page import BillingPage
-from ui.dashboard_page import DashboardPage
-from ui.doctor_page import DoctorPage
-from database import Database
+from config import PROFILE_OUTPUT
+from database import get_database
+from utils.query_monitor import get_logger, query_monitor
+from utils.startup_timer import StartupTimer
 WINDOW_TITLE = "Clinic Management System"
 WINDOW_SIZE = "1000x600"
 
-# Initialize the database connection
-db = Database()
-db.initialize_schema()
+# Page modules are imported the first time their page is shown
+PAGES = {
+    "DashboardPage": "ui.dashboard_page",
+    "PatientPage": "ui.patient_page",
+    "DoctorPage": "ui.doctor_page",
+    "AppointmentPage": "ui.appointment_page",
+    "BillingPage": "ui.billing_page",
+}
+
+# Handlers timed by --profile, wrapped before a page binds them as button commands
+PROFILED_HANDLERS = {
+    "DashboardPage": ("load_summary",),
+    "PatientPage": ("load_patients", "add_patient"),
+    "DoctorPage": ("load_doctor_data", "save_doctor"),
+    "AppointmentPage": ("load_doctors_and_patients", "load_appointments", "add_appointment"),
+    "BillingPage": ("load_patients", "load_appointments", "load_billings", "add_billing"),
+}
+
+startup_timer = StartupTimer(start=_process_start)
+startup_timer.mark("imports")
 
 class ClinicApp(ttkb.Window):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__(themename="darkly")  # Options: darkly, cyborg, superhero, etc.
+        self.profiler = profiler
 
         self.title(WINDOW_TITLE)
         self.geometry(WINDOW_SIZE)
@@ -30,26 +51,22 @@ class ClinicApp(ttkb.Window):
             self.iconphoto(False, icon)
         except Exception as e:
             print(f"[ICON ERROR] Could not load window icon: {e}")
+        startup_timer.mark("window")
 
         # Container to stack all pages
-        container = ttkb.Frame(self)
-        container.pack(fill="both", expand=True)
+        self.container = ttkb.Frame(self)
+        self.container.pack(fill="both", expand=True)
 
+        # Pages are built on first show_frame() so startup only pays for the dashboard
         self.frames = {}
 
-        # Define all pages
-        for F in (DashboardPage, PatientPage, AppointmentPage, BillingPage, DoctorPage):
-            page_name = F.__name__
-            frame = F(parent=container, controller=self)
-            self.frames[page_name] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
-
         self.create_menu()
         self.show_frame("DashboardPage")
+        startup_timer.mark("dashboard page")
 
     def create_menu(self):
         menubar = ttkb.Menu(self)
-        
+
         navigation_menu = ttkb.Menu(menubar, tearoff=0)
         navigation_menu.add_command(label="Dashboard", command=lambda: self.show_frame("DashboardPage"))
         navigation_menu.add_command(label="Patients", command=lambda: self.show_frame("PatientPage"))
@@ -62,9 +79,30 @@ class ClinicApp(ttkb.Window):
         menubar.add_cascade(label="Navigation", menu=navigation_menu)
         self.config(menu=menubar)
 
+    def create_page(self, page_name):
+        """Imports and builds a page the first time it is requested."""
+        module = importlib.import_module(PAGES[page_name])
+        F = getattr(module, page_name)
+        if self.profiler is not None:
+            self.profiler.wrap(F, PROFILED_HANDLERS.get(page_name, ()))
+        frame = F(parent=self.container, controller=self)
+        self.frames[page_name] = frame
+        frame.grid(row=0, column=0, sticky="nsew")
+        return frame
+
     def show_frame(self, page_name):
         """Raise the frame with the given page name."""
-        frame = self.frames[page_name]
+        # Counts every query the page refresh issues, including its background loads
+        with query_monitor.action(f"show {page_name}"):
+            self._show_frame(page_name)
+
+    def _show_frame(self, page_name):
+        frame = self.frames.get(page_name)
+        if frame is None:
+            # A freshly built page has just loaded its data
+            frame = self.create_page(page_name)
+            frame.tkraise()
+            return
         frame.tkraise()
         # Refresh data if the page supports it
         if hasattr(frame, "load_summary"):
@@ -74,6 +112,51 @@ class ClinicApp(ttkb.Window):
         if hasattr(frame, "load_patient_data"):
             frame.load_patient_data()
 
+def report_startup():
+    startup_timer.mark("first paint")
+    print(startup_timer.report())
+
+def run_profiled(app, profiler):
+    """Runs the main loop with the watchdog on, then logs and saves the profile."""
+    watchdog = LatencyWatchdog(app)
+    watchdog.start()
+    try:
+        app.mainloop()
+    finally:
+        watchdog.stop()
+        report = "\n".join((profiler.report(), watchdog.report()))
+        print(report)
+        get_logger("clinic.ui").info(report)
+        profiler.dump(PROFILE_OUTPUT)
+        print(f"[PROFILE] cProfile data written to {PROFILE_OUTPUT}")
+
 if __name__ == "__main__":
-    app = ClinicApp()
-    app.mainloop()
+    parser = argparse.ArgumentParser(description=WINDOW_TITLE)
+    parser.add_argument("--profile", action="store_true",
+                        help="time page handlers under cProfile and log UI stalls")
+    parser.add_argument("--server", metavar="URL",
+                        help="use the clinic server at URL (see `python -m server`) instead of a local database")
+    args, _ = parser.parse_known_args()
+
+    from ui import backend
+    if args.server:
+        backend.use_server(args.server)
+
+    profiler = None
+    if args.profile:
+        from utils.profiler import LatencyWatchdog, UIProfiler
+        profiler = UIProfiler()
+        profiler.wrap(ClinicApp, ("show_frame",))
+
+    # A terminal on a clinic server never opens a database of its own
+    if not backend.is_remote():
+        get_database().initialize_schema()
+    startup_timer.mark("database")
+    app = ClinicApp(profiler)
+    # Runs once the main loop has drawn the first window
+    app.after_idle(report_startup)
+    if profiler is not None:
+        run_profiled(app, profiler)
+    else:
+        app.mainloop()
+    get_logger().info(query_monitor.report())
@@ -5,8 +5,11 @@ a = Analysis(
     ['app.py'],
     pathex=[],
     binaries=[],
-    datas=[('models', 'models'), ('services', 'services'), ('ui', 'ui'), ('dao', 'dao'), ('utils', 'utils'), ('resources', 'resources'), ('schema.sql', '.'), ('clinic.db', '.')],
-    hiddenimports=[],
+    datas=[('models', 'models'), ('services', 'services'), ('ui', 'ui'), ('dao', 'dao'), ('utils', 'utils'), ('server', 'server'), ('resources', 'resources'), ('schema.sql', '.'), ('clinic.db', '.')],
+    hiddenimports=['ui.dashboard_page', 'ui.patient_page', 'ui.doctor_page', 'ui.appointment_page', 'ui.billing_page',
+                   'services.patient_service', 'services.doctor_service', 'services.appointment_service',
+                   'services.billing_service', 'services.stats_service', 'services.availability_service',
+                   'server.client'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
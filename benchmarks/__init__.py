@@ -0,0 +1,6 @@
+# benchmarks/__init__.py
+
+# Reproducible performance runs against generated clinic data. From the project root:
+#   python -m benchmarks.generate bench.db --rows 100000
+#   python -m benchmarks.run --rows 10000 --out results.json
+#   python -m benchmarks.run --rows 10000 --out new.json --compare results.json
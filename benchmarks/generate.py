@@ -0,0 +1,195 @@
+"""Seeded generator for realistic synthetic clinic databases.
+
+`rows` is the number of appointments; the other tables are sized from it
+(a quarter as many patients, one doctor per 2,000 appointments, and a bill
+for every completed visit), so --rows 1000 to --rows 1000000 covers a
+small practice up to a large multi-year clinic. The same seed and anchor
+date always produce the same database.
+
+Usage:
+    python -m benchmarks.generate bench.db --rows 100000 --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+from config import IMPORT_CHUNK_SIZE
+from database import Database
+
+DEFAULT_SEED = 42
+DEFAULT_ANCHOR = date(2025, 6, 1)  # "today" for generated data; fixed so runs are comparable
+
+FIRST_NAMES = (
+    "Aarav", "Aisha", "Ananya", "Arjun", "Chen", "Daniel", "Diya", "Elena", "Fatima", "Gabriel",
+    "Hannah", "Ishaan", "Kavya", "Liam", "Maria", "Mohammed", "Noah", "Olivia", "Priya", "Rahul",
+    "Rohan", "Sara", "Sofia", "Tanvi", "Vikram", "Wei", "Yusuf", "Zara",
+)
+LAST_NAMES = (
+    "Agarwal", "Brown", "Chopra", "Das", "Fernandes", "Garcia", "Gupta", "Iyer", "Khan", "Kumar",
+    "Lee", "Menon", "Mehta", "Nair", "Patel", "Rao", "Reddy", "Sahu", "Sharma", "Singh", "Smith",
+    "Thomas", "Verma", "Wang",
+)
+STREETS = ("MG Road", "Park Street", "Lake View", "Station Road", "Hill Colony", "Church Lane", "Main Bazaar")
+CITIES = ("Mumbai", "Pune", "Delhi", "Chennai", "Hyderabad", "Kolkata", "Bengaluru")
+SPECIALTIES = (
+    "General Medicine", "Pediatrics", "Dermatology", "Cardiology", "Orthopedics",
+    "Gynecology", "ENT", "Ophthalmology", "Psychiatry", "Dentistry",
+)
+REASONS = (
+    "Routine checkup", "Fever and cold", "Follow-up visit", "Skin rash", "Back pain",
+    "Blood pressure review", "Vaccination", "Diabetes review", "Chest pain", "Ear infection",
+)
+SERVICES = (
+    "Consultation", "Blood test", "X-ray", "ECG", "Dressing", "Vaccination",
+    "Ultrasound", "Physiotherapy session", "Prescription renewal", "Minor procedure",
+)
+
+SLOT_MINUTES = 30
+DAY_START_HOUR, DAY_END_HOUR = 9, 17
+SLOTS_PER_DAY = (DAY_END_HOUR - DAY_START_HOUR) * 60 // SLOT_MINUTES
+
+
+def table_sizes(rows):
+    """Returns (patients, doctors, appointments) for `rows` appointments."""
+    return max(1, rows // 4), max(5, rows // 2000), rows
+
+
+def generate(db_path, rows, seed=DEFAULT_SEED, anchor=DEFAULT_ANCHOR, chunk_size=IMPORT_CHUNK_SIZE):
+    """Creates a fresh database at `db_path` and fills it. Returns row counts per table."""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    db = Database(db_path)
+    db.initialize_schema()
+    conn = db.connect()
+    rng = random.Random(seed)
+    n_patients, n_doctors, n_appointments = table_sizes(rows)
+
+    try:
+        _insert(conn, "INSERT INTO doctors (name, specialty, contact_info) VALUES (?, ?, ?)",
+                (_doctor(rng, i) for i in range(n_doctors)), chunk_size)
+        _insert(conn, "INSERT INTO patients (name, dob, gender, contact_info, address) VALUES (?, ?, ?, ?, ?)",
+                (_patient(rng, anchor) for _ in range(n_patients)), chunk_size)
+
+        doctor_ids = [row[0] for row in conn.execute("SELECT id FROM doctors ORDER BY id")]
+        patient_first = conn.execute("SELECT MIN(id) FROM patients").fetchone()[0]
+        appointments = list(_appointments(rng, anchor, doctor_ids, patient_first, n_patients, n_appointments))
+        _insert(conn, """
+            INSERT INTO appointments (patient_id, doctor_id, date, time, reason, status, duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, appointments, chunk_size)
+
+        # Bill every completed visit on the day it happened
+        completed = conn.execute("""
+            SELECT id, patient_id, date FROM appointments WHERE status = 'Completed' ORDER BY id
+        """).fetchall()
+        _insert(conn, """
+            INSERT INTO billing (patient_id, appointment_id, amount, date, status, services_rendered)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (_bill(rng, anchor, *row) for row in completed), chunk_size)
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    return {
+        "patients": n_patients,
+        "doctors": n_doctors,
+        "appointments": len(appointments),
+        "billing": len(completed),
+    }
+
+
+def _insert(conn, query, rows, chunk_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            conn.executemany(query, batch)
+            batch = []
+    if batch:
+        conn.executemany(query, batch)
+    conn.commit()
+
+
+def _doctor(rng, index):
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return name, SPECIALTIES[index % len(SPECIALTIES)], f"98{rng.randrange(10**8):08d}"
+
+
+def _patient(rng, anchor):
+    dob = anchor - timedelta(days=rng.randint(365, 90 * 365))
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    address = f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+    return name, dob.isoformat(), rng.choice(("Male", "Female")), f"9{rng.randrange(10**9):09d}", address
+
+
+def _appointments(rng, anchor, doctor_ids, patient_first, n_patients, count):
+    """Fills each doctor's weekday slots in turn, three quarters in the past and a quarter ahead."""
+    per_day = SLOTS_PER_DAY * len(doctor_ids)
+    workdays = -(-count // per_day)
+    day = anchor
+    # Walk back far enough that a quarter of the bookings land on or after the anchor
+    past_workdays = workdays * 3 // 4
+    while past_workdays:
+        day -= timedelta(days=1)
+        if day.weekday() < 5:
+            past_workdays -= 1
+
+    produced = 0
+    while produced < count:
+        if day.weekday() < 5:
+            for doctor_id in doctor_ids:
+                for slot in range(SLOTS_PER_DAY):
+                    if produced >= count:
+                        return
+                    # Leave some slots empty so the schedule isn't wall to wall
+                    if rng.random() < 0.15:
+                        continue
+                    minutes = DAY_START_HOUR * 60 + slot * SLOT_MINUTES
+                    if day < anchor:
+                        status = rng.choices(("Completed", "Cancelled", "Scheduled"), (85, 10, 5))[0]
+                    else:
+                        status = rng.choices(("Scheduled", "Cancelled"), (95, 5))[0]
+                    yield (
+                        patient_first + rng.randrange(n_patients),
+                        doctor_id,
+                        day.isoformat(),
+                        f"{minutes // 60:02d}:{minutes % 60:02d}",
+                        rng.choice(REASONS),
+                        status,
+                        SLOT_MINUTES,
+                    )
+                    produced += 1
+        day += timedelta(days=1)
+
+
+def _bill(rng, anchor, appointment_id, patient_id, day):
+    services = ", ".join(rng.sample(SERVICES, rng.randint(1, 3)))
+    amount = round(rng.uniform(200, 5000), 2)
+    # Older bills have mostly been settled
+    paid_weight = 90 if day < (anchor - timedelta(days=60)).isoformat() else 50
+    status = rng.choices(("Paid", "Unpaid", "Pending", "Cancelled"), (paid_weight, 15, 10, 3))[0]
+    return patient_id, appointment_id, amount, day, status, services
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic clinic database for benchmarking.")
+    parser.add_argument("db_path")
+    parser.add_argument("--rows", type=int, default=10_000, help="number of appointments (default 10000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=DEFAULT_ANCHOR,
+                        help="date treated as today, YYYY-MM-DD (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    counts = generate(args.db_path, args.rows, args.seed, args.anchor)
+    print(f"Generated {args.db_path}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
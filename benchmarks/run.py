@@ -0,0 +1,290 @@
+"""Times the DAO, service and page-load paths against a generated database.
+
+Each case runs --repeat times after one warm-up call and reports min, median,
+mean and p95 in milliseconds. Cases tagged "cold" clear the service caches
+and in-memory indexes before every run. Page cases replay the queries a page
+issues when it is shown, without drawing anything, so they run headless.
+
+Results are written as JSON; --compare fails (exit code 1) when any case's
+median is more than --threshold times slower than in the baseline file.
+
+Usage:
+    python -m benchmarks.run --rows 10000 --out results.json
+    python -m benchmarks.run --db bench.db --only "page\\." --repeat 20
+    python -m benchmarks.run --rows 10000 --out new.json --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.generate import DEFAULT_ANCHOR, DEFAULT_SEED, generate
+from database import configure_database
+
+DEFAULT_REPEAT = 10
+DEFAULT_THRESHOLD = 1.2
+NOISE_FLOOR_MS = 0.05  # medians this small are timer noise, not regressions
+
+
+class Case:
+    def __init__(self, name, func, cold=False):
+        self.name = name
+        self.func = func
+        self.cold = cold
+
+
+def build_cases(anchor):
+    """Imports the services (bound to the configured database) and returns every Case."""
+    from config import PAGE_SIZE, PICKER_MAX_RESULTS
+    from dao.appointment_dao import AppointmentDAO
+    from dao.billing_dao import BillingDAO
+    from dao.doctor_dao import DoctorDAO
+    from dao.patient_dao import PatientDAO
+    from dao.report_dao import ReportDAO
+    from dao.stats_dao import StatsDAO
+    from database import get_database
+    from models.appointment import Appointment
+    from models.patient import Patient
+    from services.appointment_service import AppointmentService
+    from services.availability_index import availability_index
+    from services.availability_service import AvailabilityService
+    from services.billing_service import BillingService
+    from services.cache import clear_all_caches
+    from services.doctor_service import DoctorService
+    from services.patient_index import patient_index
+    from services.patient_service import PatientService
+    from services.report_service import ReportService
+    from services.stats_service import StatsService
+
+    def reset():
+        clear_all_caches()
+        patient_index.invalidate()
+        availability_index.invalidate()
+
+    # Sample keys from the middle of the data so lookups aren't all first-page hits
+    db = get_database()
+    patient_id = db.fetch_one("SELECT patient_id FROM appointments ORDER BY id LIMIT 1 OFFSET "
+                              "(SELECT COUNT(*) / 2 FROM appointments)")[0]
+    doctor_id = db.fetch_one("SELECT MIN(id) FROM doctors")[0]
+    appointment_id = db.fetch_one("SELECT MAX(id) / 2 FROM appointments")[0]
+    billing_id = db.fetch_one("SELECT MAX(id) / 2 FROM billing")[0] or 1
+    month_start = anchor.replace(day=1) - timedelta(days=1)
+    month_start = month_start.replace(day=1)
+    month_end = anchor.replace(day=1) - timedelta(days=1)
+    year_start = anchor - timedelta(days=365)
+    week = (datetime.combine(anchor, datetime.min.time()),
+            datetime.combine(anchor + timedelta(days=7), datetime.min.time()))
+
+    def add_delete_patient():
+        patient = Patient(None, "Bench Patient", "1990-01-01", "Female", "9000000000", "1 Test Street")
+        PatientService.add_patient(patient)
+        PatientService.delete_patient(patient.id)
+
+    def add_delete_appointment():
+        # Far enough ahead that the slot is always free and never in the past
+        appointment = Appointment(None, patient_id, doctor_id, (anchor + timedelta(days=3650)).isoformat(),
+                                  "10:00", "Benchmark", "Scheduled")
+        AppointmentService.add_appointment(appointment)
+        AppointmentService.delete_appointment(appointment.id)
+
+    def first_page(rows_page, key):
+        rows = rows_page(None, PAGE_SIZE)
+        if rows:
+            rows_page(key(rows[-1]), PAGE_SIZE)
+        return rows
+
+    return [
+        # DAO layer: raw queries and hydration
+        Case("dao.patients.get_all", PatientDAO.get_all_patients),
+        Case("dao.patients.iter", lambda: PatientDAO.iter_patients()),
+        Case("dao.patients.by_id", lambda: PatientDAO.get_patient_by_id(patient_id)),
+        Case("dao.patients.search", lambda: PatientDAO.search_patients("Sharma")),
+        Case("dao.doctors.get_all", DoctorDAO.get_all_doctors),
+        Case("dao.appointments.get_all", AppointmentDAO.get_all_appointments),
+        Case("dao.appointments.get_all_projected", lambda: AppointmentDAO.get_all_appointments(("id", "date", "time"))),
+        Case("dao.appointments.by_patient", lambda: AppointmentDAO.get_appointments_by_patient(patient_id)),
+        Case("dao.appointments.between_week", lambda: AppointmentDAO.get_appointments_between(*week)),
+        Case("dao.appointments.conflicts",
+             lambda: AppointmentDAO.find_doctor_conflicts(doctor_id, f"{anchor} 10:00", f"{anchor} 10:30",
+                                                          f"{anchor} 02:00")),
+        Case("dao.billing.get_all", BillingDAO.get_all_billings),
+        Case("dao.billing.by_patient", lambda: BillingDAO.get_billings_by_patient(patient_id)),
+        Case("dao.billing.between_month", lambda: BillingDAO.get_billings_between(month_start, month_end)),
+        Case("dao.billing.overdue", lambda: BillingDAO.get_overdue_billings(anchor.isoformat())),
+        Case("dao.billing.aging", lambda: BillingDAO.get_overdue_aging(anchor.isoformat())),
+        Case("dao.billing.search", lambda: BillingDAO.search_billings("X-ray")),
+        Case("dao.stats.counters", StatsDAO.get_counters),
+        Case("dao.reports.refresh", ReportDAO.refresh_rollups),
+
+        # Service layer: validation, caches and indexes
+        Case("service.patients.by_id_cached", lambda: PatientService.get_patient_by_id(patient_id)),
+        Case("service.patients.by_id_cold", lambda: PatientService.get_patient_by_id(patient_id), cold=True),
+        Case("service.patients.search", lambda: PatientService.search_patients("Sharma")),
+        Case("service.patients.prefix", lambda: PatientService.find_patients_by_prefix("Pri")),
+        Case("service.patients.add_delete", add_delete_patient),
+        Case("service.doctors.get_all", DoctorService.get_all_doctors),
+        Case("service.appointments.by_id", lambda: AppointmentService.get_appointment_by_id(appointment_id)),
+        Case("service.appointments.add_delete", add_delete_appointment),
+        Case("service.billing.by_id", lambda: BillingService.get_billing_by_id(billing_id)),
+        Case("service.billing.overdue", BillingService.get_overdue_billings),
+        Case("service.billing.aging", BillingService.get_overdue_aging),
+        Case("service.availability.next_free_slot",
+             lambda: AvailabilityService.next_free_slot(doctor_id, start=datetime.combine(anchor, datetime.min.time()))),
+        Case("service.availability.next_free_slot_cold",
+             lambda: AvailabilityService.next_free_slot(doctor_id, start=datetime.combine(anchor, datetime.min.time())),
+             cold=True),
+        Case("service.reports.month", lambda: ReportService.get_month_report(month_start.year, month_start.month)),
+        Case("service.reports.by_doctor_year", lambda: ReportService.get_revenue_by_doctor(str(year_start), str(anchor))),
+
+        # Page loads: the queries each page runs when it is shown
+        Case("page.dashboard.load_summary", StatsService.get_summary),
+        Case("page.patients.load_patients",
+             lambda: first_page(PatientService.get_patients_page, PatientService.page_key)),
+        Case("page.patients.picker_cold",
+             lambda: PatientService.find_patients_by_prefix("", PICKER_MAX_RESULTS), cold=True),
+        Case("page.doctors.load_doctors",
+             lambda: first_page(DoctorService.get_doctors_page, DoctorService.page_key)),
+        Case("page.appointments.load_appointments",
+             lambda: first_page(AppointmentService.get_appointment_rows_page, AppointmentService.row_page_key)),
+        Case("page.billing.load_billings",
+             lambda: first_page(BillingService.get_billing_rows_page, BillingService.row_page_key)),
+        Case("page.billing.patient_history",
+             lambda: (AppointmentService.get_appointments_by_patient(patient_id, ("id", "date", "time")),
+                      BillingService.get_billings_by_patient(patient_id))),
+    ], reset
+
+
+def time_case(case, repeat, reset):
+    """Returns timing stats in milliseconds for one case."""
+    def call():
+        result = case.func()
+        # Generators and lists are both drained so lazy queries are actually timed
+        if result is not None and not isinstance(result, (dict, tuple, str)) and hasattr(result, "__iter__"):
+            return sum(1 for _ in result)
+        return None
+
+    if case.cold:
+        reset()
+    rows = call()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        if case.cold:
+            reset()
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+
+    samples.sort()
+    return {
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "runs": repeat,
+        "rows": rows,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Returns (name, old, new, ratio) for every case slower than threshold x the baseline median."""
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if not old or max(old["median_ms"], stats["median_ms"]) < NOISE_FLOOR_MS:
+            continue
+        ratio = stats["median_ms"] / old["median_ms"]
+        if ratio > threshold:
+            regressions.append((name, old["median_ms"], stats["median_ms"], ratio))
+    return regressions
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("patients", "doctors", "appointments", "billing")}
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the clinic performance benchmarks.")
+    parser.add_argument("--db", help="existing benchmark database (default: generate a temporary one)")
+    parser.add_argument("--rows", type=int, default=10_000, help="appointments to generate (default 10000)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--only", help="regular expression; run only matching case names")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed median slowdown versus the baseline (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    if "dao.patient_dao" in sys.modules:
+        raise RuntimeError("benchmarks.run must configure the database before the DAO modules are imported")
+
+    temp_dir = None
+    db_path = args.db
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="clinic-bench-")
+        db_path = os.path.join(temp_dir.name, "bench.db")
+        print(f"Generating {args.rows} appointments (seed {args.seed})...")
+        generate(db_path, args.rows, args.seed)
+
+    try:
+        configure_database(db_path).initialize_schema()
+        cases, reset = build_cases(DEFAULT_ANCHOR)
+        pattern = re.compile(args.only) if args.only else None
+
+        results = {}
+        for case in cases:
+            if pattern and not pattern.search(case.name):
+                continue
+            results[case.name] = stats = time_case(case, args.repeat, reset)
+            print(f"{case.name:<45} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+        report = {
+            "meta": {
+                "rows": args.rows if args.db is None else None,
+                "seed": args.seed if args.db is None else None,
+                "db": args.db,
+                "counts": table_counts(db_path),
+                "repeat": args.repeat,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+            },
+            "results": results,
+        }
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Wrote {args.out}")
+
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                baseline = json.load(f)["results"]
+            regressions = compare(results, baseline, args.threshold)
+            for name, old, new, ratio in regressions:
+                print(f"REGRESSION {name}: {old:.3f} ms -> {new:.3f} ms ({ratio:.2f}x)")
+            if regressions:
+                return 1
+            print(f"No regressions beyond {args.threshold}x against {args.compare}")
+        return 0
+    finally:
+        from database import get_database
+        get_database().close()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
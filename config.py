@@ -13,6 +13,11 @@ def resource_path(relative_path):
 # Read-only database path bundled inside the app (.exe)
 BUNDLED_DB_PATH = resource_path("clinic.db")
 
+# Database connection settings
+DB_BUSY_TIMEOUT = 5.0          # seconds to wait when another terminal holds the write lock
+DB_JOURNAL_MODE = "WAL"
+DB_STATEMENT_CACHE_SIZE = 128  # prepared statements kept per connection
+
 # UI configuration
 WINDOW_WIDTH = 1000
 WINDOW_HEIGHT = 600
@@ -23,11 +28,87 @@ APP_TITLE = "Clinic Management System"
 DEFAULT_DATE_FORMAT = "%Y-%m-%d"
 DEFAULT_TIME_FORMAT = "%H:%M"
 
+# Per-user folder for the database, logs and profiles. BASE_DIR is no place for them:
+# in the one-file build it is the temporary _MEIPASS folder, deleted when the app exits
+def user_data_dir():
+    appdata = os.getenv('APPDATA') or os.path.expanduser("~")
+    return os.path.join(appdata, "ClinicCMS")
+
 # Logging (optional)
-LOG_FILE = os.path.join(BASE_DIR, "clinic_app.log")
+LOG_FILE = os.path.join(user_data_dir(), "clinic_app.log")
+
+# Query instrumentation: statements slower than SLOW_QUERY_MS go to LOG_FILE with their
+# query plan, and a UI action issuing more than ACTION_QUERY_BUDGET queries is logged as N+1
+QUERY_MONITOR_ENABLED = True
+SLOW_QUERY_MS = 100
+ACTION_QUERY_BUDGET = 25
+
+# `app.py --profile`: raw cProfile output, and when the event-loop watchdog reports the UI as blocked
+PROFILE_OUTPUT = os.path.join(user_data_dir(), "clinic_profile.prof")
+UI_STALL_MS = 200
+UI_WATCHDOG_INTERVAL_MS = 50
 
 # Icon path for PyInstaller-compatible builds
 APP_ICON_PATH = resource_path(os.path.join("resources", "icon.png"))
 
 APP_VERSION = "1.0.0"
-BUILD_DATE = "2025-06-26"
\ No newline at end of file
+BUILD_DATE = "2025-06-26"
+
+# Rows fetched per keyset page by list views
+PAGE_SIZE = 200
+
+# Maximum ranked results returned by a full-text search
+SEARCH_LIMIT = 100
+SEARCH_DEBOUNCE_MS = 250   # wait for a pause in typing before searching
+PICKER_MAX_RESULTS = 20    # suggestions shown by the type-ahead patient picker
+
+# Rows validated and inserted per transaction by the CSV importer
+IMPORT_CHUNK_SIZE = 1000
+
+# Rows pulled per fetchmany() call when streaming query results
+FETCH_BATCH_SIZE = 500
+
+# Distinct date and time strings remembered by utils.date_codec
+DATE_CODEC_CACHE_SIZE = 8192
+
+# Service-layer entity cache (set CACHE_ENABLED = False to always read from SQLite)
+CACHE_ENABLED = True
+CACHE_MAX_ENTRIES = 5000   # per entity type, least recently used evicted first
+CACHE_MAX_LIST_ROWS = 2000  # get_all_* lists longer than this are not cached (one entry would hold them all)
+CACHE_TTL_SECONDS = 300
+
+# Background data loading for the UI
+UI_WORKER_THREADS = 2
+UI_POLL_INTERVAL_MS = 25     # how often finished queries are handed back to the Tk thread
+TREE_INSERT_CHUNK = 100      # Treeview rows inserted per event-loop turn
+
+# Appointment lengths in minutes; the maximum also bounds how far back the double-booking check looks
+APPOINTMENT_DEFAULT_MINUTES = 30
+APPOINTMENT_MAX_MINUTES = 480
+
+# Archival of closed history: completed/cancelled appointments and paid bills older than
+# ARCHIVE_AFTER_DAYS move to ARCHIVE_DB_PATH (None keeps it next to the live database)
+ARCHIVE_AFTER_DAYS = 730
+ARCHIVE_DB_PATH = None
+ARCHIVE_BATCH_SIZE = 500       # rows moved per write transaction
+ARCHIVE_BATCH_PAUSE_MS = 50    # gap between batches so other terminals can take the write lock
+
+# Free-slot search: slot grid, how far ahead to look, and hours for doctors without a template
+AVAILABILITY_SLOT_MINUTES = 15
+AVAILABILITY_HORIZON_DAYS = 90
+DEFAULT_WORKING_HOURS = {weekday: [("09:00", "17:00")] for weekday in range(5)}  # Monday = 0
+
+# Cold-start budget for the packaged app, from process start to the first drawn window
+STARTUP_BUDGET_MS = 1500
+
+# Multi-terminal server mode: `python -m server` hosts the services on the PC that holds the
+# database; front-desk PCs set SERVER_URL (or the CLINIC_SERVER environment variable, or pass
+# `app.py --server URL`) to use it instead of a local clinic.db
+SERVER_HOST = "127.0.0.1"      # use "0.0.0.0" to accept the other PCs on the clinic network
+SERVER_PORT = 8765
+SERVER_DB_WORKERS = 4          # threads running service calls against SQLite
+SERVER_MAX_PENDING = 64        # calls queued or running before new requests are refused with 503
+SERVER_TOKEN = None            # shared secret sent as X-Clinic-Token; CLINIC_SERVER_TOKEN overrides it.
+                               # Required unless SERVER_HOST is loopback (or --insecure is passed)
+SERVER_URL = None              # e.g. "http://192.168.1.10:8765"
+SERVER_TIMEOUT = 10.0          # seconds a terminal waits for a reply
@@ -2,10 +2,18 @@ from .patient_dao import PatientDAO
 from .appointment_dao import AppointmentDAO
 from .doctor_dao import DoctorDAO
 from .billing_dao import BillingDAO
+from .stats_dao import StatsDAO
+from .working_hours_dao import WorkingHoursDAO
+from .report_dao import ReportDAO
+from .archive_dao import ArchiveDAO
 
 __all__ = [
     "PatientDAO",
     "AppointmentDAO",
     "DoctorDAO",
-    "BillingDAO"
+    "BillingDAO",
+    "StatsDAO",
+    "WorkingHoursDAO",
+    "ReportDAO",
+    "ArchiveDAO",
 ]
@@ -1,14 +1,41 @@
-from database import Database, get_writable_db_path
+import json
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+
+from config import FETCH_BATCH_SIZE, PAGE_SIZE
+from database import get_database, model_row_factory, select_columns
 from models.appointment import Appointment
+from models.patient import Patient
+from models.doctor import Doctor
+from utils.date_codec import to_epoch
+from utils.page_keys import appointment_key, appointment_row_key
+
+db = get_database()
+APPOINTMENT_ROW = model_row_factory(Appointment)
+
+# Read model for the appointment grid: one indexed scan joined to patients and doctors,
+# selecting only the columns the grid displays
+APPOINTMENT_ROWS_SQL = """
+    SELECT a.id, p.id, p.name, p.gender, p.dob, d.id, d.name, d.specialty,
+           a.date, a.time, a.reason, a.status
+    FROM appointments a
+    LEFT JOIN patients p ON p.id = a.patient_id
+    LEFT JOIN doctors d ON d.id = a.doctor_id
+"""
+
+def _to_appointment_row(row) -> tuple:
+    appt_id, patient_id, name, gender, dob, doctor_id, doctor_name, specialty, date, time, reason, status = row
+    patient = Patient(name=name, gender=gender, dob=dob).get_summary() if patient_id is not None else "Unknown"
+    doctor = Doctor(name=doctor_name, specialty=specialty).get_display_name() if doctor_id is not None else "Unknown"
+    return (appt_id, patient, doctor, date, time, reason, status)
 
-db = Database(get_writable_db_path())
 
 class AppointmentDAO:
     @staticmethod
     def insert_appointment(appointment: Appointment) -> bool:
         query = """
-            INSERT INTO appointments (patient_id, doctor_id, date, time, reason, status)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO appointments (patient_id, doctor_id, date, time, reason, status, duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """
         params = (
             appointment.patient_id,
@@ -17,14 +44,31 @@ class AppointmentDAO:
             appointment.time,
             appointment.reason,
             appointment.status,
+            appointment.duration,
         )
-        return db.execute_query(query, params)
+        appointment_id = db.execute_insert(query, params)
+        if appointment_id is None:
+            return False
+        appointment.id = appointment_id
+        return True
+
+    @staticmethod
+    def insert_many(appointments: list[Appointment]) -> bool:
+        query = """
+            INSERT INTO appointments (patient_id, doctor_id, date, time, reason, status, duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        params = [
+            (a.patient_id, a.doctor_id, a.date, a.time, a.reason, a.status, a.duration)
+            for a in appointments
+        ]
+        return db.execute_many(query, params)
 
     @staticmethod
     def update_appointment(appointment: Appointment) -> bool:
         query = """
             UPDATE appointments
-            SET patient_id = ?, doctor_id = ?, date = ?, time = ?, reason = ?, status = ?
+            SET patient_id = ?, doctor_id = ?, date = ?, time = ?, reason = ?, status = ?, duration = ?
             WHERE id = ?
         """
         params = (
@@ -34,31 +78,131 @@ class AppointmentDAO:
             appointment.time,
             appointment.reason,
             appointment.status,
+            appointment.duration,
             appointment.id,
         )
         return db.execute_query(query, params)
 
+    @staticmethod
+    def set_status_many(appointment_ids: Sequence[int], status: str) -> bool:
+        """Sets the status of every listed appointment in one statement."""
+        query = "UPDATE appointments SET status = ? WHERE id IN (SELECT value FROM json_each(?))"
+        return db.execute_query(query, (status, json.dumps(list(appointment_ids))))
+
     @staticmethod
     def delete_appointment(appointment_id: int) -> bool:
         query = "DELETE FROM appointments WHERE id = ?"
         return db.execute_query(query, (appointment_id,))
 
     @staticmethod
-    def get_appointment_by_id(appointment_id: int) -> Appointment | None:
-        query = "SELECT * FROM appointments WHERE id = ?"
-        row = db.fetch_one(query, (appointment_id,))
-        if row:
-            return Appointment(*row)
-        return None
+    def find_doctor_conflicts(doctor_id: int, starts_at: str, ends_at: str, earliest_start: str,
+                              exclude_id: int | None = None) -> list[Appointment]:
+        """Returns the doctor's non-cancelled bookings overlapping [starts_at, ends_at).
+
+        Times are "YYYY-MM-DD HH:MM". `earliest_start` is starts_at minus the longest
+        allowed duration; nothing starting before it can still be running, so the
+        idx_appointments_doctor_range scan is bounded on both sides.
+        """
+        query = f"""
+            SELECT {select_columns(Appointment)} FROM appointments
+            WHERE doctor_id = ? AND starts_at > ? AND starts_at < ? AND ends_at > ?
+              AND status != 'Cancelled' AND id IS NOT ?
+            ORDER BY starts_at
+        """
+        params = (doctor_id, earliest_start, ends_at, starts_at, exclude_id)
+        return db.fetch_all(query, params, row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_bookings_between(start_date: str, end_date: str) -> list[tuple]:
+        """Returns (id, doctor_id, date, time, duration) for non-cancelled appointments dated in [start_date, end_date]."""
+        query = """
+            SELECT id, doctor_id, date, time, duration FROM appointments
+            WHERE date BETWEEN ? AND ? AND status != 'Cancelled'
+        """
+        return db.fetch_all(query, (start_date, end_date))
+
+    @staticmethod
+    def get_appointments_between(start: datetime, end: datetime, doctor_id: int | None = None,
+                                 columns: Sequence[str] | None = None) -> list[Appointment]:
+        """Returns appointments starting in [start, end), in start order, optionally for one doctor."""
+        select = select_columns(Appointment, columns)
+        params = [to_epoch(start), to_epoch(end)]
+        doctor_filter = ""
+        if doctor_id is not None:
+            doctor_filter = "doctor_id = ? AND "
+            params.insert(0, doctor_id)
+        query = f"""
+            SELECT {select} FROM appointments
+            WHERE {doctor_filter}start_ts >= ? AND start_ts < ?
+            ORDER BY start_ts, id
+        """
+        return db.fetch_all(query, params, row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_appointment_by_id(appointment_id: int, columns: Sequence[str] | None = None) -> Appointment | None:
+        query = f"SELECT {select_columns(Appointment, columns)} FROM appointments WHERE id = ?"
+        return db.fetch_one(query, (appointment_id,), row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_appointments_by_ids(appointment_ids: Sequence[int], columns: Sequence[str] | None = None) -> list[Appointment]:
+        """Loads the listed appointments in one query; ids that don't exist are skipped."""
+        query = f"""
+            SELECT {select_columns(Appointment, columns)} FROM appointments
+            WHERE id IN (SELECT value FROM json_each(?))
+        """
+        return db.fetch_all(query, (json.dumps(list(appointment_ids)),), row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_appointments_by_patient(patient_id: int, columns: Sequence[str] | None = None) -> list[Appointment]:
+        query = f"SELECT {select_columns(Appointment, columns)} FROM appointments WHERE patient_id = ? ORDER BY date, time"
+        return db.fetch_all(query, (patient_id,), row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_all_appointments(columns: Sequence[str] | None = None) -> list[Appointment]:
+        query = f"SELECT {select_columns(Appointment, columns)} FROM appointments ORDER BY date, time"
+        return db.fetch_all(query, row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def iter_appointments(batch_size: int = FETCH_BATCH_SIZE,
+                          columns: Sequence[str] | None = None) -> Iterator[Appointment]:
+        """Streams every appointment in id order without loading the whole table."""
+        query = f"SELECT {select_columns(Appointment, columns)} FROM appointments ORDER BY id"
+        return db.iter_rows(query, batch_size=batch_size, row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_appointments_page(after_key: tuple | None = None, limit: int = PAGE_SIZE,
+                              columns: Sequence[str] | None = None) -> list[Appointment]:
+        """Returns up to `limit` appointments ordered by date and time, starting after `after_key`."""
+        select = select_columns(Appointment, columns, required=("id", "date", "time"))
+        if after_key is None:
+            query = f"SELECT {select} FROM appointments ORDER BY date, time, id LIMIT ?"
+            return db.fetch_all(query, (limit,), row_factory=APPOINTMENT_ROW)
+        query = f"""
+            SELECT {select} FROM appointments
+            WHERE (date, time, id) > (?, ?, ?)
+            ORDER BY date, time, id LIMIT ?
+        """
+        return db.fetch_all(query, (*after_key, limit), row_factory=APPOINTMENT_ROW)
+
+    @staticmethod
+    def page_key(appointment: Appointment) -> tuple:
+        return appointment_key(appointment)
 
     @staticmethod
-    def get_appointments_by_patient(patient_id: int) -> list[Appointment]:
-        query = "SELECT * FROM appointments WHERE patient_id = ? ORDER BY date, time"
-        rows = db.fetch_all(query, (patient_id,))
-        return [Appointment(*row) for row in rows]
+    def get_appointment_rows_page(after_key: tuple | None = None, limit: int = PAGE_SIZE) -> list[tuple]:
+        """Returns display rows (id, patient, doctor, date, time, reason, status) for the appointment grid."""
+        if after_key is None:
+            query = f"{APPOINTMENT_ROWS_SQL} ORDER BY a.date, a.time, a.id LIMIT ?"
+            rows = db.fetch_all(query, (limit,))
+        else:
+            query = f"""
+                {APPOINTMENT_ROWS_SQL}
+                WHERE (a.date, a.time, a.id) > (?, ?, ?)
+                ORDER BY a.date, a.time, a.id LIMIT ?
+            """
+            rows = db.fetch_all(query, (*after_key, limit))
+        return [_to_appointment_row(row) for row in rows]
 
     @staticmethod
-    def get_all_appointments() -> list[Appointment]:
-        query = "SELECT * FROM appointments ORDER BY date, time"
-        rows = db.fetch_all(query)
-        return [Appointment(*row) for row in rows]
\ No newline at end of file
+    def row_page_key(row: tuple) -> tuple:
+        return appointment_row_key(row)
@@ -0,0 +1,206 @@
+import json
+from collections.abc import Sequence
+
+from database import get_database, model_row_factory, select_columns
+from models.appointment import Appointment
+from models.billing import Billing
+
+db = get_database()
+ARCHIVE = "archive"  # alias the archive file is attached under
+ARCHIVED_APPOINTMENT_ROW = model_row_factory(Appointment)
+ARCHIVED_BILLING_ROW = model_row_factory(Billing)
+
+APPOINTMENT_COLUMNS = select_columns(Appointment)
+BILLING_COLUMNS = select_columns(Billing)
+
+# The archive keeps the stored columns only; starts_at and the other generated
+# columns exist to index the live table
+ARCHIVE_SCHEMA = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {ARCHIVE}.appointments (
+        id INTEGER PRIMARY KEY,
+        patient_id INTEGER,
+        doctor_id INTEGER,
+        date TEXT,
+        time TEXT,
+        reason TEXT,
+        status TEXT,
+        duration INTEGER,
+        archived_at TEXT
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS {ARCHIVE}.idx_archived_appointments_patient ON appointments(patient_id, date)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {ARCHIVE}.billing (
+        id INTEGER PRIMARY KEY,
+        patient_id INTEGER,
+        appointment_id INTEGER,
+        amount REAL,
+        date TEXT,
+        status TEXT,
+        services_rendered TEXT,
+        archived_at TEXT
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS {ARCHIVE}.idx_archived_billing_patient ON billing(patient_id, date)",
+)
+
+# Rows eligible for the archive: closed and dated before the cutoff. Appointments
+# stay live while a live bill still points at them, so bills always move first.
+BILLING_ARCHIVABLE = "b.status = 'Paid' AND b.date < ?"
+APPOINTMENT_ARCHIVABLE = """
+    a.status IN ('Completed', 'Cancelled') AND a.date < ?
+    AND NOT EXISTS (SELECT 1 FROM main.billing b WHERE b.appointment_id = a.id)
+"""
+
+
+class ArchiveDAO:
+    """Moves closed rows into the archive database, which must be attached as ARCHIVE.
+
+    Each batch is moved in two steps: copy_* writes the archive file and commits
+    on its own, then move_* deletes the rows that made it across. A crash between
+    the two leaves a row in both files, never in neither; the next run copies it
+    again, and the history reads skip archived copies of live rows.
+    """
+
+    @staticmethod
+    def ensure_schema() -> bool:
+        return all(db.execute_query(statement) for statement in ARCHIVE_SCHEMA)
+
+    @staticmethod
+    def find_archivable_billings(cutoff: str, limit: int) -> list[int]:
+        query = f"SELECT b.id FROM main.billing b WHERE {BILLING_ARCHIVABLE} ORDER BY b.id LIMIT ?"
+        return [row[0] for row in db.fetch_all(query, (cutoff, limit))]
+
+    @staticmethod
+    def find_archivable_appointments(cutoff: str, limit: int) -> list[int]:
+        query = f"SELECT a.id FROM main.appointments a WHERE {APPOINTMENT_ARCHIVABLE} ORDER BY a.id LIMIT ?"
+        return [row[0] for row in db.fetch_all(query, (cutoff, limit))]
+
+    @staticmethod
+    def copy_billings(billing_ids: Sequence[int], archived_at: str) -> bool:
+        query = f"""
+            INSERT OR REPLACE INTO {ARCHIVE}.billing ({BILLING_COLUMNS}, archived_at)
+            SELECT {BILLING_COLUMNS}, ? FROM main.billing WHERE id IN (SELECT value FROM json_each(?))
+        """
+        return db.execute_query(query, (archived_at, json.dumps(list(billing_ids))))
+
+    @staticmethod
+    def copy_appointments(appointment_ids: Sequence[int], archived_at: str) -> bool:
+        query = f"""
+            INSERT OR REPLACE INTO {ARCHIVE}.appointments ({APPOINTMENT_COLUMNS}, archived_at)
+            SELECT {APPOINTMENT_COLUMNS}, ? FROM main.appointments WHERE id IN (SELECT value FROM json_each(?))
+        """
+        return db.execute_query(query, (archived_at, json.dumps(list(appointment_ids))))
+
+    @staticmethod
+    def move_billings(billing_ids: Sequence[int], cutoff: str) -> int:
+        """Deletes the copied bills from the live table. Call inside db.transaction().
+
+        Rows edited since they were copied no longer qualify and stay live. Their
+        totals are folded into revenue_daily_archived and the dashboard counters
+        are topped back up, so reports and totals don't change. Returns the number
+        of bills moved (0 if a write failed, which rolls the transaction back).
+        """
+        query = f"""
+            SELECT b.id FROM main.billing b
+            WHERE b.id IN (SELECT value FROM json_each(?)) AND {BILLING_ARCHIVABLE}
+              AND b.id IN (SELECT id FROM {ARCHIVE}.billing)
+        """
+        ids = [row[0] for row in db.fetch_all(query, (json.dumps(list(billing_ids)), cutoff))]
+        if not ids:
+            return 0
+        batch = json.dumps(ids)
+        fold = """
+            INSERT INTO revenue_daily_archived (date, doctor_id, status, bills, amount)
+            SELECT b.date, IFNULL(a.doctor_id, 0), IFNULL(b.status, ''), COUNT(*), IFNULL(SUM(b.amount), 0)
+            FROM main.billing b LEFT JOIN main.appointments a ON a.id = b.appointment_id
+            WHERE b.id IN (SELECT value FROM json_each(?)) AND b.date IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (date, doctor_id, status)
+            DO UPDATE SET bills = bills + excluded.bills, amount = amount + excluded.amount
+        """
+        # Added back ahead of the delete, whose trigger takes the paid amounts off again
+        keep_collected = """
+            INSERT INTO collected_daily (date, amount)
+            SELECT date, IFNULL(SUM(amount), 0) FROM main.billing
+            WHERE id IN (SELECT value FROM json_each(?)) AND status = 'Paid' AND date IS NOT NULL
+            GROUP BY date
+            ON CONFLICT (date) DO UPDATE SET amount = amount + excluded.amount
+        """
+        if not (db.execute_query(fold, (batch,))
+                and db.execute_query(keep_collected, (batch,))
+                and db.execute_query("DELETE FROM main.billing WHERE id IN (SELECT value FROM json_each(?))", (batch,))
+                and db.execute_query("UPDATE summary_counters SET value = value + ? WHERE name = 'billings'",
+                                     (len(ids),))):
+            return 0
+        return len(ids)
+
+    @staticmethod
+    def move_appointments(appointment_ids: Sequence[int], cutoff: str) -> int:
+        """Deletes the copied appointments from the live table; see move_billings."""
+        query = f"""
+            SELECT a.id FROM main.appointments a
+            WHERE a.id IN (SELECT value FROM json_each(?)) AND {APPOINTMENT_ARCHIVABLE}
+              AND a.id IN (SELECT id FROM {ARCHIVE}.appointments)
+        """
+        ids = [row[0] for row in db.fetch_all(query, (json.dumps(list(appointment_ids)), cutoff))]
+        if not ids:
+            return 0
+        batch = json.dumps(ids)
+        day_counts = db.fetch_all("""
+            SELECT COUNT(*), date FROM main.appointments
+            WHERE id IN (SELECT value FROM json_each(?)) AND date IS NOT NULL
+            GROUP BY date
+        """, (batch,))
+        fold = """
+            INSERT INTO appointment_daily_archived (date, doctor_id, status, appointments, minutes)
+            SELECT date, IFNULL(doctor_id, 0), IFNULL(status, ''), COUNT(*), IFNULL(SUM(duration), 0)
+            FROM main.appointments
+            WHERE id IN (SELECT value FROM json_each(?)) AND date IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (date, doctor_id, status)
+            DO UPDATE SET appointments = appointments + excluded.appointments, minutes = minutes + excluded.minutes
+        """
+        if not (db.execute_query(fold, (batch,))
+                and db.execute_query("DELETE FROM main.appointments WHERE id IN (SELECT value FROM json_each(?))",
+                                     (batch,))
+                and db.execute_query("UPDATE summary_counters SET value = value + ? WHERE name = 'appointments'",
+                                     (len(ids),))
+                and db.execute_many("UPDATE appointment_day_counts SET count = count + ? WHERE date = ?",
+                                    day_counts)):
+            return 0
+        return len(ids)
+
+    @staticmethod
+    def get_appointment_history(patient_id: int, columns: Sequence[str] | None = None) -> list[Appointment]:
+        """Returns a patient's live and archived appointments, newest first."""
+        select = select_columns(Appointment, columns, required=("id", "date", "time"))
+        query = f"""
+            SELECT {select} FROM main.appointments WHERE patient_id = ?
+            UNION ALL
+            SELECT {select} FROM {ARCHIVE}.appointments x
+            WHERE patient_id = ? AND NOT EXISTS (SELECT 1 FROM main.appointments m WHERE m.id = x.id)
+            ORDER BY date DESC, time DESC
+        """
+        return db.fetch_all(query, (patient_id, patient_id), row_factory=ARCHIVED_APPOINTMENT_ROW)
+
+    @staticmethod
+    def get_billing_history(patient_id: int, columns: Sequence[str] | None = None) -> list[Billing]:
+        """Returns a patient's live and archived bills, newest first."""
+        select = select_columns(Billing, columns, required=("id", "date"))
+        query = f"""
+            SELECT {select} FROM main.billing WHERE patient_id = ?
+            UNION ALL
+            SELECT {select} FROM {ARCHIVE}.billing x
+            WHERE patient_id = ? AND NOT EXISTS (SELECT 1 FROM main.billing m WHERE m.id = x.id)
+            ORDER BY date DESC, id DESC
+        """
+        return db.fetch_all(query, (patient_id, patient_id), row_factory=ARCHIVED_BILLING_ROW)
+
+    @staticmethod
+    def get_archived_counts() -> dict[str, int]:
+        return {
+            table: (db.fetch_one(f"SELECT COUNT(*) FROM {ARCHIVE}.{table}") or (0,))[0]
+            for table in ("appointments", "billing")
+        }
@@ -1,7 +1,33 @@
-from database import Database, get_writable_db_path
+import json
+from collections.abc import Iterator, Sequence
+from datetime import date
+
+from config import FETCH_BATCH_SIZE, PAGE_SIZE, SEARCH_LIMIT
+from database import fts_match_query, get_database, model_row_factory, select_columns
 from models.billing import Billing
+from models.patient import Patient
+from utils.date_codec import to_ordinal
+from utils.page_keys import billing_key, billing_row_key
+
+db = get_database()
+BILLING_ROW = model_row_factory(Billing)
+
+# Read model for the billing grid: one indexed scan joined to patients and appointments,
+# selecting only the columns the grid displays
+BILLING_ROWS_SQL = """
+    SELECT b.id, p.id, p.name, p.gender, p.dob, a.id, a.date, a.time,
+           b.amount, b.date, b.status, b.services_rendered
+    FROM billing b
+    LEFT JOIN patients p ON p.id = b.patient_id
+    LEFT JOIN appointments a ON a.id = b.appointment_id
+"""
+
+def _to_billing_row(row) -> tuple:
+    bill_id, patient_id, name, gender, dob, appt_id, appt_date, appt_time, amount, date, status, services = row
+    patient = Patient(name=name, gender=gender, dob=dob).get_summary() if patient_id is not None else "Unknown"
+    appointment = f"{appt_date} {appt_time}" if appt_id is not None else "Unknown"
+    return (bill_id, patient, appointment, f"{amount:.2f}", date, status, services)
 
-db = Database(get_writable_db_path())
 
 class BillingDAO:
     @staticmethod
@@ -18,7 +44,23 @@ class BillingDAO:
             billing.status,
             billing.services_rendered,
         )
-        return db.execute_query(query, params)
+        billing_id = db.execute_insert(query, params)
+        if billing_id is None:
+            return False
+        billing.id = billing_id
+        return True
+
+    @staticmethod
+    def insert_many(billings: list[Billing]) -> bool:
+        query = """
+            INSERT INTO billing (patient_id, appointment_id, amount, date, status, services_rendered)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        params = [
+            (b.patient_id, b.appointment_id, b.amount, b.date, b.status, b.services_rendered)
+            for b in billings
+        ]
+        return db.execute_many(query, params)
 
     @staticmethod
     def update_billing(billing: Billing) -> bool:
@@ -44,21 +86,142 @@ class BillingDAO:
         return db.execute_query(query, (billing_id,))
 
     @staticmethod
-    def get_billing_by_id(billing_id: int) -> Billing | None:
-        query = "SELECT * FROM billing WHERE id = ?"
-        row = db.fetch_one(query, (billing_id,))
-        if row:
-            return Billing(*row)
-        return None
+    def get_billings_between(start: date, end: date, columns: Sequence[str] | None = None) -> list[Billing]:
+        """Returns bills dated from `start` to `end` inclusive, oldest first."""
+        query = f"""
+            SELECT {select_columns(Billing, columns)} FROM billing
+            WHERE date_ord BETWEEN ? AND ?
+            ORDER BY date_ord, id
+        """
+        return db.fetch_all(query, (to_ordinal(start), to_ordinal(end)), row_factory=BILLING_ROW)
+
+    @staticmethod
+    def get_billing_by_id(billing_id: int, columns: Sequence[str] | None = None) -> Billing | None:
+        query = f"SELECT {select_columns(Billing, columns)} FROM billing WHERE id = ?"
+        return db.fetch_one(query, (billing_id,), row_factory=BILLING_ROW)
+
+    @staticmethod
+    def get_billed_appointment_ids(appointment_ids: Sequence[int]) -> set[int]:
+        """Returns which of the listed appointments already have a bill."""
+        query = """
+            SELECT DISTINCT appointment_id FROM billing
+            WHERE appointment_id IN (SELECT value FROM json_each(?))
+        """
+        return {row[0] for row in db.fetch_all(query, (json.dumps(list(appointment_ids)),))}
+
+    @staticmethod
+    def get_billings_by_patient(patient_id: int, columns: Sequence[str] | None = None) -> list[Billing]:
+        query = f"SELECT {select_columns(Billing, columns)} FROM billing WHERE patient_id = ? ORDER BY date DESC"
+        return db.fetch_all(query, (patient_id,), row_factory=BILLING_ROW)
+
+    @staticmethod
+    def get_all_billings(columns: Sequence[str] | None = None) -> list[Billing]:
+        query = f"SELECT {select_columns(Billing, columns)} FROM billing ORDER BY date DESC"
+        return db.fetch_all(query, row_factory=BILLING_ROW)
+
+    @staticmethod
+    def iter_billings(batch_size: int = FETCH_BATCH_SIZE, columns: Sequence[str] | None = None) -> Iterator[Billing]:
+        """Streams every billing in id order without loading the whole table."""
+        query = f"SELECT {select_columns(Billing, columns)} FROM billing ORDER BY id"
+        return db.iter_rows(query, batch_size=batch_size, row_factory=BILLING_ROW)
+
+    @staticmethod
+    def get_billings_page(after_key: tuple | None = None, limit: int = PAGE_SIZE,
+                          columns: Sequence[str] | None = None) -> list[Billing]:
+        """Returns up to `limit` billings, newest first, starting after `after_key`."""
+        select = select_columns(Billing, columns, required=("id", "date"))
+        if after_key is None:
+            query = f"SELECT {select} FROM billing ORDER BY date DESC, id DESC LIMIT ?"
+            return db.fetch_all(query, (limit,), row_factory=BILLING_ROW)
+        query = f"""
+            SELECT {select} FROM billing
+            WHERE (date, id) < (?, ?)
+            ORDER BY date DESC, id DESC LIMIT ?
+        """
+        return db.fetch_all(query, (*after_key, limit), row_factory=BILLING_ROW)
 
     @staticmethod
-    def get_billings_by_patient(patient_id: int) -> list[Billing]:
-        query = "SELECT * FROM billing WHERE patient_id = ? ORDER BY date DESC"
-        rows = db.fetch_all(query, (patient_id,))
-        return [Billing(*row) for row in rows]
+    def page_key(billing: Billing) -> tuple:
+        return billing_key(billing)
 
     @staticmethod
-    def get_all_billings() -> list[Billing]:
-        query = "SELECT * FROM billing ORDER BY date DESC"
-        rows = db.fetch_all(query)
-        return [Billing(*row) for row in rows]
\ No newline at end of file
+    def get_billing_rows_page(after_key: tuple | None = None, limit: int = PAGE_SIZE) -> list[tuple]:
+        """Returns display rows (id, patient, appointment, amount, date, status, services) for the billing grid."""
+        if after_key is None:
+            query = f"{BILLING_ROWS_SQL} ORDER BY b.date DESC, b.id DESC LIMIT ?"
+            rows = db.fetch_all(query, (limit,))
+        else:
+            query = f"""
+                {BILLING_ROWS_SQL}
+                WHERE (b.date, b.id) < (?, ?)
+                ORDER BY b.date DESC, b.id DESC LIMIT ?
+            """
+            rows = db.fetch_all(query, (*after_key, limit))
+        return [_to_billing_row(row) for row in rows]
+
+    @staticmethod
+    def row_page_key(row: tuple) -> tuple:
+        return billing_row_key(row)
+
+    @staticmethod
+    def get_overdue_billings(today: str, columns: Sequence[str] | None = None) -> list[Billing]:
+        """Returns open bills dated before `today`, oldest first."""
+        # The status filter must match idx_billing_open_date's WHERE clause for the index to apply
+        query = f"""
+            SELECT {select_columns(Billing, columns)} FROM billing
+            WHERE status NOT IN ('Paid', 'Cancelled') AND date < ?
+            ORDER BY date, id
+        """
+        return db.fetch_all(query, (today,), row_factory=BILLING_ROW)
+
+    @staticmethod
+    def get_overdue_aging(today: str) -> list[tuple]:
+        """Returns (bucket, count, total) for open bills dated before `today`, grouped by days overdue."""
+        query = """
+            SELECT CASE
+                       WHEN age <= 30 THEN '0-30'
+                       WHEN age <= 60 THEN '31-60'
+                       WHEN age <= 90 THEN '61-90'
+                       ELSE '90+'
+                   END AS bucket,
+                   COUNT(*),
+                   IFNULL(SUM(amount), 0)
+            FROM (
+                SELECT CAST(julianday(?) - julianday(date) AS INTEGER) AS age, amount
+                FROM billing
+                WHERE status NOT IN ('Paid', 'Cancelled') AND date < ?
+            )
+            GROUP BY bucket
+        """
+        return db.fetch_all(query, (today, today))
+
+    @staticmethod
+    def search_billings(text: str, limit: int = SEARCH_LIMIT, columns: Sequence[str] | None = None) -> list[Billing]:
+        """Full-text search over services rendered, best matches first."""
+        match = fts_match_query(text)
+        if match is None:
+            return []
+        query = f"""
+            SELECT {select_columns(Billing, columns, prefix="b.")} FROM billing_fts f
+            JOIN billing b ON b.id = f.rowid
+            WHERE billing_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """
+        return db.fetch_all(query, (match, limit), row_factory=BILLING_ROW)
+
+    @staticmethod
+    def search_billing_rows(text: str, limit: int = SEARCH_LIMIT) -> list[tuple]:
+        """Like search_billings, but returns display rows for the billing grid."""
+        match = fts_match_query(text)
+        if match is None:
+            return []
+        query = f"""
+            {BILLING_ROWS_SQL}
+            JOIN billing_fts f ON f.rowid = b.id
+            WHERE billing_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """
+        rows = db.fetch_all(query, (match, limit))
+        return [_to_billing_row(row) for row in rows]
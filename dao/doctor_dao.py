@@ -1,7 +1,12 @@
-from database import Database, get_writable_db_path
+from collections.abc import Sequence
+
+from config import PAGE_SIZE
+from database import get_database, model_row_factory, select_columns
 from models.doctor import Doctor
+from utils.page_keys import doctor_key
 
-db = Database(get_writable_db_path())
+db = get_database()
+DOCTOR_ROW = model_row_factory(Doctor)
 
 class DoctorDAO:
     @staticmethod
@@ -29,15 +34,26 @@ class DoctorDAO:
         return db.execute_query(query, (doctor_id,))
 
     @staticmethod
-    def get_doctor_by_id(doctor_id: int) -> Doctor | None:
-        query = "SELECT * FROM doctors WHERE id = ?"
-        row = db.fetch_one(query, (doctor_id,))
-        if row:
-            return Doctor(*row)
-        return None
+    def get_doctor_by_id(doctor_id: int, columns: Sequence[str] | None = None) -> Doctor | None:
+        query = f"SELECT {select_columns(Doctor, columns)} FROM doctors WHERE id = ?"
+        return db.fetch_one(query, (doctor_id,), row_factory=DOCTOR_ROW)
+
+    @staticmethod
+    def get_all_doctors(columns: Sequence[str] | None = None) -> list[Doctor]:
+        query = f"SELECT {select_columns(Doctor, columns)} FROM doctors ORDER BY name"
+        return db.fetch_all(query, row_factory=DOCTOR_ROW)
+
+    @staticmethod
+    def get_doctors_page(after_key: tuple | None = None, limit: int = PAGE_SIZE,
+                         columns: Sequence[str] | None = None) -> list[Doctor]:
+        """Returns up to `limit` doctors ordered by name, starting after `after_key`."""
+        select = select_columns(Doctor, columns, required=("id", "name"))
+        if after_key is None:
+            query = f"SELECT {select} FROM doctors ORDER BY name, id LIMIT ?"
+            return db.fetch_all(query, (limit,), row_factory=DOCTOR_ROW)
+        query = f"SELECT {select} FROM doctors WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?"
+        return db.fetch_all(query, (*after_key, limit), row_factory=DOCTOR_ROW)
 
     @staticmethod
-    def get_all_doctors() -> list[Doctor]:
-        query = "SELECT * FROM doctors ORDER BY name"
-        rows = db.fetch_all(query)
-        return [Doctor(*row) for row in rows]
\ No newline at end of file
+    def page_key(doctor: Doctor) -> tuple:
+        return doctor_key(doctor)
@@ -1,7 +1,12 @@
-from database import Database, get_writable_db_path
+from collections.abc import Iterator, Sequence
+
+from config import FETCH_BATCH_SIZE, PAGE_SIZE, SEARCH_LIMIT
+from database import fts_match_query, get_database, model_row_factory, select_columns
 from models.patient import Patient
+from utils.page_keys import patient_key
 
-db = Database(get_writable_db_path())
+db = get_database()
+PATIENT_ROW = model_row_factory(Patient)
 
 class PatientDAO:
     @staticmethod
@@ -17,7 +22,23 @@ class PatientDAO:
             patient.contact_info,
             patient.address
         )
-        return db.execute_query(query, params)
+        patient_id = db.execute_insert(query, params)
+        if patient_id is None:
+            return False
+        patient.id = patient_id
+        return True
+
+    @staticmethod
+    def insert_many(patients: list[Patient]) -> bool:
+        query = """
+            INSERT INTO patients (name, dob, gender, contact_info, address)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        params = [
+            (p.name, p.dob, p.gender, p.contact_info, p.address)
+            for p in patients
+        ]
+        return db.execute_many(query, params)
 
     @staticmethod
     def update_patient(patient: Patient) -> bool:
@@ -42,15 +63,47 @@ class PatientDAO:
         return db.execute_query(query, (patient_id,))
 
     @staticmethod
-    def get_patient_by_id(patient_id: int) -> Patient | None:
-        query = "SELECT * FROM patients WHERE id = ?"
-        row = db.fetch_one(query, (patient_id,))
-        if row:
-            return Patient(*row)
-        return None
+    def get_patient_by_id(patient_id: int, columns: Sequence[str] | None = None) -> Patient | None:
+        query = f"SELECT {select_columns(Patient, columns)} FROM patients WHERE id = ?"
+        return db.fetch_one(query, (patient_id,), row_factory=PATIENT_ROW)
 
     @staticmethod
-    def get_all_patients() -> list[Patient]:
-        query = "SELECT * FROM patients ORDER BY name"
-        rows = db.fetch_all(query)
-        return [Patient(*row) for row in rows]
\ No newline at end of file
+    def get_all_patients(columns: Sequence[str] | None = None) -> list[Patient]:
+        query = f"SELECT {select_columns(Patient, columns)} FROM patients ORDER BY name"
+        return db.fetch_all(query, row_factory=PATIENT_ROW)
+
+    @staticmethod
+    def iter_patients(batch_size: int = FETCH_BATCH_SIZE, columns: Sequence[str] | None = None) -> Iterator[Patient]:
+        """Streams every patient in id order without loading the whole table."""
+        query = f"SELECT {select_columns(Patient, columns)} FROM patients ORDER BY id"
+        return db.iter_rows(query, batch_size=batch_size, row_factory=PATIENT_ROW)
+
+    @staticmethod
+    def get_patients_page(after_key: tuple | None = None, limit: int = PAGE_SIZE,
+                          columns: Sequence[str] | None = None) -> list[Patient]:
+        """Returns up to `limit` patients ordered by name, starting after `after_key`."""
+        select = select_columns(Patient, columns, required=("id", "name"))
+        if after_key is None:
+            query = f"SELECT {select} FROM patients ORDER BY name, id LIMIT ?"
+            return db.fetch_all(query, (limit,), row_factory=PATIENT_ROW)
+        query = f"SELECT {select} FROM patients WHERE (name, id) > (?, ?) ORDER BY name, id LIMIT ?"
+        return db.fetch_all(query, (*after_key, limit), row_factory=PATIENT_ROW)
+
+    @staticmethod
+    def page_key(patient: Patient) -> tuple:
+        return patient_key(patient)
+
+    @staticmethod
+    def search_patients(text: str, limit: int = SEARCH_LIMIT, columns: Sequence[str] | None = None) -> list[Patient]:
+        """Full-text search over name, contact info and address, best matches first."""
+        match = fts_match_query(text)
+        if match is None:
+            return []
+        query = f"""
+            SELECT {select_columns(Patient, columns, prefix="p.")} FROM patients_fts f
+            JOIN patients p ON p.id = f.rowid
+            WHERE patients_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        """
+        return db.fetch_all(query, (match, limit), row_factory=PATIENT_ROW)
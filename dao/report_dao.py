@@ -0,0 +1,150 @@
+import json
+
+from database import get_database
+
+db = get_database()
+
+# Rebuild the rollup rows for a JSON array of dates (bound twice) from the base tables,
+# plus whatever rows archival has already moved out of them
+REFRESH_REVENUE_SQL = """
+    INSERT INTO revenue_daily (date, doctor_id, status, bills, amount)
+    SELECT date, doctor_id, status, SUM(bills), SUM(amount) FROM (
+        SELECT b.date AS date, IFNULL(a.doctor_id, 0) AS doctor_id, IFNULL(b.status, '') AS status,
+               COUNT(*) AS bills, IFNULL(SUM(b.amount), 0) AS amount
+        FROM billing b LEFT JOIN appointments a ON a.id = b.appointment_id
+        WHERE b.date IN (SELECT value FROM json_each(?))
+        GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT date, doctor_id, status, bills, amount FROM revenue_daily_archived
+        WHERE date IN (SELECT value FROM json_each(?))
+    )
+    GROUP BY 1, 2, 3
+"""
+
+REFRESH_APPOINTMENTS_SQL = """
+    INSERT INTO appointment_daily (date, doctor_id, status, appointments, minutes)
+    SELECT date, doctor_id, status, SUM(appointments), SUM(minutes) FROM (
+        SELECT date, IFNULL(doctor_id, 0) AS doctor_id, IFNULL(status, '') AS status,
+               COUNT(*) AS appointments, IFNULL(SUM(duration), 0) AS minutes
+        FROM appointments
+        WHERE date IN (SELECT value FROM json_each(?))
+        GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT date, doctor_id, status, appointments, minutes FROM appointment_daily_archived
+        WHERE date IN (SELECT value FROM json_each(?))
+    )
+    GROUP BY 1, 2, 3
+"""
+
+# Paid bills count as collected revenue
+PAID_AMOUNT = "SUM(CASE WHEN r.status = 'Paid' THEN r.amount ELSE 0 END)"
+
+class ReportDAO:
+    @staticmethod
+    def get_watermark() -> int:
+        row = db.fetch_one("SELECT seq FROM rollup_watermarks WHERE name = 'daily'")
+        return row[0] if row else 0
+
+    @staticmethod
+    def refresh_rollups() -> int:
+        """Folds journalled changes past the watermark into the daily rollups.
+
+        Only the days named in rollup_changes are recomputed, each from its
+        indexed date range. Returns the number of stale days folded in.
+        """
+        # Cheap read first so an idle refresh never takes the write lock
+        if not db.fetch_one("SELECT 1 FROM rollup_changes WHERE seq > ? LIMIT 1", (ReportDAO.get_watermark(),)):
+            return 0
+        with db.transaction():
+            watermark = ReportDAO.get_watermark()
+            changes = db.fetch_all(
+                "SELECT seq, source, date FROM rollup_changes WHERE seq > ? ORDER BY seq", (watermark,)
+            )
+            if not changes:
+                return 0
+
+            billing_days = json.dumps(sorted({date for _, source, date in changes if source == "billing"}))
+            appointment_days = json.dumps(sorted({date for _, source, date in changes if source == "appointments"}))
+            last_seq = changes[-1][0]
+
+            db.execute_query("DELETE FROM revenue_daily WHERE date IN (SELECT value FROM json_each(?))", (billing_days,))
+            db.execute_query(REFRESH_REVENUE_SQL, (billing_days, billing_days))
+            db.execute_query(
+                "DELETE FROM appointment_daily WHERE date IN (SELECT value FROM json_each(?))", (appointment_days,)
+            )
+            db.execute_query(REFRESH_APPOINTMENTS_SQL, (appointment_days, appointment_days))
+            db.execute_query("UPDATE rollup_watermarks SET seq = ? WHERE name = 'daily'", (last_seq,))
+            db.execute_query("DELETE FROM rollup_changes WHERE seq <= ?", (last_seq,))
+            return len(changes)
+
+    @staticmethod
+    def get_revenue_by_day(start: str, end: str) -> list[tuple]:
+        """Returns (date, bills, billed, collected) for each day with bills in [start, end]."""
+        query = f"""
+            SELECT r.date, SUM(r.bills), SUM(r.amount), {PAID_AMOUNT}
+            FROM revenue_daily r
+            WHERE r.date BETWEEN ? AND ?
+            GROUP BY r.date ORDER BY r.date
+        """
+        return db.fetch_all(query, (start, end))
+
+    @staticmethod
+    def get_revenue_by_month(start: str, end: str) -> list[tuple]:
+        """Returns (YYYY-MM, bills, billed, collected) for each month in [start, end]."""
+        query = f"""
+            SELECT substr(r.date, 1, 7) AS month, SUM(r.bills), SUM(r.amount), {PAID_AMOUNT}
+            FROM revenue_daily r
+            WHERE r.date BETWEEN ? AND ?
+            GROUP BY month ORDER BY month
+        """
+        return db.fetch_all(query, (start, end))
+
+    @staticmethod
+    def get_revenue_by_doctor(start: str, end: str) -> list[tuple]:
+        """Returns (doctor_id, name, specialty, bills, billed, collected), highest billed first."""
+        query = f"""
+            SELECT r.doctor_id, d.name, d.specialty, SUM(r.bills), SUM(r.amount), {PAID_AMOUNT}
+            FROM revenue_daily r
+            LEFT JOIN doctors d ON d.id = r.doctor_id
+            WHERE r.date BETWEEN ? AND ?
+            GROUP BY r.doctor_id
+            ORDER BY SUM(r.amount) DESC
+        """
+        return db.fetch_all(query, (start, end))
+
+    @staticmethod
+    def get_revenue_by_specialty(start: str, end: str) -> list[tuple]:
+        """Returns (specialty, bills, billed, collected), highest billed first."""
+        query = f"""
+            SELECT IFNULL(d.specialty, '') AS specialty, SUM(r.bills), SUM(r.amount), {PAID_AMOUNT}
+            FROM revenue_daily r
+            LEFT JOIN doctors d ON d.id = r.doctor_id
+            WHERE r.date BETWEEN ? AND ?
+            GROUP BY specialty
+            ORDER BY SUM(r.amount) DESC
+        """
+        return db.fetch_all(query, (start, end))
+
+    @staticmethod
+    def get_revenue_by_status(start: str, end: str) -> list[tuple]:
+        """Returns (status, bills, amount) for bills dated in [start, end]."""
+        query = """
+            SELECT r.status, SUM(r.bills), SUM(r.amount)
+            FROM revenue_daily r
+            WHERE r.date BETWEEN ? AND ?
+            GROUP BY r.status ORDER BY r.status
+        """
+        return db.fetch_all(query, (start, end))
+
+    @staticmethod
+    def get_appointment_volume(start: str, end: str) -> list[tuple]:
+        """Returns (doctor_id, name, specialty, status, appointments, minutes) for [start, end]."""
+        query = """
+            SELECT v.doctor_id, d.name, d.specialty, v.status, SUM(v.appointments), SUM(v.minutes)
+            FROM appointment_daily v
+            LEFT JOIN doctors d ON d.id = v.doctor_id
+            WHERE v.date BETWEEN ? AND ?
+            GROUP BY v.doctor_id, v.status
+            ORDER BY v.doctor_id, v.status
+        """
+        return db.fetch_all(query, (start, end))
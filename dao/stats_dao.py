@@ -0,0 +1,22 @@
+from database import get_database
+
+db = get_database()
+
+class StatsDAO:
+    @staticmethod
+    def get_counters() -> dict[str, float]:
+        query = "SELECT name, value FROM summary_counters"
+        rows = db.fetch_all(query)
+        return {name: value for name, value in rows}
+
+    @staticmethod
+    def get_appointment_count_for_date(date: str) -> int:
+        query = "SELECT count FROM appointment_day_counts WHERE date = ?"
+        row = db.fetch_one(query, (date,))
+        return row[0] if row else 0
+
+    @staticmethod
+    def get_collected_between(start: str, end: str) -> float:
+        query = "SELECT IFNULL(SUM(amount), 0) FROM collected_daily WHERE date BETWEEN ? AND ?"
+        row = db.fetch_one(query, (start, end))
+        return row[0] if row else 0.0
@@ -0,0 +1,32 @@
+from database import get_database, model_row_factory, select_columns
+from models.working_hours import WorkingHours
+
+db = get_database()
+WORKING_HOURS_ROW = model_row_factory(WorkingHours)
+
+class WorkingHoursDAO:
+    @staticmethod
+    def get_hours_for_doctor(doctor_id: int) -> list[WorkingHours]:
+        query = f"""
+            SELECT {select_columns(WorkingHours)} FROM doctor_hours
+            WHERE doctor_id = ? ORDER BY weekday, start_time
+        """
+        return db.fetch_all(query, (doctor_id,), row_factory=WORKING_HOURS_ROW)
+
+    @staticmethod
+    def get_all_hours() -> list[WorkingHours]:
+        query = f"SELECT {select_columns(WorkingHours)} FROM doctor_hours ORDER BY doctor_id, weekday, start_time"
+        return db.fetch_all(query, row_factory=WORKING_HOURS_ROW)
+
+    @staticmethod
+    def replace_hours(doctor_id: int, hours: list[WorkingHours]) -> bool:
+        """Swaps a doctor's whole weekly template in one transaction."""
+        with db.transaction():
+            if not db.execute_query("DELETE FROM doctor_hours WHERE doctor_id = ?", (doctor_id,)):
+                return False
+            query = """
+                INSERT INTO doctor_hours (doctor_id, weekday, start_time, end_time)
+                VALUES (?, ?, ?, ?)
+            """
+            params = [(doctor_id, h.weekday, h.start_time, h.end_time) for h in hours]
+            return db.execute_many(query, params)
@@ -1,7 +1,17 @@
 import sqlite3
 import os
+import re
 import sys
 import shutil
+import threading
+import time
+from contextlib import contextmanager
+from operator import itemgetter
+
+import migrations
+from config import (DB_BUSY_TIMEOUT, DB_JOURNAL_MODE, DB_STATEMENT_CACHE_SIZE, FETCH_BATCH_SIZE, QUERY_MONITOR_ENABLED,
+                    user_data_dir)
+from utils.query_monitor import calling_method, query_monitor
 
 def resource_path(relative_path):
     """ Get path to resource, works for dev and for PyInstaller bundles """
@@ -10,8 +20,7 @@ def resource_path(relative_path):
 
 def get_writable_db_path():
     """ Returns a user-writable path for the database file """
-    appdata = os.getenv('APPDATA') or os.path.expanduser("~")
-    target_dir = os.path.join(appdata, "ClinicCMS")
+    target_dir = user_data_dir()
     os.makedirs(target_dir, exist_ok=True)
 
     bundled_db = resource_path("clinic.db")
@@ -22,63 +31,394 @@ def get_writable_db_path():
 
     return target_db
 
+def model_row_factory(model):
+    """Returns a sqlite3 row factory that builds `model` objects by column name.
+
+    Columns are matched to the model's __slots__, so queries may select them in
+    any order or leave some out; missing fields take the constructor defaults.
+    """
+    # (description, builder) for the last query seen; swapped as one tuple so
+    # worker threads sharing the factory never pair a builder with the wrong columns
+    last = (None, None)
+
+    def factory(cursor, row):
+        nonlocal last
+        description, build = last
+        if cursor.description is not description:
+            description = cursor.description
+            names = tuple(column[0] for column in description)
+            if names == model.__slots__:
+                build = lambda values: model(*values)
+            else:
+                # Line each field up with its column, or with the constructor default
+                # appended after the row, so building stays one positional call
+                defaults = model.__init__.__defaults__
+                pick = itemgetter(*(
+                    names.index(name) if name in names else len(names) + i
+                    for i, name in enumerate(model.__slots__)
+                ))
+                build = lambda values: model(*pick(values + defaults))
+            last = (description, build)
+        return build(row)
+
+    return factory
+
+def select_columns(model, columns=None, required=("id",), prefix=""):
+    """Returns a SELECT column list for `model`, limited to `columns` when given.
+
+    Names are checked against the model's fields so they are safe to format into
+    SQL; `required` columns (ids, sort keys) are always included.
+    """
+    names = model.__slots__
+    if columns is not None:
+        unknown = set(columns) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown {model.__name__} column(s): {', '.join(sorted(unknown))}")
+        wanted = set(columns) | set(required)
+        names = [name for name in names if name in wanted]
+    return ", ".join(prefix + name for name in names)
+
+def fts_match_query(text):
+    """Turns free text into an FTS5 MATCH expression where every word is a prefix term.
+
+    "jo smi" becomes '"jo"* "smi"*', i.e. rows containing words starting with
+    both. Returns None when the text has no searchable words.
+    """
+    words = re.findall(r"\w+", text or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
 class Database:
-    def __init__(self, db_path=None):
+    def __init__(self, db_path=None, timeout=DB_BUSY_TIMEOUT, cached_statements=DB_STATEMENT_CACHE_SIZE,
+                 journal_mode=DB_JOURNAL_MODE, monitor=None):
         self.db_path = db_path or get_writable_db_path()
+        self.timeout = timeout  # seconds to wait on a locked database
+        self.cached_statements = cached_statements
+        self.journal_mode = journal_mode
+        self.monitor = monitor  # a QueryMonitor that times every statement, or None
 
-    def initialize_schema(self, sql_file='schema.sql'):
-        conn = self.connect()
+        # One connection per thread, kept open for the lifetime of the Database
+        self._local = threading.local()
+        self._pool = []
+        self._pool_lock = threading.Lock()
+
+    def initialize_schema(self):
+        """Brings the database up to the latest schema version, skipping applied migrations."""
+        conn = self.get_connection()
         try:
-            with open(resource_path(sql_file), 'r') as f:
-                conn.executescript(f.read())
+            applied = migrations.apply_migrations(conn)
+            if applied:
+                print(f"[SCHEMA] Applied migrations {applied}")
         except Exception as e:
             print(f"[SCHEMA ERROR] {e}")
-        finally:
-            conn.close()
 
     def connect(self):
-        """Creates a new connection to the SQLite database."""
-        return sqlite3.connect(self.db_path)
+        """Creates a new, configured connection to the SQLite database."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.journal_mode.upper() == "WAL":
+            # WAL only needs to sync at checkpoints to stay consistent
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def get_connection(self):
+        """Returns the calling thread's pooled connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            with self._pool_lock:
+                self._pool.append(conn)
+        return conn
+
+    def close(self):
+        """Closes every pooled connection, from whichever thread opened it."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"[DB ERROR] {e}")
+        self._local = threading.local()
+
+    @contextmanager
+    def attached(self, path, alias):
+        """Attaches another database file as `alias` on the calling thread's connection.
+
+        Tables in it are then reachable as alias.table for the rest of the block.
+        SQLite cannot attach inside a transaction, so open this before transaction().
+        A block nested in one that already attached `alias` reuses that attachment.
+        """
+        if not alias.isidentifier():
+            raise ValueError(f"Invalid database alias: {alias!r}")
+        conn = self.get_connection()
+        if any(row[1] == alias for row in conn.execute("PRAGMA database_list")):
+            yield conn
+            return
+        conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+        try:
+            yield conn
+        finally:
+            try:
+                conn.execute(f"DETACH DATABASE {alias}")
+            except sqlite3.Error as e:
+                self._report_error(e, f"DETACH DATABASE {alias}")
+
+    @contextmanager
+    def transaction(self):
+        """Runs the block in one write transaction on the calling thread's connection.
+
+        BEGIN IMMEDIATE takes the write lock up front, so a read-check-write
+        sequence inside the block cannot interleave with another terminal's.
+        Writes made through execute_* inside the block are committed together
+        when it exits; an exception or a failed write rolls all of them back.
+
+        Nested calls open a SAVEPOINT instead: an exception or failed write
+        inside the nested block undoes only that block's writes, and the outer
+        block carries on (or not) as it sees fit. Everything still commits once,
+        when the outermost block exits.
+        """
+        conn = self.get_connection()
+        depth = getattr(self._local, "depth", 0)
+        if depth:
+            with self._savepoint(conn, depth):
+                yield conn
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth, self._local.failed, self._local.on_commit = 1, False, []
+        committed = False
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            if self._local.failed:
+                conn.rollback()
+            else:
+                conn.commit()
+                committed = True
+        finally:
+            self._local.depth = 0
+            callbacks, self._local.on_commit = self._local.on_commit, []
+        if committed:
+            self._run_callbacks(callbacks)
+
+    @contextmanager
+    def _savepoint(self, conn, depth):
+        name = f"sp_{depth}"
+        conn.execute(f"SAVEPOINT {name}")
+        outer_failed, outer_callbacks = self._local.failed, self._local.on_commit
+        self._local.depth, self._local.failed, self._local.on_commit = depth + 1, False, []
+        keep = False
+        try:
+            yield
+            keep = not self._local.failed
+        finally:
+            # A failure that aborted the whole transaction leaves no savepoint to roll back to
+            if conn.in_transaction:
+                if not keep:
+                    conn.execute(f"ROLLBACK TO {name}")
+                conn.execute(f"RELEASE {name}")
+            if keep:
+                outer_callbacks.extend(self._local.on_commit)
+            self._local.depth, self._local.failed, self._local.on_commit = depth, outer_failed, outer_callbacks
+
+    def on_commit(self, callback):
+        """Runs `callback` once the calling thread's current transaction commits.
+
+        Used for caches and in-memory indexes that must not see writes which
+        are later rolled back. Outside a transaction the write has already
+        committed, so the callback runs straight away; callbacks registered in
+        a block that rolls back are dropped.
+        """
+        if getattr(self._local, "depth", 0):
+            self._local.on_commit.append(callback)
+        else:
+            self._run_callbacks([callback])
+
+    @staticmethod
+    def _run_callbacks(callbacks):
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[DB ERROR] After-commit callback failed: {e}")
+
+    def _finish_write(self, conn, error=None, query=None):
+        """Commits or rolls back a single write, unless a transaction() block owns it."""
+        if getattr(self._local, "depth", 0):
+            if error is not None:
+                self._local.failed = True
+        elif error is None:
+            conn.commit()
+        else:
+            conn.rollback()
+        if error is not None:
+            self._report_error(error, query)
+
+    def _report_error(self, error, query):
+        if self.monitor is not None:
+            self.monitor.log_error(error, query)
+        else:
+            print(f"[DB ERROR] {error}")
+
+    def _record(self, conn, query, params, seconds, rows, caller=None):
+        if self.monitor is not None:
+            self.monitor.record(conn, query, params, seconds, rows, caller)
 
     def execute_query(self, query, params=None):
         """Executes INSERT, UPDATE, DELETE queries."""
-        conn = self.connect()
+        conn = self.get_connection()
         cursor = conn.cursor()
+        started = time.perf_counter()
         try:
             cursor.execute(query, params or [])
-            conn.commit()
+            self._finish_write(conn)
+            self._record(conn, query, params or [], time.perf_counter() - started, max(cursor.rowcount, 0))
+            return True
+        except sqlite3.Error as e:
+            self._finish_write(conn, e, query)
+            return False
+        finally:
+            cursor.close()
+
+    def execute_insert(self, query, params=None):
+        """Executes an INSERT and returns the new row id, or None on failure."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        try:
+            cursor.execute(query, params or [])
+            self._finish_write(conn)
+            self._record(conn, query, params or [], time.perf_counter() - started, max(cursor.rowcount, 0))
+            return cursor.lastrowid
+        except sqlite3.Error as e:
+            self._finish_write(conn, e, query)
+            return None
+        finally:
+            cursor.close()
+
+    def execute_many(self, query, params_seq):
+        """Executes one statement for every parameter set, committing once for the whole batch."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        try:
+            cursor.executemany(query, params_seq)
+            self._finish_write(conn)
+            self._record(conn, query, None, time.perf_counter() - started, max(cursor.rowcount, 0))
             return True
         except sqlite3.Error as e:
-            print(f"[DB ERROR] {e}")
+            self._finish_write(conn, e, query)
             return False
         finally:
             cursor.close()
-            conn.close()
 
-    def fetch_all(self, query, params=None):
-        """Fetches all results from a SELECT query."""
-        conn = self.connect()
+    def fetch_all(self, query, params=None, row_factory=None):
+        """Fetches all results from a SELECT query, built with `row_factory` if given."""
+        conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = row_factory
+        started = time.perf_counter()
         try:
             cursor.execute(query, params or [])
-            return cursor.fetchall()
+            rows = cursor.fetchall()
+            self._record(conn, query, params or [], time.perf_counter() - started, len(rows))
+            return rows
         except sqlite3.Error as e:
-            print(f"[DB ERROR] {e}")
+            self._report_error(e, query)
             return []
         finally:
             cursor.close()
-            conn.close()
 
-    def fetch_one(self, query, params=None):
+    def fetch_one(self, query, params=None, row_factory=None):
         """Fetches a single result from a SELECT query."""
-        conn = self.connect()
+        conn = self.get_connection()
         cursor = conn.cursor()
+        cursor.row_factory = row_factory
+        started = time.perf_counter()
         try:
             cursor.execute(query, params or [])
-            return cursor.fetchone()
+            row = cursor.fetchone()
+            self._record(conn, query, params or [], time.perf_counter() - started, 0 if row is None else 1)
+            return row
         except sqlite3.Error as e:
-            print(f"[DB ERROR] {e}")
+            self._report_error(e, query)
             return None
         finally:
             cursor.close()
-            conn.close()
\ No newline at end of file
+
+    def iter_rows(self, query, params=None, batch_size=FETCH_BATCH_SIZE, row_factory=None):
+        """Yields rows from a SELECT query, fetching `batch_size` rows at a time.
+
+        The statement is recorded once the rows run out, timed over the
+        fetches only, not the time the caller spends on each batch. A
+        sqlite3.Error part way through is logged and re-raised, so a caller
+        never mistakes a cut-short stream for the whole table.
+        """
+        # Resolved now: by the time the rows are consumed the DAO method has returned
+        caller = calling_method() if self.monitor is not None else None
+        return self._iter_rows(query, params, batch_size, row_factory, caller)
+
+    def _iter_rows(self, query, params, batch_size, row_factory, caller):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.row_factory = row_factory
+        fetching, count = 0.0, 0
+        try:
+            started = time.perf_counter()
+            cursor.execute(query, params or [])
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                fetching += time.perf_counter() - started
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+                started = time.perf_counter()
+            self._record(conn, query, params or [], fetching, count, caller)
+        except sqlite3.Error as e:
+            self._report_error(e, query)
+            raise
+        finally:
+            cursor.close()
+
+
+_shared_db = None
+_shared_db_lock = threading.Lock()
+
+def get_database():
+    """Returns the process-wide Database, resolving the writable path only once."""
+    global _shared_db
+    if _shared_db is None:
+        with _shared_db_lock:
+            if _shared_db is None:
+                _shared_db = Database(get_writable_db_path(), monitor=default_monitor())
+    return _shared_db
+
+def default_monitor():
+    return query_monitor if QUERY_MONITOR_ENABLED else None
+
+def configure_database(db_path, **options):
+    """Points get_database() at `db_path` instead of the per-user database.
+
+    The DAO modules bind the shared Database when they are imported, so this
+    must run before anything imports them (the benchmarks use it this way).
+    """
+    global _shared_db
+    with _shared_db_lock:
+        if _shared_db is not None:
+            _shared_db.close()
+        options.setdefault("monitor", default_monitor())
+        _shared_db = Database(db_path, **options)
+    return _shared_db
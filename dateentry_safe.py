@@ -1,7 +1,20 @@
 import tkinter as tk
 import tkinter.ttk as ttk
-from tkcalendar import DateEntry as TkDateEntry
 
-class SafeDateEntry(TkDateEntry):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+# tkcalendar is slow to import and only needed once a date picker is actually
+# built, so SafeDateEntry is created on first access instead of at import time.
+_SafeDateEntry = None
+
+def __getattr__(name):
+    global _SafeDateEntry
+    if name != "SafeDateEntry":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _SafeDateEntry is None:
+        from tkcalendar import DateEntry as TkDateEntry
+
+        class SafeDateEntry(TkDateEntry):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+
+        _SafeDateEntry = SafeDateEntry
+    return _SafeDateEntry
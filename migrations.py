@@ -0,0 +1,339 @@
+"""Numbered schema migrations, tracked with PRAGMA user_version.
+
+Each migration runs once, inside its own transaction, and records itself in
+the schema_version table. Startup only pays for a single PRAGMA read once the
+database is up to date.
+"""
+import sqlite3
+from datetime import datetime
+
+from config import resource_path
+
+class Migration:
+    def __init__(self, version, description, sql=None, sql_file=None):
+        self.version = version
+        self.description = description
+        self.sql = sql
+        self.sql_file = sql_file
+
+    def load_sql(self):
+        if self.sql_file:
+            with open(resource_path(self.sql_file), 'r') as f:
+                return f.read()
+        return self.sql
+
+    def __repr__(self):
+        return f"<Migration version={self.version} description={self.description}>"
+
+
+# Append new migrations at the end; never edit or renumber one that has shipped.
+MIGRATIONS = [
+    Migration(1, "Baseline tables and summary counters", sql_file="schema.sql"),
+    Migration(2, "Indexes for patient, doctor and date lookups", sql="""
+        CREATE INDEX IF NOT EXISTS idx_appointments_patient ON appointments(patient_id, date, time);
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_slot ON appointments(doctor_id, date, time);
+        CREATE INDEX IF NOT EXISTS idx_appointments_date_time ON appointments(date, time);
+        CREATE INDEX IF NOT EXISTS idx_billing_patient ON billing(patient_id, date);
+        CREATE INDEX IF NOT EXISTS idx_billing_status_date ON billing(status, date);
+        CREATE INDEX IF NOT EXISTS idx_billing_date ON billing(date);
+        CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(name);
+    """),
+    Migration(3, "Partial index over open bills for overdue and aging queries", sql="""
+        CREATE INDEX IF NOT EXISTS idx_billing_open_date ON billing(date)
+            WHERE status NOT IN ('Paid', 'Cancelled');
+    """),
+    Migration(4, "Full-text search over patients and billing services", sql="""
+        CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+            name, contact_info, address,
+            content='patients', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS patients_fts_insert AFTER INSERT ON patients BEGIN
+            INSERT INTO patients_fts (rowid, name, contact_info, address)
+            VALUES (NEW.id, NEW.name, NEW.contact_info, NEW.address);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS patients_fts_delete AFTER DELETE ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, name, contact_info, address)
+            VALUES ('delete', OLD.id, OLD.name, OLD.contact_info, OLD.address);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS patients_fts_update AFTER UPDATE OF name, contact_info, address ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, name, contact_info, address)
+            VALUES ('delete', OLD.id, OLD.name, OLD.contact_info, OLD.address);
+            INSERT INTO patients_fts (rowid, name, contact_info, address)
+            VALUES (NEW.id, NEW.name, NEW.contact_info, NEW.address);
+        END;
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS billing_fts USING fts5(
+            services_rendered,
+            content='billing', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS billing_fts_insert AFTER INSERT ON billing BEGIN
+            INSERT INTO billing_fts (rowid, services_rendered) VALUES (NEW.id, NEW.services_rendered);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS billing_fts_delete AFTER DELETE ON billing BEGIN
+            INSERT INTO billing_fts (billing_fts, rowid, services_rendered)
+            VALUES ('delete', OLD.id, OLD.services_rendered);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS billing_fts_update AFTER UPDATE OF services_rendered ON billing BEGIN
+            INSERT INTO billing_fts (billing_fts, rowid, services_rendered)
+            VALUES ('delete', OLD.id, OLD.services_rendered);
+            INSERT INTO billing_fts (rowid, services_rendered) VALUES (NEW.id, NEW.services_rendered);
+        END;
+
+        -- Index the rows that existed before the triggers
+        INSERT INTO patients_fts (patients_fts) VALUES ('rebuild');
+        INSERT INTO billing_fts (billing_fts) VALUES ('rebuild');
+    """),
+    Migration(5, "Appointment durations and a doctor booking range index", sql="""
+        ALTER TABLE appointments ADD COLUMN duration INTEGER NOT NULL DEFAULT 30;
+
+        -- Derived from date/time/duration so they can never drift; NULL when date or time is malformed
+        ALTER TABLE appointments ADD COLUMN starts_at TEXT
+            GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', date || ' ' || time)) VIRTUAL;
+        ALTER TABLE appointments ADD COLUMN ends_at TEXT
+            GENERATED ALWAYS AS (strftime('%Y-%m-%d %H:%M', date || ' ' || time, '+' || duration || ' minutes')) VIRTUAL;
+
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_range ON appointments(doctor_id, starts_at, ends_at);
+    """),
+    Migration(6, "Doctor working-hour templates", sql="""
+        CREATE TABLE IF NOT EXISTS doctor_hours (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            doctor_id INTEGER NOT NULL,
+            weekday INTEGER NOT NULL CHECK (weekday BETWEEN 0 AND 6),  -- Monday = 0
+            start_time TEXT NOT NULL,  -- HH:MM
+            end_time TEXT NOT NULL,
+            FOREIGN KEY(doctor_id) REFERENCES doctors(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_doctor_hours_doctor ON doctor_hours(doctor_id, weekday);
+
+        CREATE TRIGGER IF NOT EXISTS doctor_hours_cleanup AFTER DELETE ON doctors BEGIN
+            DELETE FROM doctor_hours WHERE doctor_id = OLD.id;
+        END;
+    """),
+    Migration(7, "Daily revenue and appointment rollups with a change journal", sql="""
+        -- doctor_id is 0 for bills without a linked appointment
+        CREATE TABLE IF NOT EXISTS revenue_daily (
+            date TEXT NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            bills INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            PRIMARY KEY (date, doctor_id, status)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS appointment_daily (
+            date TEXT NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            appointments INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            PRIMARY KEY (date, doctor_id, status)
+        ) WITHOUT ROWID;
+
+        -- Days whose rollups are stale. Re-marking a day moves it to a new seq, and
+        -- rollup_watermarks records the last seq folded into the rollups.
+        CREATE TABLE IF NOT EXISTS rollup_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT NOT NULL,  -- 'billing' or 'appointments'
+            date TEXT NOT NULL,
+            UNIQUE (source, date)
+        );
+
+        CREATE TABLE IF NOT EXISTS rollup_watermarks (
+            name TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL
+        );
+
+        INSERT OR IGNORE INTO rollup_watermarks (name, seq) VALUES ('daily', 0);
+
+        -- Lets the appointment triggers find linked bills without a table scan
+        CREATE INDEX IF NOT EXISTS idx_billing_appointment ON billing(appointment_id);
+
+        CREATE TRIGGER IF NOT EXISTS rollup_billing_insert AFTER INSERT ON billing BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', NEW.date WHERE NEW.date IS NOT NULL;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rollup_billing_delete AFTER DELETE ON billing BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', OLD.date WHERE OLD.date IS NOT NULL;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rollup_billing_update
+        AFTER UPDATE OF date, amount, status, appointment_id ON billing BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', OLD.date WHERE OLD.date IS NOT NULL;
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', NEW.date WHERE NEW.date IS NOT NULL;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rollup_appointments_insert AFTER INSERT ON appointments BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'appointments', NEW.date WHERE NEW.date IS NOT NULL;
+        END;
+
+        -- Bills are credited to their appointment's doctor, so those days change too
+        CREATE TRIGGER IF NOT EXISTS rollup_appointments_delete AFTER DELETE ON appointments BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'appointments', OLD.date WHERE OLD.date IS NOT NULL;
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', date FROM billing WHERE appointment_id = OLD.id AND date IS NOT NULL;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS rollup_appointments_update
+        AFTER UPDATE OF date, doctor_id, status, duration ON appointments BEGIN
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'appointments', OLD.date WHERE OLD.date IS NOT NULL;
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'appointments', NEW.date WHERE NEW.date IS NOT NULL;
+            INSERT OR REPLACE INTO rollup_changes (source, date)
+                SELECT 'billing', date FROM billing
+                WHERE appointment_id = NEW.id AND date IS NOT NULL AND OLD.doctor_id IS NOT NEW.doctor_id;
+        END;
+
+        -- Backfill from the existing rows; later changes go through rollup_changes
+        INSERT OR REPLACE INTO revenue_daily (date, doctor_id, status, bills, amount)
+            SELECT b.date, IFNULL(a.doctor_id, 0), IFNULL(b.status, ''), COUNT(*), IFNULL(SUM(b.amount), 0)
+            FROM billing b LEFT JOIN appointments a ON a.id = b.appointment_id
+            WHERE b.date IS NOT NULL
+            GROUP BY 1, 2, 3;
+
+        INSERT OR REPLACE INTO appointment_daily (date, doctor_id, status, appointments, minutes)
+            SELECT date, IFNULL(doctor_id, 0), IFNULL(status, ''), COUNT(*), IFNULL(SUM(duration), 0)
+            FROM appointments
+            WHERE date IS NOT NULL
+            GROUP BY 1, 2, 3;
+    """),
+    Migration(8, "Integer timestamps for appointment and billing range queries", sql="""
+        -- Seconds since 1970-01-01 for the naive local start time, and date.toordinal()
+        -- for bill dates; both NULL when the text is malformed (see utils/date_codec.py)
+        ALTER TABLE appointments ADD COLUMN start_ts INTEGER
+            GENERATED ALWAYS AS (CAST(strftime('%s', starts_at) AS INTEGER)) VIRTUAL;
+        ALTER TABLE billing ADD COLUMN date_ord INTEGER
+            GENERATED ALWAYS AS (CAST(julianday(strftime('%Y-%m-%d', date)) - 1721424.5 AS INTEGER)) VIRTUAL;
+
+        CREATE INDEX IF NOT EXISTS idx_appointments_start_ts ON appointments(start_ts);
+        CREATE INDEX IF NOT EXISTS idx_appointments_doctor_start_ts ON appointments(doctor_id, start_ts);
+        CREATE INDEX IF NOT EXISTS idx_billing_date_ord ON billing(date_ord);
+    """),
+    Migration(9, "Rollup totals for archived rows and an index for archival scans", sql="""
+        -- What archived rows contributed to each day; refresh_rollups adds these back in,
+        -- so moving rows to the archive database never changes a report
+        CREATE TABLE IF NOT EXISTS revenue_daily_archived (
+            date TEXT NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            bills INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            PRIMARY KEY (date, doctor_id, status)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS appointment_daily_archived (
+            date TEXT NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            appointments INTEGER NOT NULL,
+            minutes INTEGER NOT NULL,
+            PRIMARY KEY (date, doctor_id, status)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_appointments_status_date ON appointments(status, date);
+    """),
+    Migration(10, "Trigger-maintained daily collected totals for the dashboard", sql="""
+        -- Paid amounts per bill date, so the dashboard's month total is a sum over at most
+        -- 31 rows and never waits on the report rollups; archived paid bills stay counted
+        CREATE TABLE IF NOT EXISTS collected_daily (
+            date TEXT PRIMARY KEY,
+            amount REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+
+        INSERT OR REPLACE INTO collected_daily (date, amount)
+            SELECT date, SUM(amount) FROM (
+                SELECT date, IFNULL(amount, 0) AS amount FROM billing
+                WHERE status = 'Paid' AND date IS NOT NULL
+                UNION ALL
+                SELECT date, amount FROM revenue_daily_archived WHERE status = 'Paid'
+            )
+            GROUP BY date;
+
+        CREATE TRIGGER IF NOT EXISTS billing_collected_insert AFTER INSERT ON billing
+        WHEN NEW.status = 'Paid' AND NEW.date IS NOT NULL BEGIN
+            INSERT OR IGNORE INTO collected_daily (date, amount) VALUES (NEW.date, 0);
+            UPDATE collected_daily SET amount = amount + IFNULL(NEW.amount, 0) WHERE date = NEW.date;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS billing_collected_delete AFTER DELETE ON billing
+        WHEN OLD.status = 'Paid' BEGIN
+            UPDATE collected_daily SET amount = amount - IFNULL(OLD.amount, 0) WHERE date = OLD.date;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS billing_collected_update AFTER UPDATE OF amount, status, date ON billing
+        WHEN OLD.status = 'Paid' OR NEW.status = 'Paid' BEGIN
+            UPDATE collected_daily SET amount = amount - IFNULL(OLD.amount, 0)
+                WHERE date = OLD.date AND OLD.status = 'Paid';
+            INSERT OR IGNORE INTO collected_daily (date, amount)
+                SELECT NEW.date, 0 WHERE NEW.status = 'Paid' AND NEW.date IS NOT NULL;
+            UPDATE collected_daily SET amount = amount + IFNULL(NEW.amount, 0)
+                WHERE date = NEW.date AND NEW.status = 'Paid';
+        END;
+    """),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn, migrations=None) -> list[int]:
+    """Applies every migration newer than the database's user_version.
+
+    Returns the versions that were applied; an empty list means the schema
+    was already current.
+    """
+    migrations = migrations or MIGRATIONS
+    current = get_schema_version(conn)
+    pending = [m for m in migrations if m.version > current]
+    if not pending:
+        return []
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TEXT
+        )
+    """)
+    conn.commit()
+
+    applied = []
+    for migration in sorted(pending, key=lambda m: m.version):
+        applied_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        description = migration.description.replace("'", "''")
+        script = (
+            "BEGIN;\n"
+            f"{migration.load_sql()}\n"
+            "INSERT OR REPLACE INTO schema_version (version, description, applied_at) "
+            f"VALUES ({int(migration.version)}, '{description}', '{applied_at}');\n"
+            f"PRAGMA user_version = {int(migration.version)};\n"
+            "COMMIT;"
+        )
+        try:
+            conn.executescript(script)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(migration.version)
+
+    conn.execute("PRAGMA optimize")
+    return applied
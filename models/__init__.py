@@ -2,10 +2,12 @@ from .patient import Patient
 from .appointment import Appointment
 from .doctor import Doctor
 from .billing import Billing
+from .working_hours import WorkingHours
 
 __all__ = [
     "Patient",
     "Appointment",
     "Doctor",
-    "Billing"
+    "Billing",
+    "WorkingHours"
 ]
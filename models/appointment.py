@@ -1,7 +1,12 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+from config import APPOINTMENT_DEFAULT_MINUTES
+from utils.date_codec import parse_datetime
 
 class Appointment:
-    def __init__(self, id=None, patient_id=None, doctor_id=None, date=None, time=None, reason="", status="Scheduled"):
+    __slots__ = ("id", "patient_id", "doctor_id", "date", "time", "reason", "status", "duration")
+
+    def __init__(self, id=None, patient_id=None, doctor_id=None, date=None, time=None, reason="", status="Scheduled",
+                 duration=APPOINTMENT_DEFAULT_MINUTES):
         self.id = id  # primary key in the database
         self.patient_id = patient_id
         self.doctor_id = doctor_id
@@ -9,16 +14,19 @@ class Appointment:
         self.time = time  # string in HH:MM format
         self.reason = reason
         self.status = status  # Scheduled, Completed, Cancelled, etc.
+        self.duration = duration  # length in minutes
 
     def __repr__(self):
         return f"<Appointment id={self.id} patient_id={self.patient_id} doctor_id={self.doctor_id} date={self.date} time={self.time}>"
 
     def get_datetime(self):
         """Returns a combined datetime object from date and time."""
-        try:
-            return datetime.strptime(f"{self.date} {self.time}", "%Y-%m-%d %H:%M")
-        except Exception:
-            return None
+        return parse_datetime(self.date, self.time)
+
+    def get_end_datetime(self):
+        """Returns when the appointment finishes, or None if the date/time is invalid."""
+        start = self.get_datetime()
+        return start + timedelta(minutes=self.duration) if start is not None else None
 
     def is_in_past(self):
         """Checks if the appointment is scheduled in the past."""
@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
+from utils.date_codec import parse_date
 
 class Billing:
+    __slots__ = ("id", "patient_id", "appointment_id", "amount", "date", "status", "services_rendered")
+
     def __init__(self, id=None, patient_id=None, appointment_id=None, amount=0.0, date=None, status="Unpaid", services_rendered=""):
         self.id = id  # primary key
         self.patient_id = patient_id
@@ -17,9 +20,8 @@ class Billing:
         self.status = "Paid"
 
     def is_overdue(self):
-        """Check if billing date is older than today and still unpaid."""
-        try:
-            billing_date = datetime.strptime(self.date, "%Y-%m-%d")
-            return billing_date < datetime.today() and self.status != "Paid"
-        except ValueError:
+        """Check if billing date is before today and the bill is still open (not Paid or Cancelled)."""
+        billing_date = parse_date(self.date)
+        if billing_date is None:
             return False
+        return billing_date < date.today() and self.status not in ("Paid", "Cancelled")
@@ -1,4 +1,6 @@
 class Doctor:
+    __slots__ = ("id", "name", "specialty", "contact_info")
+
     def __init__(self, id=None, name="", specialty="", contact_info=""):
         self.id = id  # Primary key
         self.name = name
@@ -1,6 +1,9 @@
-from datetime import datetime
+from datetime import date
+from utils.date_codec import parse_date
 
 class Patient:
+    __slots__ = ("id", "name", "dob", "gender", "contact_info", "address")
+
     def __init__(self, id=None, name="", dob="", gender="", contact_info="", address=""):
         self.id = id  # Primary key
         self.name = name
@@ -14,12 +17,11 @@ class Patient:
 
     def calculate_age(self):
         """Calculates age based on DOB."""
-        try:
-            birth_date = datetime.strptime(self.dob, "%Y-%m-%d")
-            today = datetime.today()
-            return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
-        except Exception:
+        birth_date = parse_date(self.dob)
+        if birth_date is None:
             return None
+        today = date.today()
+        return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
     def get_summary(self):
         """Returns a short string summary of the patient."""
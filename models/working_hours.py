@@ -0,0 +1,12 @@
+class WorkingHours:
+    __slots__ = ("id", "doctor_id", "weekday", "start_time", "end_time")
+
+    def __init__(self, id=None, doctor_id=None, weekday=0, start_time="09:00", end_time="17:00"):
+        self.id = id  # Primary key
+        self.doctor_id = doctor_id
+        self.weekday = weekday  # Monday = 0 ... Sunday = 6
+        self.start_time = start_time  # HH:MM
+        self.end_time = end_time  # HH:MM
+
+    def __repr__(self):
+        return f"<WorkingHours doctor_id={self.doctor_id} weekday={self.weekday} {self.start_time}-{self.end_time}>"
@@ -1,3 +1,5 @@
+-- Baseline schema (migration 1). Later changes go in migrations.py, not here.
+
 CREATE TABLE IF NOT EXISTS patients (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
@@ -37,3 +39,87 @@ CREATE TABLE IF NOT EXISTS billing (
     FOREIGN KEY(patient_id) REFERENCES patients(id),
     FOREIGN KEY(appointment_id) REFERENCES appointments(id)
 );
+
+-- Summary counters maintained by triggers so the dashboard never scans tables
+CREATE TABLE IF NOT EXISTS summary_counters (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS appointment_day_counts (
+    date TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0
+);
+
+-- Seeded from the existing rows the first time the tables are created
+INSERT OR IGNORE INTO summary_counters (name, value) SELECT 'patients', COUNT(*) FROM patients;
+INSERT OR IGNORE INTO summary_counters (name, value) SELECT 'doctors', COUNT(*) FROM doctors;
+INSERT OR IGNORE INTO summary_counters (name, value) SELECT 'appointments', COUNT(*) FROM appointments;
+INSERT OR IGNORE INTO summary_counters (name, value) SELECT 'billings', COUNT(*) FROM billing;
+INSERT OR IGNORE INTO summary_counters (name, value)
+    SELECT 'unpaid_billings', COUNT(*) FROM billing WHERE status NOT IN ('Paid', 'Cancelled');
+INSERT OR IGNORE INTO summary_counters (name, value)
+    SELECT 'unpaid_amount', IFNULL(SUM(amount), 0) FROM billing WHERE status NOT IN ('Paid', 'Cancelled');
+INSERT OR IGNORE INTO appointment_day_counts (date, count)
+    SELECT date, COUNT(*) FROM appointments WHERE date IS NOT NULL GROUP BY date;
+
+CREATE TRIGGER IF NOT EXISTS patients_count_insert AFTER INSERT ON patients BEGIN
+    UPDATE summary_counters SET value = value + 1 WHERE name = 'patients';
+END;
+
+CREATE TRIGGER IF NOT EXISTS patients_count_delete AFTER DELETE ON patients BEGIN
+    UPDATE summary_counters SET value = value - 1 WHERE name = 'patients';
+END;
+
+CREATE TRIGGER IF NOT EXISTS doctors_count_insert AFTER INSERT ON doctors BEGIN
+    UPDATE summary_counters SET value = value + 1 WHERE name = 'doctors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS doctors_count_delete AFTER DELETE ON doctors BEGIN
+    UPDATE summary_counters SET value = value - 1 WHERE name = 'doctors';
+END;
+
+CREATE TRIGGER IF NOT EXISTS appointments_count_insert AFTER INSERT ON appointments BEGIN
+    UPDATE summary_counters SET value = value + 1 WHERE name = 'appointments';
+    INSERT OR IGNORE INTO appointment_day_counts (date, count) VALUES (NEW.date, 0);
+    UPDATE appointment_day_counts SET count = count + 1 WHERE date = NEW.date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS appointments_count_delete AFTER DELETE ON appointments BEGIN
+    UPDATE summary_counters SET value = value - 1 WHERE name = 'appointments';
+    UPDATE appointment_day_counts SET count = count - 1 WHERE date = OLD.date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS appointments_count_update AFTER UPDATE OF date ON appointments
+WHEN OLD.date IS NOT NEW.date BEGIN
+    UPDATE appointment_day_counts SET count = count - 1 WHERE date = OLD.date;
+    INSERT OR IGNORE INTO appointment_day_counts (date, count) VALUES (NEW.date, 0);
+    UPDATE appointment_day_counts SET count = count + 1 WHERE date = NEW.date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS billing_count_insert AFTER INSERT ON billing BEGIN
+    UPDATE summary_counters SET value = value + 1 WHERE name = 'billings';
+    UPDATE summary_counters SET value = value + 1
+        WHERE name = 'unpaid_billings' AND NEW.status NOT IN ('Paid', 'Cancelled');
+    UPDATE summary_counters SET value = value + IFNULL(NEW.amount, 0)
+        WHERE name = 'unpaid_amount' AND NEW.status NOT IN ('Paid', 'Cancelled');
+END;
+
+CREATE TRIGGER IF NOT EXISTS billing_count_delete AFTER DELETE ON billing BEGIN
+    UPDATE summary_counters SET value = value - 1 WHERE name = 'billings';
+    UPDATE summary_counters SET value = value - 1
+        WHERE name = 'unpaid_billings' AND OLD.status NOT IN ('Paid', 'Cancelled');
+    UPDATE summary_counters SET value = value - IFNULL(OLD.amount, 0)
+        WHERE name = 'unpaid_amount' AND OLD.status NOT IN ('Paid', 'Cancelled');
+END;
+
+CREATE TRIGGER IF NOT EXISTS billing_count_update AFTER UPDATE OF amount, status ON billing BEGIN
+    UPDATE summary_counters SET value = value - 1
+        WHERE name = 'unpaid_billings' AND OLD.status NOT IN ('Paid', 'Cancelled');
+    UPDATE summary_counters SET value = value - IFNULL(OLD.amount, 0)
+        WHERE name = 'unpaid_amount' AND OLD.status NOT IN ('Paid', 'Cancelled');
+    UPDATE summary_counters SET value = value + 1
+        WHERE name = 'unpaid_billings' AND NEW.status NOT IN ('Paid', 'Cancelled');
+    UPDATE summary_counters SET value = value + IFNULL(NEW.amount, 0)
+        WHERE name = 'unpaid_amount' AND NEW.status NOT IN ('Paid', 'Cancelled');
+END;
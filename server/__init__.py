@@ -0,0 +1,7 @@
+# server/__init__.py
+
+# Multi-terminal mode: one PC hosts the clinic database and the services, the
+# front-desk PCs run the usual window against it over HTTP/JSON.
+#   python -m server --host 0.0.0.0 --port 8765            (on the PC holding clinic.db,
+#                                                           with CLINIC_SERVER_TOKEN set)
+#   python app.py --server http://192.168.1.10:8765        (on each front-desk PC)
@@ -0,0 +1,82 @@
+"""Runs the clinic server: the services over HTTP/JSON for the front-desk terminals.
+
+The server owns the database; terminals started with `app.py --server URL`
+(or with SERVER_URL / CLINIC_SERVER set) no longer open a clinic.db of their own.
+Listening beyond this PC needs a shared token (CLINIC_SERVER_TOKEN or
+SERVER_TOKEN, set to the same value on every terminal), since patient records
+and deletes would otherwise be open to anyone on the network.
+
+Usage:
+    python -m server
+    set CLINIC_SERVER_TOKEN=<secret>
+    python -m server --host 0.0.0.0 --port 8765 --db D:\\clinic\\clinic.db --workers 4
+"""
+import argparse
+import asyncio
+import ipaddress
+import os
+import sys
+
+from config import SERVER_DB_WORKERS, SERVER_HOST, SERVER_MAX_PENDING, SERVER_PORT, SERVER_TOKEN
+
+# Hosted by the server; StatsService and AvailabilityService back the dashboard and the free-slot search
+SERVICES = ("PatientService", "DoctorService", "AppointmentService", "BillingService",
+            "StatsService", "AvailabilityService")
+
+
+def is_loopback(host) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # a hostname or interface name may resolve to anything
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the clinic services to other terminals.")
+    parser.add_argument("--host", default=SERVER_HOST, help="address to listen on (default %(default)s)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--db", help="database file to serve (default: the per-user clinic.db)")
+    parser.add_argument("--workers", type=int, default=SERVER_DB_WORKERS,
+                        help="threads running service calls (default %(default)s)")
+    parser.add_argument("--max-pending", type=int, default=SERVER_MAX_PENDING,
+                        help="calls in flight before requests are refused (default %(default)s)")
+    parser.add_argument("--insecure", action="store_true",
+                        help="allow listening beyond this PC without a token")
+    args = parser.parse_args(argv)
+    if args.workers <= 0 or args.max_pending <= 0:
+        print("Error: --workers and --max-pending must be positive.")
+        return 1
+    token = os.getenv("CLINIC_SERVER_TOKEN") or SERVER_TOKEN
+    if not token and not is_loopback(args.host) and not args.insecure:
+        print(f"Error: refusing to serve patient data on {args.host} without a token. "
+              "Set CLINIC_SERVER_TOKEN (or SERVER_TOKEN in config.py) on the server and every terminal, "
+              "or pass --insecure.")
+        return 1
+
+    # Must happen before the services import the DAOs, which bind the shared database
+    from database import configure_database, get_database
+    if args.db:
+        configure_database(args.db)
+    get_database().initialize_schema()
+
+    import services
+    from server.http_server import ServiceServer
+    server = ServiceServer({name: getattr(services, name) for name in SERVICES},
+                           workers=args.workers, max_pending=args.max_pending, token=token)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        server.close()
+        print(server.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Client side of the clinic server: service classes that run remotely.
+
+RemoteService("PatientService", client) stands in for the PatientService class:
+PatientService.add_patient(patient) becomes remote.add_patient(patient), with
+the same arguments, results and ValueErrors. Models passed to a write come
+back updated the way the local service would have left them (a new id, a
+normalised date), so the pages cannot tell the difference.
+
+Each thread keeps its own keep-alive connection, so the UI's background
+workers can call the server concurrently without reconnecting every time.
+"""
+import http.client
+import json
+import threading
+from urllib.parse import urlsplit
+
+from config import SERVER_TIMEOUT
+from server.protocol import copy_fields, decode, encode
+from utils import page_keys
+
+# Pure functions of a row, answered on the terminal instead of with a round trip
+LOCAL_METHODS = {
+    ("PatientService", "page_key"): page_keys.patient_key,
+    ("DoctorService", "page_key"): page_keys.doctor_key,
+    ("AppointmentService", "page_key"): page_keys.appointment_key,
+    ("AppointmentService", "row_page_key"): page_keys.appointment_row_key,
+    ("BillingService", "page_key"): page_keys.billing_key,
+    ("BillingService", "row_page_key"): page_keys.billing_row_key,
+}
+
+
+class RemoteServiceError(Exception):
+    """The server could not be reached, or a call failed there for a reason other than a ValueError."""
+
+
+class ServiceClient:
+    def __init__(self, url, token=None, timeout=SERVER_TIMEOUT):
+        parts = urlsplit(url if "://" in url else f"http://{url}")
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Clinic server URL must look like http://host:port, not {url!r}")
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.token = token
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def service(self, name):
+        return RemoteService(name, self)
+
+    def health(self) -> dict:
+        return self._request("GET", "/health")
+
+    def call(self, service, method, *args, **kwargs):
+        """Runs service.method(*args, **kwargs) on the server and returns its result."""
+        response = self._request("POST", "/rpc", self._call_body(service, method, args, kwargs))
+        return self._result(response, args, kwargs)
+
+    def call_many(self, calls, atomic=False) -> list:
+        """Runs (service, method, args, kwargs) calls in one round trip and returns their results in order.
+
+        With atomic=True the server runs them in one transaction that is rolled
+        back unless every call succeeds. The first failed call is raised.
+        """
+        calls = [(service, method, tuple(args), dict(kwargs)) for service, method, args, kwargs in calls]
+        response = self._request("POST", "/batch", {
+            "calls": [self._call_body(*call) for call in calls],
+            "atomic": atomic,
+        })
+        if "error" in response:
+            raise self._error(response["error"])
+        if atomic and not response.get("committed"):
+            # Nothing was written, so no ids or other changes are copied back to the arguments
+            for result in response["results"]:
+                if "error" in result:
+                    raise self._error(result["error"])
+            raise RemoteServiceError("A call in the batch failed and the batch was rolled back.")
+        return [self._result(result, call[2], call[3]) for result, call in zip(response["results"], calls)]
+
+    @staticmethod
+    def _call_body(service, method, args, kwargs):
+        return {"service": service, "method": method, "args": encode(list(args)), "kwargs": encode(kwargs)}
+
+    def _result(self, response, args, kwargs):
+        if "error" in response:
+            raise self._error(response["error"])
+        if "args" in response:
+            copy_fields(list(args), decode(response["args"]))
+        return decode(response["result"])
+
+    @staticmethod
+    def _error(error):
+        if error.get("value_error"):
+            return ValueError(error["message"])
+        return RemoteServiceError(f"{error['type']}: {error['message']}")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+            self._local.used = False
+        return conn
+
+    def _request(self, method, path, payload=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["X-Clinic-Token"] = self.token
+        # A reused connection may have been closed by the server while idle; retry once on a fresh one
+        for attempt in range(2):
+            conn = self._connection()
+            reused = self._local.used
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                self._local.used = True
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._drop_connection()
+                if not reused or attempt:
+                    raise RemoteServiceError(f"Lost the connection to the clinic server at {self.url}: {e}") from e
+            except OSError as e:
+                self._drop_connection()
+                raise RemoteServiceError(f"Cannot reach the clinic server at {self.url}: {e}") from e
+        try:
+            result = json.loads(data)
+        except ValueError:
+            raise RemoteServiceError(f"The clinic server sent an invalid reply (HTTP {response.status}).")
+        if response.status != 200:
+            raise RemoteServiceError(result.get("error", {}).get("message") or f"HTTP {response.status}")
+        return result
+
+    def _drop_connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+
+class RemoteService:
+    def __init__(self, name, client):
+        self.name = name
+        self.client = client
+
+    def __getattr__(self, method):
+        if method.startswith("_"):
+            raise AttributeError(method)
+
+        call = LOCAL_METHODS.get((self.name, method))
+        if call is None:
+            def call(*args, **kwargs):
+                return self.client.call(self.name, method, *args, **kwargs)
+
+            call.__name__ = method
+            call.__qualname__ = f"{self.name}.{method}"
+        # Cached on the instance so later lookups skip __getattr__
+        setattr(self, method, call)
+        return call
+
+    def __repr__(self):
+        return f"<RemoteService {self.name} at {self.client.url}>"
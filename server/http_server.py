@@ -0,0 +1,292 @@
+"""Asyncio HTTP/JSON front end for the clinic services.
+
+One event-loop thread accepts the terminals' keep-alive connections and parses
+requests; the service calls themselves run on a bounded pool of DB worker
+threads, each with its own SQLite connection. Requests that would push more
+than max_pending calls into the pool are refused with 503 rather than queued
+without limit, and the terminal shows the error instead of hanging.
+
+Endpoints:
+    GET  /health    {"status": "ok", "version": ..., "services": [...]}
+    POST /rpc       {"service": "PatientService", "method": "get_patient_by_id", "args": [1], "kwargs": {}}
+    POST /batch     {"calls": [<rpc body>, ...], "atomic": false}
+
+A batch saves round trips: its calls run concurrently and come back in order.
+With "atomic": true they run one after another in a single transaction, which
+is rolled back if any call raises or returns False.
+
+Identical read calls (get_*, find_*, search_*, ...) that arrive while the same
+call is still running share its result instead of queueing again, so several
+terminals refreshing the same page cost one query. A read never joins one that
+started before a write finished, so a terminal always sees its own writes.
+
+Arguments and results use server.protocol. Errors come back as
+{"error": {"type", "message", "value_error"}}; value_error marks the
+ValueErrors the services raise for rule violations, which the client
+re-raises as ValueError so the pages show them as validation errors.
+"""
+import asyncio
+import hmac
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from config import APP_VERSION, SERVER_DB_WORKERS, SERVER_MAX_PENDING
+from database import get_database
+from server.protocol import decode, encode
+from utils.query_monitor import get_logger
+
+# Calls that only read, so they may be shared between identical in-flight requests
+READ_PREFIXES = ("get_", "find_", "search_", "next_", "page_key", "row_page_key")
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_HEADERS = 100
+KEEP_ALIVE_SECONDS = 60  # idle connections are closed after this; the client reconnects
+REQUEST_READ_SECONDS = 10  # once a request has started, its headers and body must arrive within this
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class _BatchAborted(Exception):
+    pass
+
+
+def is_read(method):
+    return isinstance(method, str) and method.startswith(READ_PREFIXES)
+
+
+def exposed_methods(service_cls):
+    """The public static methods of a service class; streaming iter_* methods are left out."""
+    return {
+        name: getattr(service_cls, name)
+        for name, member in vars(service_cls).items()
+        if isinstance(member, staticmethod) and not name.startswith(("_", "iter_"))
+    }
+
+
+class ServiceServer:
+    def __init__(self, services, workers=SERVER_DB_WORKERS, max_pending=SERVER_MAX_PENDING, token=None):
+        self.methods = {name: exposed_methods(cls) for name, cls in services.items()}
+        self.max_pending = max_pending
+        self.token = token
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server-db")
+        self.logger = get_logger("clinic.server")
+
+        self.requests = 0
+        self.calls = 0
+        self.coalesced = 0   # read calls answered from another request's in-flight call
+        self.rejected = 0    # requests refused with 503
+        self._pending = 0
+        self._inflight = {}  # (write generation, read call) -> future of the running call
+        self._writes = 0     # write generation: bumped as each write finishes
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()[:2]) for sock in server.sockets)
+        self.logger.info("Clinic server listening on %s", addresses)
+        print(f"Clinic server listening on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.logger.info(self.report())
+
+    def report(self) -> str:
+        return (f"[SERVER] {self.requests} requests, {self.calls} calls, "
+                f"{self.coalesced} coalesced reads, {self.rejected} rejected")
+
+    # HTTP
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as e:
+                    writer.write(self._response(e.status, {"error": {"type": "HTTPError", "message": str(e),
+                                                                     "value_error": False}}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._dispatch(method, path, headers, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        """Returns (method, path, headers, body), or None once the client has gone."""
+        line = await asyncio.wait_for(self._readline(reader), KEEP_ALIVE_SECONDS)
+        if not line:
+            return None
+        try:
+            method, target, _version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        # One deadline for the rest, so a client trickling headers cannot hold the connection open
+        headers, body = await asyncio.wait_for(self._read_headers_and_body(reader), REQUEST_READ_SECONDS)
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _read_headers_and_body(self, reader):
+        headers = {}
+        while True:
+            line = await self._readline(reader)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(400, "Too many headers")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return headers, body
+
+    @staticmethod
+    async def _readline(reader):
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # The line is longer than the stream's buffer limit
+            raise HTTPError(400, "Request line or header too long")
+
+    @staticmethod
+    def _response(status, payload, keep_alive=True):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode("latin-1") + body
+
+    async def _dispatch(self, method, path, headers, body):
+        self.requests += 1
+        try:
+            if path == "/health":
+                if method != "GET":
+                    raise HTTPError(405, "Use GET for /health")
+                return 200, {"status": "ok", "version": APP_VERSION, "services": sorted(self.methods)}
+            if path not in ("/rpc", "/batch"):
+                raise HTTPError(404, f"No such endpoint: {path}")
+            if method != "POST":
+                raise HTTPError(405, f"Use POST for {path}")
+            if self.token and not hmac.compare_digest(headers.get("x-clinic-token", "").encode(),
+                                                     self.token.encode()):
+                raise HTTPError(401, "Missing or wrong X-Clinic-Token")
+            try:
+                request = json.loads(body)
+            except ValueError:
+                raise HTTPError(400, "Request body is not valid JSON")
+            if not isinstance(request, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+
+            if path == "/rpc":
+                self._admit(1)
+                return 200, await self._call(request)
+            calls = request.get("calls")
+            if not isinstance(calls, list) or not all(isinstance(call, dict) for call in calls):
+                raise HTTPError(400, "A batch needs a list of calls")
+            self._admit(len(calls))
+            if request.get("atomic"):
+                self.calls += len(calls)
+                return 200, await self._run_write(self._execute_atomic, calls)
+            return 200, {"results": list(await asyncio.gather(*(self._call(call) for call in calls)))}
+        except HTTPError as e:
+            return e.status, {"error": {"type": "HTTPError", "message": str(e), "value_error": False}}
+
+    def _admit(self, calls):
+        if self._pending + calls > self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "The clinic server is busy, please try again")
+
+    # Calls
+
+    async def _run(self, func, *args):
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def _run_write(self, func, *args):
+        try:
+            return await self._run(func, *args)
+        finally:
+            # Reads arriving from now on must not join one that may have started before this write
+            self._writes += 1
+
+    async def _call(self, call):
+        # Counted here on the event loop; the DB workers share no counters
+        if not is_read(call.get("method")):
+            self.calls += 1
+            return await self._run_write(self._execute, call)
+        key = json.dumps([self._writes, call.get("service"), call.get("method"),
+                          call.get("args", []), call.get("kwargs", {})], sort_keys=True)
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(self._run(self._execute, call))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # shield() so a client hanging up doesn't cancel a call other requests are waiting on
+        return await asyncio.shield(future)
+
+    def _execute(self, call):
+        """Runs one call on a DB worker and returns its JSON-ready response."""
+        service, method = call.get("service"), call.get("method")
+        try:
+            func = self.methods.get(service, {}).get(method)
+            if func is None:
+                raise LookupError(f"{service}.{method} is not available on the clinic server")
+            args, kwargs = decode(call.get("args", [])), decode(call.get("kwargs", {}))
+            if not isinstance(args, list) or not isinstance(kwargs, dict):
+                raise TypeError("args must be a list and kwargs an object")
+            result = func(*args, **kwargs)
+            response = {"result": encode(result)}
+            if not is_read(method):
+                # Writes may fill in their arguments (ids, normalised dates); the client copies them back
+                response["args"] = encode(args)
+            return response
+        except ValueError as e:
+            return {"error": {"type": type(e).__name__, "message": str(e), "value_error": True}}
+        except Exception as e:
+            self.logger.exception("[SERVER] %s.%s failed", service, method)
+            return {"error": {"type": type(e).__name__, "message": str(e), "value_error": False}}
+
+    def _execute_atomic(self, calls):
+        responses = []
+        try:
+            with get_database().transaction():
+                for call in calls:
+                    response = self._execute(call)
+                    responses.append(response)
+                    if "error" in response or response["result"] is False:
+                        raise _BatchAborted()
+        except _BatchAborted:
+            return {"results": responses, "committed": False}
+        except Exception as e:
+            # BEGIN or COMMIT itself failed, e.g. the write lock stayed busy
+            self.logger.exception("[SERVER] Atomic batch failed")
+            return {"results": responses, "committed": False,
+                    "error": {"type": type(e).__name__, "message": str(e), "value_error": False}}
+        return {"results": responses, "committed": True}
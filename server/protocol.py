@@ -0,0 +1,110 @@
+"""JSON encoding of service arguments and results for the clinic server.
+
+Plain JSON values pass through unchanged. Everything else the services take
+or return is wrapped in a one-key tagged object:
+
+    {"__model__": "Patient", "fields": {...}}    models (unset slots are left out)
+    {"__namedtuple__": "FreeSlot", "fields": {...}}
+    {"__tuple__": [...]}                         tuples, e.g. keyset page keys
+    {"__date__": "2025-06-01"}, {"__datetime__": "2025-06-01T09:30:00"}
+    {"__dict__": [[key, value], ...]}            dicts whose keys are not all strings
+
+Named tuples are rebuilt as namedtuple classes of the same name and fields,
+so a terminal only needs the models package, not the services.
+"""
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+
+from models import Appointment, Billing, Doctor, Patient, WorkingHours
+
+MODELS = {model.__name__: model for model in (Patient, Doctor, Appointment, Billing, WorkingHours)}
+
+_UNSET = object()
+
+
+def encode(value):
+    """Returns `value` as JSON-ready data; raises TypeError for anything it cannot carry."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, tuple):
+        fields = getattr(value, "_fields", None)
+        if fields is not None:
+            return {"__namedtuple__": type(value).__name__,
+                    "fields": {name: encode(item) for name, item in zip(fields, value)}}
+        return {"__tuple__": [encode(item) for item in value]}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith("__") for key in value):
+            return {key: encode(item) for key, item in value.items()}
+        return {"__dict__": [[encode(key), encode(item)] for key, item in value.items()]}
+    # datetime is a date subclass, so it has to be checked first
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    model = type(value).__name__
+    if MODELS.get(model) is type(value):
+        fields = {}
+        for name in value.__slots__:
+            field = getattr(value, name, _UNSET)
+            if field is not _UNSET:
+                fields[name] = encode(field)
+        return {"__model__": model, "fields": fields}
+    raise TypeError(f"Cannot send a {model} to or from the clinic server")
+
+
+def decode(data):
+    """Inverse of encode()."""
+    if isinstance(data, list):
+        return [decode(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    if "__model__" in data:
+        model = MODELS.get(data["__model__"])
+        if model is None:
+            raise ValueError(f"Unknown model {data['__model__']!r}")
+        # Like model_row_factory, only the fields that were sent are set
+        obj = model.__new__(model)
+        for name, field in data["fields"].items():
+            setattr(obj, name, decode(field))
+        return obj
+    if "__namedtuple__" in data:
+        fields = data["fields"]
+        return _namedtuple_class(data["__namedtuple__"], tuple(fields))(*decode(list(fields.values())))
+    if "__tuple__" in data:
+        return tuple(decode(data["__tuple__"]))
+    if "__date__" in data:
+        return date.fromisoformat(data["__date__"])
+    if "__datetime__" in data:
+        return datetime.fromisoformat(data["__datetime__"])
+    if "__dict__" in data:
+        return {decode(key): decode(item) for key, item in data["__dict__"]}
+    return {key: decode(item) for key, item in data.items()}
+
+
+def copy_fields(target, source):
+    """Copies fields of models in `source` onto the matching models in `target`.
+
+    The server sends its copy of a write call's arguments back, and this applies
+    what the service changed (a new id, a normalised date) to the caller's objects.
+    """
+    if isinstance(target, (list, tuple)) and isinstance(source, (list, tuple)):
+        for target_item, source_item in zip(target, source):
+            copy_fields(target_item, source_item)
+    elif isinstance(target, dict) and isinstance(source, dict):
+        for key, item in target.items():
+            if key in source:
+                copy_fields(item, source[key])
+    elif type(target) is type(source) and type(target).__name__ in MODELS:
+        for name in target.__slots__:
+            field = getattr(source, name, _UNSET)
+            if field is not _UNSET:
+                setattr(target, name, field)
+
+
+@lru_cache(maxsize=None)
+def _namedtuple_class(name, fields):
+    return namedtuple(name, fields)
+
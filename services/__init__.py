@@ -2,10 +2,23 @@ from .patient_service import PatientService
 from .appointment_service import AppointmentService
 from .doctor_service import DoctorService
 from .billing_service import BillingService
+from .stats_service import StatsService
+from .availability_service import AvailabilityService, FreeSlot
+from .report_service import ReportService
+from .archive_service import ArchiveService
+from .cache import EntityCache, get_cache_stats, clear_all_caches
 
 __all__ = [
     "PatientService",
     "AppointmentService",
     "DoctorService",
     "BillingService",
+    "StatsService",
+    "AvailabilityService",
+    "FreeSlot",
+    "ReportService",
+    "ArchiveService",
+    "EntityCache",
+    "get_cache_stats",
+    "clear_all_caches",
 ]
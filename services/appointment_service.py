@@ -1,38 +1,183 @@
 from dao.appointment_dao import AppointmentDAO
+from database import get_database
 from models.appointment import Appointment
-from typing import List, Optional
+from services.availability_index import availability_index
+from typing import Iterator, List, Optional, Sequence
+from config import APPOINTMENT_MAX_MINUTES, PAGE_SIZE
+from datetime import datetime, timedelta
+
+SLOT_FORMAT = "%Y-%m-%d %H:%M"  # matches the starts_at/ends_at columns
+
+db = get_database()
+
+class AppointmentConflictError(ValueError):
+    """Raised when a booking overlaps another appointment for the same doctor."""
+
+    def __init__(self, appointment: Appointment, conflicts: List[Appointment]):
+        self.appointment = appointment
+        self.conflicts = conflicts
+        first = conflicts[0]
+        booking = f"appointment ID {first.id}" if first.id is not None else "another row in this batch"
+        super().__init__(
+            f"The doctor is already booked on {first.date} at {first.time} "
+            f"for {first.duration} minutes ({booking})."
+        )
 
 class AppointmentService:
     @staticmethod
-    def add_appointment(appointment: Appointment) -> bool:
+    def validate_appointment(appointment: Appointment, allow_past: bool = False) -> None:
+        start = appointment.get_datetime()
+        if start is None:
+            raise ValueError("Appointment date and time must be in YYYY-MM-DD and HH:MM format.")
+        # Store zero-padded values so the derived starts_at/ends_at columns are always set
+        appointment.date = start.strftime("%Y-%m-%d")
+        appointment.time = start.strftime("%H:%M")
+
+        if not isinstance(appointment.duration, int) or not 0 < appointment.duration <= APPOINTMENT_MAX_MINUTES:
+            raise ValueError(f"Appointment duration must be between 1 and {APPOINTMENT_MAX_MINUTES} minutes.")
+
         # Business rule: Appointment date/time cannot be in the past
-        if appointment.is_in_past():
+        if not allow_past and appointment.is_in_past():
             raise ValueError("Cannot schedule an appointment in the past.")
 
         # More business logic can be added here
 
-        return AppointmentDAO.insert_appointment(appointment)
+    @staticmethod
+    def find_conflicts(appointment: Appointment) -> List[Appointment]:
+        """Returns the doctor's other bookings that overlap `appointment`."""
+        if appointment.status == "Cancelled":
+            return []
+        start = appointment.get_datetime()
+        end = start + timedelta(minutes=appointment.duration)
+        earliest = start - timedelta(minutes=APPOINTMENT_MAX_MINUTES)
+        return AppointmentDAO.find_doctor_conflicts(
+            appointment.doctor_id,
+            start.strftime(SLOT_FORMAT),
+            end.strftime(SLOT_FORMAT),
+            earliest.strftime(SLOT_FORMAT),
+            exclude_id=appointment.id,
+        )
+
+    @staticmethod
+    def check_conflicts(appointment: Appointment) -> None:
+        conflicts = AppointmentService.find_conflicts(appointment)
+        if conflicts:
+            raise AppointmentConflictError(appointment, conflicts)
+
+    @staticmethod
+    def add_appointment(appointment: Appointment) -> bool:
+        AppointmentService.validate_appointment(appointment)
+        # The check and the insert share one write transaction, so two terminals
+        # booking the same slot at once cannot both pass the check
+        with db.transaction():
+            AppointmentService.check_conflicts(appointment)
+            success = AppointmentDAO.insert_appointment(appointment)
+            if success:
+                db.on_commit(lambda: availability_index.book(appointment))
+        return success
+
+    @staticmethod
+    def add_appointments(appointments: List[Appointment], allow_past: bool = False) -> bool:
+        """Validates and inserts a batch of appointments in a single transaction.
+
+        allow_past is meant for loading historical records, which are in the past by definition.
+        Raises AppointmentConflictError if any booking overlaps an existing one or
+        another booking in the same batch; nothing is inserted in that case.
+        """
+        for appointment in appointments:
+            AppointmentService.validate_appointment(appointment, allow_past=allow_past)
+        AppointmentService._check_batch_overlaps(appointments)
+        with db.transaction():
+            for appointment in appointments:
+                AppointmentService.check_conflicts(appointment)
+            success = AppointmentDAO.insert_many(appointments)
+            # Batch inserts don't report row ids, so re-read the affected days instead
+            touched = set()
+            for appointment in appointments:
+                start, end = appointment.get_datetime().date(), appointment.get_end_datetime().date()
+                touched.update((start, end))
+            db.on_commit(lambda: availability_index.invalidate_days(touched))
+        return success
+
+    @staticmethod
+    def _check_batch_overlaps(appointments: List[Appointment]) -> None:
+        """Rejects a batch that double-books a doctor within itself."""
+        active = [a for a in appointments if a.status != "Cancelled"]
+        active.sort(key=lambda a: (a.doctor_id, a.get_datetime()))
+        for previous, current in zip(active, active[1:]):
+            if previous.doctor_id == current.doctor_id and current.get_datetime() < previous.get_end_datetime():
+                raise AppointmentConflictError(current, [previous])
 
     @staticmethod
     def update_appointment(appointment: Appointment) -> bool:
         # Business rule validations before updating
         if appointment.is_in_past():
             raise ValueError("Cannot update an appointment to a past date/time.")
+        AppointmentService.validate_appointment(appointment, allow_past=True)
+
+        with db.transaction():
+            AppointmentService.check_conflicts(appointment)
+            success = AppointmentDAO.update_appointment(appointment)
+            if success:
+                db.on_commit(lambda: availability_index.book(appointment))
+        return success
+
+    @staticmethod
+    def complete_appointments(appointment_ids: List[int]) -> bool:
+        """Marks the listed appointments Completed in one statement.
 
-        return AppointmentDAO.update_appointment(appointment)
+        Raises ValueError if any of them is missing or cancelled; nothing is
+        changed in that case.
+        """
+        with db.transaction():
+            found = {a.id: a.status for a in AppointmentDAO.get_appointments_by_ids(appointment_ids, ("status",))}
+            missing = [i for i in appointment_ids if i not in found]
+            if missing:
+                raise ValueError(f"Appointment(s) not found: {', '.join(map(str, missing))}.")
+            cancelled = [i for i in appointment_ids if found[i] == "Cancelled"]
+            if cancelled:
+                raise ValueError(f"Cancelled appointment(s) cannot be completed: {', '.join(map(str, cancelled))}.")
+            return AppointmentDAO.set_status_many(appointment_ids, "Completed")
 
     @staticmethod
     def delete_appointment(appointment_id: int) -> bool:
-        return AppointmentDAO.delete_appointment(appointment_id)
+        success = AppointmentDAO.delete_appointment(appointment_id)
+        if success:
+            db.on_commit(lambda: availability_index.release(appointment_id))
+        return success
 
     @staticmethod
     def get_appointment_by_id(appointment_id: int) -> Optional[Appointment]:
         return AppointmentDAO.get_appointment_by_id(appointment_id)
 
     @staticmethod
-    def get_appointments_by_patient(patient_id: int) -> List[Appointment]:
-        return AppointmentDAO.get_appointments_by_patient(patient_id)
+    def get_appointments_by_patient(patient_id: int, columns: Optional[Sequence[str]] = None) -> List[Appointment]:
+        return AppointmentDAO.get_appointments_by_patient(patient_id, columns)
+
+    @staticmethod
+    def get_appointments_between(start: datetime, end: datetime, doctor_id: Optional[int] = None) -> List[Appointment]:
+        return AppointmentDAO.get_appointments_between(start, end, doctor_id)
 
     @staticmethod
     def get_all_appointments() -> List[Appointment]:
         return AppointmentDAO.get_all_appointments()
+
+    @staticmethod
+    def iter_appointments(columns: Optional[Sequence[str]] = None) -> Iterator[Appointment]:
+        return AppointmentDAO.iter_appointments(columns=columns)
+
+    @staticmethod
+    def get_appointments_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[Appointment]:
+        return AppointmentDAO.get_appointments_page(after_key, limit)
+
+    @staticmethod
+    def page_key(appointment: Appointment) -> tuple:
+        return AppointmentDAO.page_key(appointment)
+
+    @staticmethod
+    def get_appointment_rows_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[tuple]:
+        return AppointmentDAO.get_appointment_rows_page(after_key, limit)
+
+    @staticmethod
+    def row_page_key(row: tuple) -> tuple:
+        return AppointmentDAO.row_page_key(row)
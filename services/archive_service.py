@@ -0,0 +1,108 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from config import ARCHIVE_AFTER_DAYS, ARCHIVE_BATCH_PAUSE_MS, ARCHIVE_BATCH_SIZE, ARCHIVE_DB_PATH
+from dao.appointment_dao import AppointmentDAO
+from dao.archive_dao import ARCHIVE, ArchiveDAO
+from dao.billing_dao import BillingDAO
+from database import get_database
+from models.appointment import Appointment
+from models.billing import Billing
+from services.availability_index import availability_index
+
+db = get_database()
+
+class ArchiveService:
+    @staticmethod
+    def archive_path() -> str:
+        """The archive file: ARCHIVE_DB_PATH, or <live database>_archive.db beside it."""
+        return ARCHIVE_DB_PATH or os.path.splitext(db.db_path)[0] + "_archive.db"
+
+    @staticmethod
+    def default_cutoff() -> date:
+        return date.today() - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+    @staticmethod
+    def archive_closed_records(cutoff: Optional[date] = None, batch_size: int = ARCHIVE_BATCH_SIZE,
+                               pause_ms: int = ARCHIVE_BATCH_PAUSE_MS) -> Dict[str, int]:
+        """Moves paid bills, then completed/cancelled appointments, dated before `cutoff` to the archive.
+
+        Rows move `batch_size` at a time, each batch in its own short write
+        transaction with a pause between batches, so the live database stays
+        usable while a large backlog drains. Returns the rows moved per table.
+        """
+        cutoff = cutoff or ArchiveService.default_cutoff()
+        if cutoff > date.today():
+            raise ValueError("The archive cutoff cannot be in the future.")
+        if batch_size <= 0:
+            raise ValueError("Archive batch size must be positive.")
+
+        cutoff_str = cutoff.isoformat()
+        moved = {"billing": 0, "appointments": 0}
+        with db.attached(ArchiveService.archive_path(), ARCHIVE):
+            if not ArchiveDAO.ensure_schema():
+                return moved
+            moved["billing"] = ArchiveService._move_in_batches(
+                ArchiveDAO.find_archivable_billings, ArchiveDAO.copy_billings, ArchiveDAO.move_billings,
+                cutoff_str, batch_size, pause_ms,
+            )
+            moved["appointments"] = ArchiveService._move_in_batches(
+                ArchiveDAO.find_archivable_appointments, ArchiveDAO.copy_appointments, ArchiveDAO.move_appointments,
+                cutoff_str, batch_size, pause_ms,
+            )
+        if moved["appointments"]:
+            availability_index.invalidate()
+        return moved
+
+    @staticmethod
+    def _move_in_batches(find: Callable, copy: Callable, move: Callable,
+                         cutoff: str, batch_size: int, pause_ms: int) -> int:
+        total = 0
+        while True:
+            ids = find(cutoff, batch_size)
+            if not ids:
+                break
+            archived_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            if not copy(ids, archived_at):
+                break
+            with db.transaction():
+                count = move(ids, cutoff)
+            if not count:
+                # A failed write, or every row changed under us; don't spin on the same batch
+                break
+            total += count
+            if len(ids) < batch_size:
+                break
+            time.sleep(pause_ms / 1000)
+        return total
+
+    @staticmethod
+    def has_archive() -> bool:
+        return os.path.exists(ArchiveService.archive_path())
+
+    @staticmethod
+    def get_appointment_history(patient_id: int) -> List[Appointment]:
+        """A patient's appointments including archived ones, newest first. Not for use inside a transaction."""
+        if not ArchiveService.has_archive():
+            return sorted(AppointmentDAO.get_appointments_by_patient(patient_id),
+                          key=lambda a: (a.date or "", a.time or ""), reverse=True)
+        with db.attached(ArchiveService.archive_path(), ARCHIVE):
+            return ArchiveDAO.get_appointment_history(patient_id)
+
+    @staticmethod
+    def get_billing_history(patient_id: int) -> List[Billing]:
+        """A patient's bills including archived ones, newest first. Not for use inside a transaction."""
+        if not ArchiveService.has_archive():
+            return sorted(BillingDAO.get_billings_by_patient(patient_id),
+                          key=lambda b: (b.date or "", b.id), reverse=True)
+        with db.attached(ArchiveService.archive_path(), ARCHIVE):
+            return ArchiveDAO.get_billing_history(patient_id)
+
+    @staticmethod
+    def get_archived_counts() -> Dict[str, int]:
+        if not ArchiveService.has_archive():
+            return {"appointments": 0, "billing": 0}
+        with db.attached(ArchiveService.archive_path(), ARCHIVE):
+            return ArchiveDAO.get_archived_counts()
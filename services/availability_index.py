@@ -0,0 +1,164 @@
+import threading
+import time
+from datetime import date, timedelta
+
+from config import AVAILABILITY_SLOT_MINUTES, CACHE_TTL_SECONDS, DEFAULT_WORKING_HOURS
+from dao.appointment_dao import AppointmentDAO
+from dao.working_hours_dao import WorkingHoursDAO
+from models.appointment import Appointment
+from utils.date_codec import parse_datetime
+
+MINUTES_PER_DAY = 24 * 60
+
+def _minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _span(first: int, last: int) -> int:
+    """Bitmap with bits first..last-1 set."""
+    return ((1 << (last - first)) - 1) << first if last > first else 0
+
+class AvailabilityIndex:
+    """Per-doctor, per-day slot bitmaps for finding free appointment times.
+
+    A day is cut into slot_minutes slots and each (doctor, date) keeps an int
+    whose set bits are booked slots; working hours are bitmaps of the same
+    shape, so "free for N slots starting here" is a handful of shifts and ANDs.
+    Days are loaded from the appointments table on first use and then kept
+    current by AppointmentService as bookings are added, moved and cancelled.
+    Everything is dropped after `ttl` seconds to pick up other terminals' work;
+    the insert-time conflict check stays the final word either way.
+    """
+
+    def __init__(self, slot_minutes=AVAILABILITY_SLOT_MINUTES, ttl=CACHE_TTL_SECONDS):
+        self.slot_minutes = slot_minutes
+        self.slots_per_day = MINUTES_PER_DAY // slot_minutes
+        self.ttl = ttl
+        self._busy = {}      # (doctor_id, date) -> bitmap of booked slots
+        self._spans = {}     # (doctor_id, date) -> {appointment_id: bitmap}
+        self._booked = {}    # appointment_id -> [(doctor_id, date)] it occupies
+        self._loaded_days = set()
+        self._hours = None   # doctor_id -> {weekday: bitmap}
+        self._loaded_at = time.monotonic()
+        self._lock = threading.RLock()
+
+    def ensure_days(self, days):
+        """Loads bookings for any of `days` (date objects) not already in memory."""
+        with self._lock:
+            if time.monotonic() - self._loaded_at > self.ttl:
+                self.invalidate()
+            missing = [d for d in days if d not in self._loaded_days]
+            if not missing:
+                return
+            # Start a day early to catch bookings that run past midnight
+            first = min(missing) - timedelta(days=1)
+            for row in AppointmentDAO.get_bookings_between(first.isoformat(), max(missing).isoformat()):
+                self._book(*row)
+            self._loaded_days.update(missing)
+
+    def invalidate(self):
+        with self._lock:
+            self._busy, self._spans, self._booked = {}, {}, {}
+            self._loaded_days = set()
+            self._hours = None
+            self._loaded_at = time.monotonic()
+
+    def invalidate_days(self, days):
+        """Forgets bookings on `days` so they are re-read from the database."""
+        with self._lock:
+            for day in days:
+                self._loaded_days.discard(day)
+            for key in [k for k in self._spans if k[1] in days]:
+                del self._spans[key]
+                self._busy.pop(key, None)
+
+    def invalidate_hours(self):
+        with self._lock:
+            self._hours = None
+
+    def book(self, appointment: Appointment):
+        """Records a new or moved booking; cancelled appointments just free their slots."""
+        with self._lock:
+            if appointment.id is None:
+                return
+            self.release(appointment.id)
+            if appointment.status != "Cancelled":
+                self._book(appointment.id, appointment.doctor_id, appointment.date,
+                           appointment.time, appointment.duration)
+
+    def release(self, appointment_id: int):
+        with self._lock:
+            for key in self._booked.pop(appointment_id, ()):
+                spans = self._spans.get(key)
+                if spans is not None and spans.pop(appointment_id, None) is not None:
+                    busy = 0
+                    for mask in spans.values():
+                        busy |= mask
+                    self._busy[key] = busy
+
+    def free_starts(self, doctor_id: int, day: date, slots_needed: int, first_slot: int = 0) -> int:
+        """Bitmap of slots on `day` where `slots_needed` free slots in working hours begin."""
+        with self._lock:
+            free = self._working_mask(doctor_id, day.weekday()) & ~self._busy.get((doctor_id, day), 0)
+        starts = free & ~_span(0, first_slot)
+        for offset in range(1, slots_needed):
+            if not starts:
+                break
+            starts &= free >> offset
+        return starts
+
+    def slots_for(self, duration: int) -> int:
+        return -(-duration // self.slot_minutes)
+
+    def slot_time(self, slot: int) -> str:
+        minutes = slot * self.slot_minutes
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def _book(self, appointment_id, doctor_id, day, start_time, duration):
+        start = parse_datetime(day, start_time)
+        if start is None:
+            return
+        day = start.date()
+        start_minute = start.hour * 60 + start.minute
+        first = start_minute // self.slot_minutes
+        last = -(-(start_minute + duration) // self.slot_minutes)
+        keys = []
+        # Bookings that cross midnight spill into the next day's bitmap
+        while last > first:
+            key = (doctor_id, day)
+            mask = _span(first, min(last, self.slots_per_day))
+            self._spans.setdefault(key, {})[appointment_id] = mask
+            self._busy[key] = self._busy.get(key, 0) | mask
+            keys.append(key)
+            first, last = 0, last - self.slots_per_day
+            day += timedelta(days=1)
+        self._booked[appointment_id] = keys
+
+    def _working_mask(self, doctor_id, weekday):
+        if self._hours is None:
+            self._hours = {}
+            for hours in WorkingHoursDAO.get_all_hours():
+                week = self._hours.setdefault(hours.doctor_id, {})
+                week[hours.weekday] = week.get(hours.weekday, 0) | self._hours_mask(hours.start_time, hours.end_time)
+        week = self._hours.get(doctor_id)
+        if week is None:
+            week = self._hours[doctor_id] = {
+                weekday: self._ranges_mask(ranges)
+                for weekday, ranges in DEFAULT_WORKING_HOURS.items()
+            }
+        return week.get(weekday, 0)
+
+    def _ranges_mask(self, ranges):
+        mask = 0
+        for start, end in ranges:
+            mask |= self._hours_mask(start, end)
+        return mask
+
+    def _hours_mask(self, start, end):
+        # Only whole slots inside the working window are bookable
+        first = -(-_minutes(start) // self.slot_minutes)
+        last = _minutes(end) // self.slot_minutes
+        return _span(first, last)
+
+
+availability_index = AvailabilityIndex()
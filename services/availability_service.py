@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional
+
+from config import APPOINTMENT_DEFAULT_MINUTES, APPOINTMENT_MAX_MINUTES, AVAILABILITY_HORIZON_DAYS
+from dao.working_hours_dao import WorkingHoursDAO
+from database import get_database
+from models.working_hours import WorkingHours
+from services.availability_index import availability_index
+from services.doctor_service import DoctorService
+
+db = get_database()
+
+class FreeSlot(NamedTuple):
+    doctor_id: int
+    date: str  # YYYY-MM-DD
+    time: str  # HH:MM
+    duration: int
+
+class AvailabilityService:
+    @staticmethod
+    def validate_working_hours(hours: List[WorkingHours]) -> None:
+        ranges = {}
+        for entry in hours:
+            if entry.weekday not in range(7):
+                raise ValueError("Weekday must be between 0 (Monday) and 6 (Sunday).")
+            try:
+                start = datetime.strptime(entry.start_time, "%H:%M")
+                end = datetime.strptime(entry.end_time, "%H:%M")
+            except (TypeError, ValueError):
+                raise ValueError("Working hours must be in HH:MM format.")
+            if start >= end:
+                raise ValueError("Working hours must end after they start.")
+            entry.start_time, entry.end_time = start.strftime("%H:%M"), end.strftime("%H:%M")
+            ranges.setdefault(entry.weekday, []).append((entry.start_time, entry.end_time))
+
+        for day_ranges in ranges.values():
+            day_ranges.sort()
+            for (_, previous_end), (start, _) in zip(day_ranges, day_ranges[1:]):
+                if start < previous_end:
+                    raise ValueError("Working hours on the same weekday cannot overlap.")
+
+    @staticmethod
+    def get_working_hours(doctor_id: int) -> List[WorkingHours]:
+        return WorkingHoursDAO.get_hours_for_doctor(doctor_id)
+
+    @staticmethod
+    def set_working_hours(doctor_id: int, hours: List[WorkingHours]) -> bool:
+        """Replaces a doctor's weekly template. An empty list falls back to DEFAULT_WORKING_HOURS."""
+        AvailabilityService.validate_working_hours(hours)
+        success = WorkingHoursDAO.replace_hours(doctor_id, hours)
+        db.on_commit(availability_index.invalidate_hours)
+        return success
+
+    @staticmethod
+    def find_free_slots(doctor_id: Optional[int] = None, specialty: Optional[str] = None,
+                        start: Optional[datetime] = None, days: int = AVAILABILITY_HORIZON_DAYS,
+                        duration: int = APPOINTMENT_DEFAULT_MINUTES, limit: int = 10) -> List[FreeSlot]:
+        """Returns the earliest `limit` free slots of `duration` minutes, soonest first.
+
+        Searches one doctor, every doctor with `specialty`, or every doctor,
+        from `start` (default now) for `days` days.
+        """
+        if not 0 < duration <= APPOINTMENT_MAX_MINUTES:
+            raise ValueError(f"Appointment duration must be between 1 and {APPOINTMENT_MAX_MINUTES} minutes.")
+        if doctor_id is not None:
+            doctor_ids = [doctor_id]
+        else:
+            doctors = DoctorService.get_all_doctors()
+            if specialty:
+                specialty_key = specialty.strip().lower()
+                doctors = [d for d in doctors if (d.specialty or "").strip().lower() == specialty_key]
+            doctor_ids = [d.id for d in doctors]
+        if not doctor_ids or limit <= 0:
+            return []
+
+        start = start or datetime.now()
+        slots_needed = availability_index.slots_for(duration)
+        first_day = start.date()
+        day_list = [first_day + timedelta(days=i) for i in range(days)]
+        availability_index.ensure_days(day_list)
+
+        # Nothing today that starts before `start`
+        start_minute = start.hour * 60 + start.minute + (1 if start.second or start.microsecond else 0)
+        first_slot_today = -(-start_minute // availability_index.slot_minutes)
+
+        results = []
+        for day in day_list:
+            first_slot = first_slot_today if day == first_day else 0
+            wanted = limit - len(results)
+            found = []
+            for candidate in doctor_ids:
+                starts = availability_index.free_starts(candidate, day, slots_needed, first_slot)
+                for _ in range(wanted):
+                    if not starts:
+                        break
+                    lowest = starts & -starts
+                    found.append((lowest.bit_length() - 1, candidate))
+                    starts ^= lowest
+            found.sort()
+            date_str = day.isoformat()
+            for slot, candidate in found[:wanted]:
+                results.append(FreeSlot(candidate, date_str, availability_index.slot_time(slot), duration))
+            if len(results) >= limit:
+                break
+        return results
+
+    @staticmethod
+    def next_free_slot(doctor_id: int, duration: int = APPOINTMENT_DEFAULT_MINUTES,
+                       start: Optional[datetime] = None) -> Optional[FreeSlot]:
+        slots = AvailabilityService.find_free_slots(doctor_id=doctor_id, start=start, duration=duration, limit=1)
+        return slots[0] if slots else None
@@ -1,7 +1,15 @@
+from dao.appointment_dao import AppointmentDAO
 from dao.billing_dao import BillingDAO
+from database import get_database
 from models.billing import Billing
-from typing import List, Optional
-from datetime import datetime
+from services.appointment_service import AppointmentService
+from typing import Dict, Iterator, List, Optional, Sequence
+from config import PAGE_SIZE, SEARCH_LIMIT
+from datetime import date, datetime
+
+AGING_BUCKETS = ("0-30", "31-60", "61-90", "90+")
+
+db = get_database()
 
 class BillingService:
     @staticmethod
@@ -14,6 +22,40 @@ class BillingService:
 
         return BillingDAO.insert_billing(billing)
 
+    @staticmethod
+    def complete_and_bill(billings: List[Billing]) -> bool:
+        """Marks each bill's appointment Completed and raises the bills, with one commit.
+
+        A bill without a patient_id takes its appointment's patient. Raises
+        ValueError if an amount isn't positive, or if an appointment is missing,
+        cancelled, already billed or listed twice; nothing is written in that case.
+        Also returns False without writing anything if the database rejects a write.
+        """
+        for billing in billings:
+            if billing.amount <= 0:
+                raise ValueError("Billing amount must be positive.")
+        appointment_ids = [billing.appointment_id for billing in billings]
+        if len(set(appointment_ids)) != len(appointment_ids):
+            raise ValueError("Each appointment can only be billed once.")
+
+        with db.transaction():
+            billed = BillingDAO.get_billed_appointment_ids(appointment_ids)
+            if billed:
+                raise ValueError(f"Appointment(s) already billed: {', '.join(map(str, sorted(billed)))}.")
+            patients = {a.id: a.patient_id for a in AppointmentDAO.get_appointments_by_ids(appointment_ids, ("patient_id",))}
+            for billing in billings:
+                expected = patients.get(billing.appointment_id)
+                if billing.patient_id is None:
+                    billing.patient_id = expected
+                elif expected is not None and billing.patient_id != expected:
+                    raise ValueError(f"Appointment {billing.appointment_id} belongs to a different patient.")
+            # Rejects missing and cancelled appointments before anything is inserted
+            if not AppointmentService.complete_appointments(appointment_ids):
+                return False
+            if len(billings) == 1:
+                return BillingDAO.insert_billing(billings[0])
+            return BillingDAO.insert_many(billings)
+
     @staticmethod
     def update_billing(billing: Billing) -> bool:
         if billing.amount <= 0:
@@ -30,13 +72,45 @@ class BillingService:
         return BillingDAO.get_billing_by_id(billing_id)
 
     @staticmethod
-    def get_billings_by_patient(patient_id: int) -> List[Billing]:
-        return BillingDAO.get_billings_by_patient(patient_id)
+    def get_billings_between(start: date, end: date) -> List[Billing]:
+        return BillingDAO.get_billings_between(start, end)
+
+    @staticmethod
+    def get_billings_by_patient(patient_id: int, columns: Optional[Sequence[str]] = None) -> List[Billing]:
+        return BillingDAO.get_billings_by_patient(patient_id, columns)
 
     @staticmethod
     def get_all_billings() -> List[Billing]:
         return BillingDAO.get_all_billings()
 
+    @staticmethod
+    def iter_billings(columns: Optional[Sequence[str]] = None) -> Iterator[Billing]:
+        return BillingDAO.iter_billings(columns=columns)
+
+    @staticmethod
+    def get_billings_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[Billing]:
+        return BillingDAO.get_billings_page(after_key, limit)
+
+    @staticmethod
+    def page_key(billing: Billing) -> tuple:
+        return BillingDAO.page_key(billing)
+
+    @staticmethod
+    def get_billing_rows_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[tuple]:
+        return BillingDAO.get_billing_rows_page(after_key, limit)
+
+    @staticmethod
+    def row_page_key(row: tuple) -> tuple:
+        return BillingDAO.row_page_key(row)
+
+    @staticmethod
+    def search_billings(text: str, limit: int = SEARCH_LIMIT) -> List[Billing]:
+        return BillingDAO.search_billings(text, limit)
+
+    @staticmethod
+    def search_billing_rows(text: str, limit: int = SEARCH_LIMIT) -> List[tuple]:
+        return BillingDAO.search_billing_rows(text, limit)
+
     @staticmethod
     def mark_billing_as_paid(billing: Billing) -> bool:
         billing.mark_as_paid()
@@ -44,5 +118,14 @@ class BillingService:
 
     @staticmethod
     def get_overdue_billings() -> List[Billing]:
-        all_billings = BillingDAO.get_all_billings()
-        return [b for b in all_billings if b.is_overdue()]
+        today = datetime.today().strftime("%Y-%m-%d")
+        return BillingDAO.get_overdue_billings(today)
+
+    @staticmethod
+    def get_overdue_aging() -> Dict[str, Dict[str, float]]:
+        """Returns count and total per aging bucket (0-30, 31-60, 61-90, 90+ days overdue)."""
+        today = datetime.today().strftime("%Y-%m-%d")
+        aging = {bucket: {"count": 0, "total": 0.0} for bucket in AGING_BUCKETS}
+        for bucket, count, total in BillingDAO.get_overdue_aging(today):
+            aging[bucket] = {"count": count, "total": round(total, 2)}
+        return aging
@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+
+from config import CACHE_ENABLED, CACHE_MAX_ENTRIES, CACHE_MAX_LIST_ROWS, CACHE_TTL_SECONDS
+
+_MISSING = object()
+ALL = ("all",)  # key used for the cached get_all_* list
+
+class EntityCache:
+    """Bounded LRU + TTL cache used by the services as an identity map.
+
+    Entities are keyed by id; whole-table lists of up to max_list_rows rows are
+    cached under ALL. Writes through the services must call invalidate() so
+    readers never see stale rows for longer than the TTL.
+
+    Loaders run outside the lock, often on worker threads, so a load may have
+    read the database before a write whose invalidate() has since run. Every
+    invalidate() or clear() bumps a generation, and a load that straddled one
+    is returned to its caller but not cached.
+    """
+
+    def __init__(self, name, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, enabled=CACHE_ENABLED,
+                 max_list_rows=CACHE_MAX_LIST_ROWS):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self.max_list_rows = max_list_rows
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._generation = 0           # bumped by invalidate() and clear()
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def get(self, key, loader):
+        """Returns the cached value for `key`, calling loader() on a miss."""
+        if not self.enabled:
+            return loader()
+
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        generation = self._generation
+        value = loader()
+        if value is not None:
+            self.put(key, value, generation)
+        return value
+
+    def get_list(self, loader, key_func=lambda entity: entity.id):
+        """Returns a cached list under ALL, also filling the by-id identity map."""
+        if not self.enabled:
+            return loader()
+
+        entities = self._lookup(ALL)
+        if entities is _MISSING:
+            generation = self._generation
+            entities = loader()
+            # One entry holds the whole list, so max_entries alone would not bound it
+            if len(entities) <= self.max_list_rows:
+                self.put(ALL, entities, generation)
+            for entity in entities[:self.max_entries - 1]:
+                self.put(key_func(entity), entity, generation)
+        return list(entities)
+
+    def put(self, key, value, generation=None):
+        """Caches `value`, unless `generation` is given and an invalidation has happened since."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys):
+        """Drops the given keys plus the cached list, which any write makes stale."""
+        with self._lock:
+            self._generation += 1
+            for key in (*keys, ALL):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+_registry = []
+
+def get_cache_stats() -> list[dict]:
+    """Hit/miss counters for every service cache, for tuning CACHE_* settings."""
+    return [cache.stats() for cache in _registry]
+
+def clear_all_caches():
+    for cache in _registry:
+        cache.clear()
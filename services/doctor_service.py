@@ -1,6 +1,12 @@
 from dao.doctor_dao import DoctorDAO
+from database import get_database
 from models.doctor import Doctor
+from services.cache import EntityCache
 from typing import List, Optional
+from config import PAGE_SIZE
+
+db = get_database()
+doctor_cache = EntityCache("doctors")
 
 class DoctorService:
     @staticmethod
@@ -11,23 +17,37 @@ class DoctorService:
         
         # Additional business rules can be added here
 
-        return DoctorDAO.insert_doctor(doctor)
+        success = DoctorDAO.insert_doctor(doctor)
+        db.on_commit(doctor_cache.invalidate)
+        return success
 
     @staticmethod
     def update_doctor(doctor: Doctor) -> bool:
         if not doctor.name.strip():
             raise ValueError("Doctor name cannot be empty.")
         
-        return DoctorDAO.update_doctor(doctor)
+        success = DoctorDAO.update_doctor(doctor)
+        db.on_commit(lambda: doctor_cache.invalidate(doctor.id))
+        return success
 
     @staticmethod
     def delete_doctor(doctor_id: int) -> bool:
-        return DoctorDAO.delete_doctor(doctor_id)
+        success = DoctorDAO.delete_doctor(doctor_id)
+        db.on_commit(lambda: doctor_cache.invalidate(doctor_id))
+        return success
 
     @staticmethod
     def get_doctor_by_id(doctor_id: int) -> Optional[Doctor]:
-        return DoctorDAO.get_doctor_by_id(doctor_id)
+        return doctor_cache.get(doctor_id, lambda: DoctorDAO.get_doctor_by_id(doctor_id))
 
     @staticmethod
     def get_all_doctors() -> List[Doctor]:
-        return DoctorDAO.get_all_doctors()
+        return doctor_cache.get_list(DoctorDAO.get_all_doctors)
+
+    @staticmethod
+    def get_doctors_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[Doctor]:
+        return DoctorDAO.get_doctors_page(after_key, limit)
+
+    @staticmethod
+    def page_key(doctor: Doctor) -> tuple:
+        return DoctorDAO.page_key(doctor)
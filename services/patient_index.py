@@ -0,0 +1,138 @@
+import re
+import threading
+from bisect import bisect_left, insort
+
+from dao.patient_dao import PatientDAO
+from models.patient import Patient
+
+# Everything the picker shows; the long address text is left out of memory
+INDEX_COLUMNS = ("id", "name", "dob", "gender", "contact_info")
+
+class PatientPrefixIndex:
+    """In-memory sorted index for type-ahead lookup of patients by name or contact number.
+
+    Every word of a patient's name and the digits of their contact number are
+    kept in one sorted list of (key, id) pairs, so a prefix query is a bisect
+    plus a short forward scan. PatientService keeps it current as patients are
+    added, edited and deleted; a bulk import just marks it for reload.
+    """
+
+    def __init__(self):
+        self._keys = []       # sorted (key, patient_id)
+        self._names = []      # sorted (full name, patient_id), for an empty query
+        self._patients = {}   # patient_id -> Patient
+        self._indexed = {}    # patient_id -> (keys, sort name) as indexed, in case the Patient is edited in place
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def ensure_loaded(self):
+        """Builds the index from the database on first use (or after invalidate())."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._keys, self._names, self._patients, self._indexed = [], [], {}, {}
+            for patient in PatientDAO.iter_patients(columns=INDEX_COLUMNS):
+                self._add(patient)
+            self._keys.sort()
+            self._names.sort()
+            self._loaded = True
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+
+    def add(self, patient: Patient):
+        with self._lock:
+            if self._loaded and patient.id is not None:
+                self._remove(patient.id)
+                self._add(patient, keep_sorted=True)
+
+    def update(self, patient: Patient):
+        self.add(patient)
+
+    def remove(self, patient_id: int):
+        with self._lock:
+            if self._loaded:
+                self._remove(patient_id)
+
+    def search(self, text: str, limit: int) -> list[Patient]:
+        """Returns up to `limit` patients whose name words or contact number start with `text`.
+
+        With several words, every word has to prefix-match part of the name or
+        contact. Text without letters is treated as a phone number.
+        """
+        words = _words(text)
+        with self._lock:
+            if not words:
+                return [self._patients[pid] for _, pid in self._names[:limit]]
+            if not re.search(r"[^\W\d_]", text):
+                words = [_digits(text)]
+
+            # Scan on the longest word (fewest candidates), then check the rest
+            first = max(words, key=len)
+            others = [w for w in words if w is not first]
+            results, seen = [], set()
+            for pid in self._prefix_ids(first):
+                if pid in seen:
+                    continue
+                seen.add(pid)
+                patient = self._patients[pid]
+                if others:
+                    keys = self._indexed[pid][0]
+                    if not all(any(key.startswith(w) for key in keys) for w in others):
+                        continue
+                results.append(patient)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _prefix_ids(self, prefix):
+        i = bisect_left(self._keys, (prefix,))
+        while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+            yield self._keys[i][1]
+            i += 1
+
+    def _add(self, patient, keep_sorted=False):
+        put = insort if keep_sorted else list.append
+        keys, sort_name = _index_keys(patient), (patient.name or "").lower()
+        self._patients[patient.id] = patient
+        self._indexed[patient.id] = (keys, sort_name)
+        for key in keys:
+            put(self._keys, (key, patient.id))
+        put(self._names, (sort_name, patient.id))
+
+    def _remove(self, patient_id):
+        self._patients.pop(patient_id, None)
+        keys, sort_name = self._indexed.pop(patient_id, ((), None))
+        for key in keys:
+            _discard(self._keys, (key, patient_id))
+        if sort_name is not None:
+            _discard(self._names, (sort_name, patient_id))
+
+
+def _discard(sorted_list, entry):
+    i = bisect_left(sorted_list, entry)
+    if i < len(sorted_list) and sorted_list[i] == entry:
+        del sorted_list[i]
+
+def _words(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+def _digits(text):
+    return re.sub(r"\D", "", text or "")
+
+def _index_keys(patient):
+    """Name words, contact words and the contact number's full digit string."""
+    keys = set(_words(patient.name)) | set(_words(patient.contact_info))
+    digits = _digits(patient.contact_info)
+    if digits:
+        keys.add(digits)
+    return keys
+
+
+# Shared by every picker; PatientService keeps it in step with writes
+patient_index = PatientPrefixIndex()
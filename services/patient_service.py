@@ -1,11 +1,18 @@
 from dao.patient_dao import PatientDAO
+from database import get_database
 from models.patient import Patient
-from typing import List, Optional
+from services.cache import EntityCache
+from services.patient_index import patient_index
+from typing import Iterator, List, Optional, Sequence
+from config import PAGE_SIZE, PICKER_MAX_RESULTS, SEARCH_LIMIT
 from datetime import datetime
 
+db = get_database()
+patient_cache = EntityCache("patients")
+
 class PatientService:
     @staticmethod
-    def add_patient(patient: Patient) -> bool:
+    def validate_patient(patient: Patient) -> None:
         # Basic validation: name and dob required
         if not patient.name.strip():
             raise ValueError("Patient name cannot be empty.")
@@ -19,35 +26,72 @@ class PatientService:
                 raise ValueError("Patient date of birth is not realistic.")
         except ValueError:
             raise ValueError("Patient date of birth must be in YYYY-MM-DD format.")
-        
+
         # Additional validations can be added here
 
-        return PatientDAO.insert_patient(patient)
+    @staticmethod
+    def add_patient(patient: Patient) -> bool:
+        PatientService.validate_patient(patient)
+        success = PatientDAO.insert_patient(patient)
+        # Caches and the picker index only see the write once it has committed
+        db.on_commit(patient_cache.invalidate)
+        if success:
+            db.on_commit(lambda: patient_index.add(patient))
+        return success
 
     @staticmethod
-    def update_patient(patient: Patient) -> bool:
-        if not patient.name.strip():
-            raise ValueError("Patient name cannot be empty.")
-        if not patient.dob:
-            raise ValueError("Patient date of birth is required.")
-        try:
-            dob_date = datetime.strptime(patient.dob, "%Y-%m-%d")
-            age = (datetime.today() - dob_date).days // 365
-            if age < 0 or age > 120:
-                raise ValueError("Patient date of birth is not realistic.")
-        except ValueError:
-            raise ValueError("Patient date of birth must be in YYYY-MM-DD format.")
+    def add_patients(patients: List[Patient]) -> bool:
+        """Validates and inserts a batch of patients in a single transaction."""
+        for patient in patients:
+            PatientService.validate_patient(patient)
+        success = PatientDAO.insert_many(patients)
+        db.on_commit(patient_cache.invalidate)
+        db.on_commit(patient_index.invalidate)
+        return success
 
-        return PatientDAO.update_patient(patient)
+    @staticmethod
+    def update_patient(patient: Patient) -> bool:
+        PatientService.validate_patient(patient)
+        success = PatientDAO.update_patient(patient)
+        db.on_commit(lambda: patient_cache.invalidate(patient.id))
+        if success:
+            db.on_commit(lambda: patient_index.update(patient))
+        return success
 
     @staticmethod
     def delete_patient(patient_id: int) -> bool:
-        return PatientDAO.delete_patient(patient_id)
+        success = PatientDAO.delete_patient(patient_id)
+        db.on_commit(lambda: patient_cache.invalidate(patient_id))
+        if success:
+            db.on_commit(lambda: patient_index.remove(patient_id))
+        return success
 
     @staticmethod
     def get_patient_by_id(patient_id: int) -> Optional[Patient]:
-        return PatientDAO.get_patient_by_id(patient_id)
+        return patient_cache.get(patient_id, lambda: PatientDAO.get_patient_by_id(patient_id))
 
     @staticmethod
     def get_all_patients() -> List[Patient]:
-        return PatientDAO.get_all_patients()
+        return patient_cache.get_list(PatientDAO.get_all_patients)
+
+    @staticmethod
+    def iter_patients(columns: Optional[Sequence[str]] = None) -> Iterator[Patient]:
+        return PatientDAO.iter_patients(columns=columns)
+
+    @staticmethod
+    def get_patients_page(after_key: Optional[tuple] = None, limit: int = PAGE_SIZE) -> List[Patient]:
+        return PatientDAO.get_patients_page(after_key, limit)
+
+    @staticmethod
+    def page_key(patient: Patient) -> tuple:
+        return PatientDAO.page_key(patient)
+
+    @staticmethod
+    def search_patients(text: str, limit: int = SEARCH_LIMIT) -> List[Patient]:
+        return PatientDAO.search_patients(text, limit)
+
+    @staticmethod
+    def find_patients_by_prefix(text: str, limit: int = PICKER_MAX_RESULTS) -> List[Patient]:
+        """Type-ahead lookup by name or contact number prefix, served from memory."""
+        patient_index.ensure_loaded()
+        return patient_index.search(text, limit)
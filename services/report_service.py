@@ -0,0 +1,153 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Dict, List
+
+from dao.report_dao import ReportDAO
+
+class RevenueTimeline:
+    """Running totals over the daily revenue rollup, for totals on any date range.
+
+    Days are kept sorted with bills, billed and collected as prefix-sum
+    arrays, so an ad-hoc range costs two bisects and a few subtractions
+    rather than a query. Built once per rollup watermark.
+    """
+
+    def __init__(self, rows):
+        self.days = [row[0] for row in rows]
+        self.bills = array("q", accumulate((row[1] for row in rows), initial=0))
+        self.billed = array("d", accumulate((row[2] for row in rows), initial=0.0))
+        self.collected = array("d", accumulate((row[3] for row in rows), initial=0.0))
+
+    def totals(self, start: str, end: str) -> Dict[str, float]:
+        lo = bisect_left(self.days, start)
+        hi = bisect_right(self.days, end)
+        return {
+            "bills": self.bills[hi] - self.bills[lo],
+            "billed": round(self.billed[hi] - self.billed[lo], 2),
+            "collected": round(self.collected[hi] - self.collected[lo], 2),
+        }
+
+_timeline = None
+_timeline_watermark = None
+_timeline_lock = threading.Lock()
+
+def _revenue_row(key, bills, billed, collected) -> dict:
+    return {
+        "key": key,
+        "bills": bills,
+        "billed": round(billed, 2),
+        "collected": round(collected, 2),
+        "outstanding": round(billed - collected, 2),
+    }
+
+class ReportService:
+    @staticmethod
+    def refresh() -> int:
+        """Brings the rollup tables up to date; a no-op when nothing changed."""
+        return ReportDAO.refresh_rollups()
+
+    @staticmethod
+    def get_revenue_by_day(start: str, end: str) -> List[dict]:
+        ReportService.refresh()
+        return [_revenue_row(*row) for row in ReportDAO.get_revenue_by_day(start, end)]
+
+    @staticmethod
+    def get_revenue_by_month(start: str, end: str) -> List[dict]:
+        ReportService.refresh()
+        return [_revenue_row(*row) for row in ReportDAO.get_revenue_by_month(start, end)]
+
+    @staticmethod
+    def get_revenue_by_doctor(start: str, end: str) -> List[dict]:
+        ReportService.refresh()
+        results = []
+        for doctor_id, name, specialty, bills, billed, collected in ReportDAO.get_revenue_by_doctor(start, end):
+            row = _revenue_row(doctor_id, bills, billed, collected)
+            row["name"] = name or "Unassigned"
+            row["specialty"] = specialty or ""
+            results.append(row)
+        return results
+
+    @staticmethod
+    def get_revenue_by_specialty(start: str, end: str) -> List[dict]:
+        ReportService.refresh()
+        return [
+            _revenue_row(specialty or "Unassigned", bills, billed, collected)
+            for specialty, bills, billed, collected in ReportDAO.get_revenue_by_specialty(start, end)
+        ]
+
+    @staticmethod
+    def get_collection_rates(start: str, end: str) -> dict:
+        """Returns bill counts and amounts per status, plus the share of billed revenue collected.
+
+        Cancelled bills are listed but left out of the collection rate.
+        """
+        ReportService.refresh()
+        rows = ReportDAO.get_revenue_by_status(start, end)
+        total = sum(amount for _, _, amount in rows)
+        billable = sum(amount for status, _, amount in rows if status != "Cancelled")
+        by_status = {
+            status or "Unknown": {
+                "bills": bills,
+                "amount": round(amount, 2),
+                "share": round(amount / total, 4) if total else 0.0,
+            }
+            for status, bills, amount in rows
+        }
+        paid = by_status.get("Paid", {}).get("amount", 0.0)
+        return {
+            "billed": round(total, 2),
+            "collected": paid,
+            "collection_rate": round(paid / billable, 4) if billable else 0.0,
+            "by_status": by_status,
+        }
+
+    @staticmethod
+    def get_appointment_volume(start: str, end: str) -> List[dict]:
+        """Returns appointment counts and booked minutes per doctor, broken down by status."""
+        ReportService.refresh()
+        doctors = {}
+        for doctor_id, name, specialty, status, count, minutes in ReportDAO.get_appointment_volume(start, end):
+            entry = doctors.setdefault(doctor_id, {
+                "doctor_id": doctor_id,
+                "name": name or "Unassigned",
+                "specialty": specialty or "",
+                "appointments": 0,
+                "minutes": 0,
+                "by_status": {},
+            })
+            entry["appointments"] += count
+            entry["minutes"] += minutes
+            entry["by_status"][status or "Unknown"] = count
+        return sorted(doctors.values(), key=lambda entry: entry["appointments"], reverse=True)
+
+    @staticmethod
+    def get_revenue_totals(start: str, end: str) -> Dict[str, float]:
+        """Bills, billed and collected for any date range, served from an in-memory timeline."""
+        global _timeline, _timeline_watermark
+        ReportService.refresh()
+        watermark = ReportDAO.get_watermark()
+        with _timeline_lock:
+            if _timeline is None or watermark != _timeline_watermark:
+                _timeline = RevenueTimeline(ReportDAO.get_revenue_by_day("0000-00-00", "9999-99-99"))
+                _timeline_watermark = watermark
+            return _timeline.totals(start, end)
+
+    @staticmethod
+    def get_month_report(year: int, month: int) -> dict:
+        """Everything for a month-end report, read from the rollups."""
+        start = date(year, month, 1)
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        start, end = start.isoformat(), end.isoformat()
+        ReportService.refresh()
+        return {
+            "month": start[:7],
+            "totals": ReportService.get_revenue_totals(start, end),
+            "by_day": ReportService.get_revenue_by_day(start, end),
+            "by_doctor": ReportService.get_revenue_by_doctor(start, end),
+            "by_specialty": ReportService.get_revenue_by_specialty(start, end),
+            "collection": ReportService.get_collection_rates(start, end),
+            "appointments": ReportService.get_appointment_volume(start, end),
+        }
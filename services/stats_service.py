@@ -0,0 +1,20 @@
+from dao.stats_dao import StatsDAO
+from datetime import datetime
+
+class StatsService:
+    @staticmethod
+    def get_summary() -> dict:
+        """Returns dashboard totals read from the trigger-maintained counters."""
+        counters = StatsDAO.get_counters()
+        today = datetime.today().strftime("%Y-%m-%d")
+        collected = StatsDAO.get_collected_between(today[:8] + "01", today)
+        return {
+            "patients": int(counters.get("patients", 0)),
+            "appointments": int(counters.get("appointments", 0)),
+            "doctors": int(counters.get("doctors", 0)),
+            "billings": int(counters.get("billings", 0)),
+            "appointments_today": StatsDAO.get_appointment_count_for_date(today),
+            "unpaid_billings": int(counters.get("unpaid_billings", 0)),
+            "unpaid_amount": round(counters.get("unpaid_amount", 0.0), 2),
+            "collected_this_month": round(collected, 2),
+        }
@@ -0,0 +1,5 @@
+# tools/__init__.py
+
+# Command-line utilities for bulk data work. Run them from the project root, e.g.:
+#   python -m tools.import_csv patients legacy_patients.csv
+#   python -m tools.export_data billing billing_history.csv
@@ -0,0 +1,44 @@
+"""Moves closed history out of the live database into the archive file.
+
+Paid bills and completed or cancelled appointments dated before the cutoff
+(default: ARCHIVE_AFTER_DAYS ago) are moved in small batches, so the clinic
+can keep working while it runs. Reports and dashboard totals are unchanged;
+patient history reads attach the archive when they need it.
+
+Usage:
+    python -m tools.archive_data
+    python -m tools.archive_data --before 2023-01-01 --batch-size 1000
+"""
+import argparse
+import sys
+from datetime import date
+
+from config import ARCHIVE_BATCH_PAUSE_MS, ARCHIVE_BATCH_SIZE
+from services.archive_service import ArchiveService
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive closed appointments and paid bills.")
+    parser.add_argument("--before", type=date.fromisoformat,
+                        help="archive rows dated before this day, YYYY-MM-DD (default: ARCHIVE_AFTER_DAYS ago)")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause-ms", type=int, default=ARCHIVE_BATCH_PAUSE_MS,
+                        help="pause between batches (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    from database import get_database
+    get_database().initialize_schema()
+
+    cutoff = args.before or ArchiveService.default_cutoff()
+    try:
+        moved = ArchiveService.archive_closed_records(cutoff, args.batch_size, args.pause_ms)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Archived {moved['billing']} bills and {moved['appointments']} appointments "
+          f"dated before {cutoff} to {ArchiveService.archive_path()}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
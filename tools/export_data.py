@@ -0,0 +1,77 @@
+"""Streaming CSV/JSONL export of patients, appointments and billing history.
+
+Rows are read with the services' iter_* generators and written as they
+arrive, so memory use stays flat no matter how large the table is.
+
+Usage:
+    python -m tools.export_data billing billing.csv
+    python -m tools.export_data appointments appointments.jsonl --format jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+
+from services.appointment_service import AppointmentService
+from services.billing_service import BillingService
+from services.patient_service import PatientService
+
+EXPORTERS = {
+    "patients": (
+        PatientService.iter_patients,
+        ("id", "name", "dob", "gender", "contact_info", "address"),
+    ),
+    "appointments": (
+        AppointmentService.iter_appointments,
+        ("id", "patient_id", "doctor_id", "date", "time", "reason", "status", "duration"),
+    ),
+    "billing": (
+        BillingService.iter_billings,
+        ("id", "patient_id", "appointment_id", "amount", "date", "status", "services_rendered"),
+    ),
+}
+
+
+def export_data(kind, out_path, fmt=None):
+    """Writes every `kind` record to `out_path` as CSV or JSONL. Returns the row count."""
+    iter_records, columns = EXPORTERS[kind]
+    fmt = fmt or ("jsonl" if os.path.splitext(out_path)[1].lower() in (".jsonl", ".json") else "csv")
+    count = 0
+
+    with open(out_path, "w", newline="", encoding="utf-8") as out:
+        if fmt == "csv":
+            writer = csv.writer(out)
+            writer.writerow(columns)
+            for record in iter_records():
+                writer.writerow([getattr(record, c) for c in columns])
+                count += 1
+        else:
+            for record in iter_records():
+                out.write(json.dumps({c: getattr(record, c) for c in columns}, ensure_ascii=False))
+                out.write("\n")
+                count += 1
+
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export clinic data without loading it all into memory.")
+    parser.add_argument("kind", choices=sorted(EXPORTERS))
+    parser.add_argument("out_path")
+    parser.add_argument("--format", dest="fmt", choices=("csv", "jsonl"),
+                        help="output format (default: from the file extension, else csv)")
+    args = parser.parse_args(argv)
+
+    try:
+        count = export_data(args.kind, args.out_path, args.fmt)
+    except sqlite3.Error as e:
+        print(f"Error: reading {args.kind} failed, {args.out_path} is incomplete: {e}")
+        return 1
+    print(f"Exported {count} {args.kind} rows to {args.out_path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Streaming CSV import for legacy patients and appointments.
+
+Rows are read in fixed-size chunks, checked with the same validation rules as
+the UI, and each chunk of valid rows is inserted in one transaction. An
+appointment that double-books its doctor, against the database or an earlier
+row of the same chunk, is rejected on its own. Invalid rows are written to an error CSV (original columns plus line and error) and
+the import carries on.
+
+Usage:
+    python -m tools.import_csv patients patients.csv
+    python -m tools.import_csv appointments appointments.csv --allow-past
+"""
+import argparse
+import csv
+import os
+import sys
+from bisect import bisect_right, insort
+from itertools import islice
+
+from config import APPOINTMENT_DEFAULT_MINUTES, IMPORT_CHUNK_SIZE
+from models.appointment import Appointment
+from models.patient import Patient
+from services.appointment_service import AppointmentConflictError, AppointmentService
+from services.patient_service import PatientService
+
+PATIENT_COLUMNS = ("name", "dob", "gender", "contact_info", "address")
+APPOINTMENT_COLUMNS = ("patient_id", "doctor_id", "date", "time", "reason", "status")  # "duration" is optional
+
+
+def patient_from_row(row, allow_past=False):
+    patient = Patient(
+        name=(row.get("name") or "").strip(),
+        dob=(row.get("dob") or "").strip(),
+        gender=(row.get("gender") or "").strip(),
+        contact_info=(row.get("contact_info") or "").strip(),
+        address=(row.get("address") or "").strip(),
+    )
+    PatientService.validate_patient(patient)
+    return patient
+
+
+def appointment_from_row(row, allow_past=False):
+    try:
+        patient_id = int(row.get("patient_id") or "")
+        doctor_id = int(row.get("doctor_id") or "")
+        duration = int(row.get("duration") or APPOINTMENT_DEFAULT_MINUTES)
+    except ValueError:
+        raise ValueError("patient_id, doctor_id and duration must be whole numbers.")
+    appointment = Appointment(
+        patient_id=patient_id,
+        doctor_id=doctor_id,
+        date=(row.get("date") or "").strip(),
+        time=(row.get("time") or "").strip(),
+        reason=(row.get("reason") or "").strip(),
+        status=(row.get("status") or "").strip() or "Scheduled",
+        duration=duration,
+    )
+    AppointmentService.validate_appointment(appointment, allow_past=allow_past)
+    return appointment
+
+
+def check_appointment(appointment, booked):
+    """Rejects a row overlapping one of its doctor's bookings in the database or
+    in `booked` (doctor_id -> earlier rows of the chunk, sorted by start), then adds it there."""
+    if appointment.status == "Cancelled":
+        return
+    conflicts = AppointmentService.find_conflicts(appointment)
+    rows = booked.setdefault(appointment.doctor_id, [])
+    # The rows kept so far never overlap each other, so only the neighbours around this start can
+    start = appointment.get_datetime()
+    index = bisect_right(rows, start, key=Appointment.get_datetime)
+    if index and rows[index - 1].get_end_datetime() > start:
+        conflicts.append(rows[index - 1])
+    if index < len(rows) and rows[index].get_datetime() < appointment.get_end_datetime():
+        conflicts.append(rows[index])
+    if conflicts:
+        raise AppointmentConflictError(appointment, conflicts)
+    insort(rows, appointment, key=Appointment.get_datetime)
+
+
+def insert_patients(patients, allow_past=False):
+    return PatientService.add_patients(patients)
+
+
+def insert_appointments(appointments, allow_past=False):
+    return AppointmentService.add_appointments(appointments, allow_past=allow_past)
+
+
+IMPORTERS = {
+    "patients": (PATIENT_COLUMNS, patient_from_row, None, insert_patients),
+    "appointments": (APPOINTMENT_COLUMNS, appointment_from_row, check_appointment, insert_appointments),
+}
+
+
+def import_csv(kind, csv_path, error_path=None, chunk_size=IMPORT_CHUNK_SIZE, allow_past=False):
+    """Imports `csv_path` as `kind` ("patients" or "appointments").
+
+    Returns (imported, rejected) row counts.
+    """
+    columns, parse_row, check_row, insert_batch = IMPORTERS[kind]
+    error_path = error_path or os.path.splitext(csv_path)[0] + "_errors.csv"
+    imported = rejected = 0
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as src, \
+            open(error_path, "w", newline="", encoding="utf-8") as err:
+        reader = csv.DictReader(src)
+        missing = [c for c in columns if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{csv_path} is missing columns: {', '.join(missing)}")
+
+        error_writer = csv.DictWriter(err, fieldnames=["line", *reader.fieldnames, "error"], extrasaction="ignore")
+        error_writer.writeheader()
+
+        # line_num is the file line a record ends on, which differs from its
+        # position once a quoted field spans several lines
+        numbered = ((reader.line_num, row) for row in reader)
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            if not chunk:
+                break
+
+            valid, valid_rows, booked = [], [], {}
+            for line, row in chunk:
+                try:
+                    item = parse_row(row, allow_past=allow_past)
+                    if check_row is not None:
+                        check_row(item, booked)
+                    valid.append(item)
+                    valid_rows.append((line, row))
+                except ValueError as e:
+                    error_writer.writerow({**row, "line": line, "error": str(e)})
+                    rejected += 1
+
+            reason = "Database insert failed for this chunk."
+            try:
+                inserted = bool(valid) and insert_batch(valid, allow_past=allow_past)
+            except ValueError as e:
+                # Only a booking made by another terminal since the rows were checked gets here
+                inserted, reason = False, f"Chunk rejected: {e}"
+
+            if inserted:
+                imported += len(valid)
+            elif valid:
+                for line, row in valid_rows:
+                    error_writer.writerow({**row, "line": line, "error": reason})
+                rejected += len(valid)
+                print(f"[IMPORT ERROR] Chunk at lines {chunk[0][0]}-{chunk[-1][0]} was not inserted.")
+
+            print(f"[IMPORT] {kind}: {imported} imported, {rejected} rejected")
+
+    return imported, rejected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import legacy clinic data from CSV.")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("csv_path")
+    parser.add_argument("--errors", dest="error_path", help="where to write rejected rows (default: <csv>_errors.csv)")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--allow-past", action="store_true",
+                        help="accept appointments dated in the past (historical records)")
+    args = parser.parse_args(argv)
+
+    from database import get_database
+    get_database().initialize_schema()
+
+    imported, rejected = import_csv(args.kind, args.csv_path, args.error_path, args.chunk_size, args.allow_past)
+    print(f"Done: {imported} imported, {rejected} rejected.")
+    return 0 if rejected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,10 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.appointment import Appointment
-from services.appointment_service import AppointmentService
-from services.patient_service import PatientService
-from services.doctor_service import DoctorService
+from ui.backend import get_service
+from ui.background import TaskRunner
+from ui.custom_widgets import PagedTreeview, PatientPicker
+from config import APPOINTMENT_DEFAULT_MINUTES
 from datetime import datetime
 
 class AppointmentPage(tk.Frame):
@@ -11,9 +12,11 @@ class AppointmentPage(tk.Frame):
         self.controller = kwargs.pop("controller", None)
         super().__init__(parent, *args, **kwargs)
 
-        self.appointment_service = AppointmentService()
-        self.patient_service = PatientService()
-        self.doctor_service = DoctorService()
+        self.appointment_service = get_service("AppointmentService")
+        self.patient_service = get_service("PatientService")
+        self.doctor_service = get_service("DoctorService")
+        self.availability_service = get_service("AvailabilityService")
+        self.doctors_map = {}
 
         self.create_widgets()
         self.load_appointments()
@@ -25,10 +28,13 @@ class AppointmentPage(tk.Frame):
         tk.Label(self, text="Appointment Management", font=("Arial", 16)).grid(row=0, column=0, columnspan=4, pady=10)
 
         tk.Label(self, text="Patient:").grid(row=1, column=0, sticky="e")
-        self.patient_var = tk.StringVar()
-        self.patient_combo = ttk.Combobox(self, textvariable=self.patient_var, state="readonly")
-        self.patient_combo.grid(row=1, column=1, sticky="w")
-        self.patient_combo.bind("<<ComboboxSelected>>", self.update_dob_label)
+        self.patient_picker = PatientPicker(
+            self,
+            search=self.patient_service.find_patients_by_prefix,
+            on_select=self.update_dob_label,
+            width=30,
+        )
+        self.patient_picker.grid(row=1, column=1, sticky="w")
 
         tk.Label(self, text="Doctor:").grid(row=1, column=2, sticky="e")
         self.doctor_var = tk.StringVar()
@@ -47,6 +53,10 @@ class AppointmentPage(tk.Frame):
         self.dob_label = tk.Label(self, text="", anchor="w")
         self.dob_label.grid(row=3, column=1, sticky="w")
 
+        tk.Label(self, text="Duration (min):").grid(row=3, column=2, sticky="e")
+        self.duration_entry = tk.Entry(self, width=20)
+        self.duration_entry.grid(row=3, column=3, sticky="w")
+
         tk.Label(self, text="Reason:").grid(row=4, column=0, sticky="e")
         self.reason_entry = tk.Entry(self, width=50)
         self.reason_entry.grid(row=4, column=1, columnspan=3, sticky="w")
@@ -57,30 +67,37 @@ class AppointmentPage(tk.Frame):
         self.refresh_btn = tk.Button(self, text="Refresh List", command=self.load_appointments)
         self.refresh_btn.grid(row=5, column=1, pady=10)
 
+        self.free_slot_btn = tk.Button(self, text="Next Free Slot", command=self.find_free_slot)
+        self.free_slot_btn.grid(row=5, column=2, pady=10)
+
         columns = ("id", "patient", "doctor", "date", "time", "reason", "status")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        self.table = PagedTreeview(
+            self,
+            columns=columns,
+            fetch_page=self.appointment_service.get_appointment_rows_page,
+            key_func=self.appointment_service.row_page_key,
+            row_values=lambda row: row,
+        )
+        self.tree = self.table.tree
         for col in columns:
             self.tree.heading(col, text=col.title())
             self.tree.column(col, width=100, anchor="center")
-        self.tree.grid(row=6, column=0, columnspan=4, sticky="nsew", pady=10)
-
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.grid(row=6, column=4, sticky="ns")
+        self.table.grid(row=6, column=0, columnspan=5, sticky="nsew", pady=10)
 
         self.grid_rowconfigure(6, weight=1)
         self.grid_columnconfigure(3, weight=1)
 
     def load_patients(self):
-        patients = self.patient_service.get_all_patients()
-        self.patients_map = {p.get_summary(): p for p in patients}
-        self.patient_combo['values'] = list(self.patients_map.keys())
-        if patients:
-            self.patient_combo.current(0)
-            self.update_dob_label()
+        self.patient_picker.load()
 
     def load_doctors(self):
-        doctors = self.doctor_service.get_all_doctors()
+        TaskRunner.for_widget(self).submit(
+            self.doctor_service.get_all_doctors,
+            on_success=self.show_doctors,
+            key=("appointment-doctors", id(self)),
+        )
+
+    def show_doctors(self, doctors):
         self.doctors_map = {d.get_display_name(): d.id for d in doctors}
         self.doctor_combo['values'] = list(self.doctors_map.keys())
         if doctors:
@@ -91,45 +108,47 @@ class AppointmentPage(tk.Frame):
         self.load_doctors()
 
     def load_appointments(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        appointments = self.appointment_service.get_all_appointments()
-        patients = self.patient_service.get_all_patients()
-        doctors = self.doctor_service.get_all_doctors()
-
-        patient_dict = {p.id: p.get_summary() for p in patients}
-        doctor_dict = {d.id: d.get_display_name() for d in doctors}
-
-        for appt in appointments:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    appt.id,
-                    patient_dict.get(appt.patient_id, "Unknown"),
-                    doctor_dict.get(appt.doctor_id, "Unknown"),
-                    appt.date,
-                    appt.time,
-                    appt.reason,
-                    appt.status
-                )
-            )
+        self.table.refresh()
 
-    def update_dob_label(self, event=None):
-        selected_summary = self.patient_var.get()
-        patient = self.patients_map.get(selected_summary)
+    def update_dob_label(self, patient=None):
+        patient = patient or self.patient_picker.get_patient()
         self.dob_label.config(text=patient.dob if patient else "")
 
+    def find_free_slot(self):
+        doctor_name = self.doctor_var.get()
+        duration_str = self.duration_entry.get().strip()
+        if doctor_name not in self.doctors_map:
+            messagebox.showerror("Validation Error", "Please select a valid doctor.")
+            return
+        if not duration_str.isdigit():
+            messagebox.showerror("Validation Error", "Duration must be a whole number of minutes.")
+            return
+        TaskRunner.for_widget(self).submit(
+            self.availability_service.next_free_slot, self.doctors_map[doctor_name], int(duration_str),
+            on_success=self.show_free_slot,
+            on_error=lambda e: messagebox.showerror("Error", str(e)),
+            key=("appointment-free-slot", id(self)),
+        )
+
+    def show_free_slot(self, slot):
+        if slot is None:
+            messagebox.showinfo("No Free Slot", "The doctor has no free slot of that length in the coming days.")
+            return
+        self.date_entry.delete(0, tk.END)
+        self.date_entry.insert(0, slot.date)
+        self.time_entry.delete(0, tk.END)
+        self.time_entry.insert(0, slot.time)
+
     def add_appointment(self):
         try:
-            patient_name = self.patient_var.get()
+            patient = self.patient_picker.get_patient()
             doctor_name = self.doctor_var.get()
             date_str = self.date_entry.get().strip()
             time_str = self.time_entry.get().strip()
             reason = self.reason_entry.get().strip()
+            duration_str = self.duration_entry.get().strip()
 
-            if not patient_name or patient_name not in self.patients_map:
+            if patient is None:
                 raise ValueError("Please select a valid patient.")
             if not doctor_name or doctor_name not in self.doctors_map:
                 raise ValueError("Please select a valid doctor.")
@@ -140,14 +159,17 @@ class AppointmentPage(tk.Frame):
 
             datetime.strptime(date_str, "%Y-%m-%d")
             datetime.strptime(time_str, "%H:%M")
+            if not duration_str.isdigit():
+                raise ValueError("Duration must be a whole number of minutes.")
 
             new_appointment = Appointment(
-                patient_id=self.patients_map[patient_name].id,
+                patient_id=patient.id,
                 doctor_id=self.doctors_map[doctor_name],
                 date=date_str,
                 time=time_str,
                 reason=reason,
-                status="Scheduled"
+                status="Scheduled",
+                duration=int(duration_str)
             )
 
             success = self.appointment_service.add_appointment(new_appointment)
@@ -165,9 +187,7 @@ class AppointmentPage(tk.Frame):
             messagebox.showerror("Error", f"Unexpected error: {str(e)}")
 
     def clear_form(self):
-        if self.patient_combo['values']:
-            self.patient_combo.current(0)
-            self.update_dob_label()
+        self.patient_picker.select_first()
         if self.doctor_combo['values']:
             self.doctor_combo.current(0)
         now = datetime.now()
@@ -176,6 +196,8 @@ class AppointmentPage(tk.Frame):
         self.time_entry.delete(0, tk.END)
         self.time_entry.insert(0, now.strftime("%H:%M"))
         self.reason_entry.delete(0, tk.END)
+        self.duration_entry.delete(0, tk.END)
+        self.duration_entry.insert(0, str(APPOINTMENT_DEFAULT_MINUTES))
 
     def refresh_dropdowns(self):
         self.load_doctors_and_patients()
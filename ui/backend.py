@@ -0,0 +1,57 @@
+"""Chooses where the pages' services run: in this process on the local SQLite
+database, or on a clinic server (`python -m server`) shared by several terminals.
+
+Pages ask for get_service("PatientService") instead of importing the class.
+With no server configured that is the PatientService class itself; with
+SERVER_URL, the CLINIC_SERVER environment variable or use_server() it is a
+RemoteService with the same methods.
+"""
+import importlib
+import os
+
+from config import SERVER_TOKEN, SERVER_URL
+
+LOCAL_SERVICES = {
+    "PatientService": "services.patient_service",
+    "DoctorService": "services.doctor_service",
+    "AppointmentService": "services.appointment_service",
+    "BillingService": "services.billing_service",
+    "StatsService": "services.stats_service",
+    "AvailabilityService": "services.availability_service",
+}
+
+_server_url = os.getenv("CLINIC_SERVER") or SERVER_URL
+_client = None
+
+
+def use_server(url, token=None):
+    """Sends every later get_service() call to the server at `url`; call before building any page."""
+    global _server_url, _client
+    _server_url, _client = url, None
+    if token is not None:
+        os.environ["CLINIC_SERVER_TOKEN"] = token
+
+
+def is_remote() -> bool:
+    return bool(_server_url)
+
+
+def get_client():
+    """The shared ServiceClient, or None when the services run locally."""
+    global _client
+    if not _server_url:
+        return None
+    if _client is None:
+        from server.client import ServiceClient
+        _client = ServiceClient(_server_url, token=os.getenv("CLINIC_SERVER_TOKEN") or SERVER_TOKEN)
+    return _client
+
+
+def get_service(name):
+    if name not in LOCAL_SERVICES:
+        raise KeyError(f"Unknown service: {name}")
+    client = get_client()
+    if client is not None:
+        return client.service(name)
+    # Imported on first use, like the pages themselves, so a remote terminal never loads the DAOs
+    return getattr(importlib.import_module(LOCAL_SERVICES[name]), name)
@@ -0,0 +1,147 @@
+"""Runs service calls on worker threads and hands results back to the Tk thread.
+
+Tkinter is not thread-safe, so workers never touch widgets: finished futures
+are queued and drained by an after() poll on the main loop, where the
+on_success/on_error callbacks run. Each task runs, and has its callbacks
+delivered, in a copy of the submitter's context, so a query-monitor action
+that started the task also counts the queries the task issues.
+"""
+import contextvars
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from config import TREE_INSERT_CHUNK, UI_POLL_INTERVAL_MS, UI_WORKER_THREADS
+from utils.query_monitor import QueryMonitor
+
+
+class BackgroundTask:
+    """Handle for a submitted call; cancel() guarantees its callbacks never run."""
+
+    def __init__(self, key=None):
+        self.key = key
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def done(self):
+        return self.cancelled or (self.future is not None and self.future.done())
+
+
+class TaskRunner:
+    def __init__(self, root, max_workers=UI_WORKER_THREADS, poll_interval=UI_POLL_INTERVAL_MS):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-worker")
+
+        self._finished = queue.SimpleQueue()
+        self._latest = {}   # key -> most recent task submitted under that key
+        self._pending = 0
+        self._polling = False
+
+    @classmethod
+    def for_widget(cls, widget):
+        """Returns the runner shared by every widget in `widget`'s toplevel window."""
+        root = widget.winfo_toplevel()
+        runner = getattr(root, "_task_runner", None)
+        if runner is None:
+            runner = cls(root)
+            root._task_runner = runner
+        return runner
+
+    def submit(self, fn, *args, on_success=None, on_error=None, key=None, **kwargs):
+        """Runs fn(*args, **kwargs) on a worker thread.
+
+        Submitting under a key that already has a task in flight cancels the
+        older one, so a page that reloads twice only ever renders the latest data.
+        """
+        if key is not None:
+            previous = self._latest.get(key)
+            if previous is not None:
+                previous.cancel()
+
+        task = BackgroundTask(key)
+        task.on_success = on_success
+        task.on_error = on_error
+        if key is not None:
+            self._latest[key] = task
+
+        task.context = contextvars.copy_context()
+        task.action = QueryMonitor.hold_current_action()
+        self._pending += 1
+        task.future = self.executor.submit(task.context.run, fn, *args, **kwargs)
+        task.future.add_done_callback(lambda future: self._finished.put(task))
+        self._schedule_poll()
+        return task
+
+    def cancel(self, key):
+        task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        for task in list(self._latest.values()):
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if task.key is not None and self._latest.get(task.key) is task:
+                del self._latest[task.key]
+            if not (task.cancelled or task.future.cancelled()):
+                task.context.run(self._deliver, task)
+            if task.action is not None:
+                task.action.release()
+
+        if self._pending > 0:
+            self._schedule_poll()
+
+    def _deliver(self, task):
+        error = task.future.exception()
+        try:
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+                else:
+                    print(f"[TASK ERROR] {error}")
+            elif task.on_success:
+                task.on_success(task.future.result())
+        except Exception as e:
+            print(f"[TASK ERROR] {e}")
+
+
+def insert_rows_in_chunks(tree, items, row_values=lambda item: item, chunk_size=TREE_INSERT_CHUNK,
+                          on_done=None, is_current=lambda: True, insert=None):
+    """Inserts items into a Treeview a chunk per event-loop turn so the UI keeps repainting.
+
+    is_current() is checked before every chunk; returning False abandons the
+    insert (e.g. when the table has been reloaded in the meantime). insert(values)
+    replaces the default append to the end of the tree.
+    """
+    insert = insert or (lambda values: tree.insert("", "end", values=values))
+
+    def insert_chunk(start):
+        if not is_current():
+            return
+        for item in items[start:start + chunk_size]:
+            insert(row_values(item))
+        if start + chunk_size < len(items):
+            tree.after(1, insert_chunk, start + chunk_size)
+        elif on_done:
+            on_done()
+
+    insert_chunk(0)
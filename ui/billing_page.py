@@ -1,9 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.billing import Billing
-from services.billing_service import BillingService
-from services.patient_service import PatientService
-from services.appointment_service import AppointmentService
+from ui.backend import get_service
+from ui.background import TaskRunner
+from ui.custom_widgets import PagedTreeview, PatientPicker, SearchBox
 from datetime import datetime
 
 class BillingPage(tk.Frame):
@@ -12,9 +12,10 @@ class BillingPage(tk.Frame):
         super().__init__(parent, *args, **kwargs)
 
         # Services
-        self.billing_service = BillingService()
-        self.patient_service = PatientService()
-        self.appointment_service = AppointmentService()
+        self.billing_service = get_service("BillingService")
+        self.patient_service = get_service("PatientService")
+        self.appointment_service = get_service("AppointmentService")
+        self.appointments_map = {}
 
         # UI Setup
         self.create_widgets()
@@ -27,10 +28,13 @@ class BillingPage(tk.Frame):
 
         # Patient Selection
         tk.Label(self, text="Patient:").grid(row=1, column=0, sticky="e")
-        self.patient_var = tk.StringVar()
-        self.patient_combo = ttk.Combobox(self, textvariable=self.patient_var, state="readonly")
-        self.patient_combo.grid(row=1, column=1, sticky="w")
-        self.patient_combo.bind("<<ComboboxSelected>>", self.on_patient_selected)
+        self.patient_picker = PatientPicker(
+            self,
+            search=self.patient_service.find_patients_by_prefix,
+            on_select=self.on_patient_selected,
+            width=30,
+        )
+        self.patient_picker.grid(row=1, column=1, sticky="w")
 
         # Appointment Selection
         tk.Label(self, text="Appointment:").grid(row=1, column=2, sticky="e")
@@ -62,42 +66,48 @@ class BillingPage(tk.Frame):
         self.refresh_btn = tk.Button(self, text="Refresh List", command=self.load_billings)
         self.refresh_btn.grid(row=4, column=1, pady=10)
 
-        # Billing List (Treeview)
+        self.search_box = SearchBox(self, on_search=self.search_billings, label_text="Search services:")
+        self.search_box.grid(row=4, column=2, columnspan=2, sticky="ew", padx=5)
+
+        # Billing List (Treeview, paged in as the user scrolls)
         columns = ("id", "patient", "appointment", "amount", "date", "status", "services_rendered")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        self.table = PagedTreeview(
+            self,
+            columns=columns,
+            fetch_page=self.billing_service.get_billing_rows_page,
+            key_func=self.billing_service.row_page_key,
+            row_values=lambda row: row,
+        )
+        self.tree = self.table.tree
         for col in columns:
             self.tree.heading(col, text=col.replace("_", " ").title())
             self.tree.column(col, width=120, anchor="center")
 
-        self.tree.grid(row=5, column=0, columnspan=4, sticky="nsew", pady=10)
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.grid(row=5, column=4, sticky="ns")
+        self.table.grid(row=5, column=0, columnspan=5, sticky="nsew", pady=10)
 
         # Grid weights for resizing
         self.grid_rowconfigure(5, weight=1)
         self.grid_columnconfigure(3, weight=1)
 
     def load_patients(self):
-        patients = self.patient_service.get_all_patients()
-        self.patients_map = {p.get_summary(): p.id for p in patients}
-        self.patient_combo['values'] = list(self.patients_map.keys())
-        if patients:
-            self.patient_combo.current(0)
-            self.load_appointments()  # Load appointments for first patient
-
-    def on_patient_selected(self, event):
+        self.patient_picker.load()
+
+    def on_patient_selected(self, patient):
         self.load_appointments()
 
     def load_appointments(self):
-        patient_name = self.patient_var.get()
-        if not patient_name or patient_name not in self.patients_map:
+        patient = self.patient_picker.get_patient()
+        if patient is None:
+            TaskRunner.for_widget(self).cancel(("billing-appointments", id(self)))
             self.appointment_combo['values'] = []
             return
-        patient_id = self.patients_map[patient_name]
-        appointments = self.appointment_service.get_appointments_by_patient(patient_id)
+        TaskRunner.for_widget(self).submit(
+            self.appointment_service.get_appointments_by_patient, patient.id, ("id", "date", "time"),
+            on_success=self.show_appointments,
+            key=("billing-appointments", id(self)),
+        )
+
+    def show_appointments(self, appointments):
         self.appointments_map = {f"{appt.date} {appt.time} (ID:{appt.id})": appt.id for appt in appointments}
         self.appointment_combo['values'] = list(self.appointments_map.keys())
         if appointments:
@@ -106,41 +116,27 @@ class BillingPage(tk.Frame):
             self.appointment_combo.set('')
 
     def load_billings(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        billings = self.billing_service.get_all_billings()
-        patients = self.patient_service.get_all_patients()
-        patient_dict = {p.id: p.get_summary() for p in patients}
-
-        appointments = self.appointment_service.get_all_appointments()
-        appointment_dict = {a.id: f"{a.date} {a.time}" for a in appointments}
-
-        for bill in billings:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    bill.id,
-                    patient_dict.get(bill.patient_id, "Unknown"),
-                    appointment_dict.get(bill.appointment_id, "Unknown"),
-                    f"{bill.amount:.2f}",
-                    bill.date,
-                    bill.status,
-                    bill.services_rendered,
-                )
-            )
+        self.table.refresh()
+
+    def search_billings(self, text):
+        if not text:
+            self.table.set_source(self.billing_service.get_billing_rows_page)
+            return
+        # Ranked results come back as a single page, so there is nothing after the first
+        self.table.set_source(
+            lambda after_key, limit: self.billing_service.search_billing_rows(text) if after_key is None else []
+        )
 
     def add_billing(self):
         try:
-            patient_name = self.patient_var.get()
+            patient = self.patient_picker.get_patient()
             appointment_desc = self.appointment_var.get()
             amount_str = self.amount_entry.get().strip()
             status = self.status_var.get()
             services = self.services_text.get("1.0", tk.END).strip()
             date_str = datetime.today().strftime("%Y-%m-%d")
 
-            if not patient_name or patient_name not in self.patients_map:
+            if patient is None:
                 raise ValueError("Please select a valid patient.")
             if not appointment_desc or appointment_desc not in self.appointments_map:
                 raise ValueError("Please select a valid appointment.")
@@ -151,7 +147,7 @@ class BillingPage(tk.Frame):
                 raise ValueError("Amount must be positive.")
 
             new_billing = Billing(
-                patient_id=self.patients_map[patient_name],
+                patient_id=patient.id,
                 appointment_id=self.appointments_map[appointment_desc],
                 amount=amount,
                 date=date_str,
@@ -173,8 +169,7 @@ class BillingPage(tk.Frame):
             messagebox.showerror("Error", f"Unexpected error: {str(e)}")
 
     def clear_form(self):
-        if self.patient_combo['values']:
-            self.patient_combo.current(0)
+        self.patient_picker.select_first()
         self.load_appointments()
         self.amount_entry.delete(0, tk.END)
         self.status_combo.set("Pending")
@@ -1,6 +1,9 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import messagebox, ttk
 from datetime import datetime
+from config import PAGE_SIZE, PICKER_MAX_RESULTS, SEARCH_DEBOUNCE_MS
+from ui.background import TaskRunner, insert_rows_in_chunks
+from ui.table_sync import TreeviewSync
 
 class LabeledEntry(ttk.Frame):
     """A compound widget combining a label and an entry field."""
@@ -66,3 +69,278 @@ class DateEntry(ttk.Frame):
     def clear(self):
         self.entry.delete(0, tk.END)
         self.entry.insert(0, self.date_format)
+
+
+class SearchBox(ttk.Frame):
+    """A labelled entry that calls on_search(text) once the user pauses typing."""
+
+    def __init__(self, parent, on_search, label_text="Search:", entry_width=30, delay_ms=SEARCH_DEBOUNCE_MS, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.on_search = on_search
+        self.delay_ms = delay_ms
+        self._pending = None
+        self._last_text = None  # text of the last search, so keys that don't edit it don't search again
+
+        self.var = tk.StringVar()
+        ttk.Label(self, text=label_text).pack(side="left", padx=(0, 5))
+        self.entry = ttk.Entry(self, textvariable=self.var, width=entry_width)
+        self.entry.pack(side="left", fill="x", expand=True)
+
+        self.entry.bind("<KeyRelease>", self._schedule)
+        self.entry.bind("<Return>", lambda event: self._fire())
+        self.entry.bind("<Escape>", lambda event: self.clear())
+
+    def get(self) -> str:
+        return self.var.get().strip()
+
+    def clear(self):
+        self.var.set("")
+        self._fire()
+
+    def _schedule(self, event=None):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        # Arrows, Shift, the release of Return after _fire(), or typing back to the last search
+        if self.get() == self._last_text:
+            return
+        self._pending = self.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        self._last_text = self.get()
+        self.on_search(self._last_text)
+
+
+class PatientPicker(ttk.Combobox):
+    """An editable combobox that suggests patients by name or contact prefix as the user types.
+
+    search(text, limit) must return matching Patient objects. Lookups run on a
+    worker thread, since the first may build an index and with a clinic server
+    each one is a network call; typing triggers one once the user pauses for
+    delay_ms.
+    """
+
+    NAVIGATION_KEYS = {"Up", "Down", "Return", "Escape", "Tab", "Left", "Right", "Home", "End"}
+
+    def __init__(self, parent, search, on_select=None, max_results=PICKER_MAX_RESULTS,
+                 delay_ms=SEARCH_DEBOUNCE_MS, **kwargs):
+        self.var = tk.StringVar()
+        super().__init__(parent, textvariable=self.var, **kwargs)
+        self.search = search
+        self.on_select = on_select
+        self.max_results = max_results
+        self.delay_ms = delay_ms
+        self.matches = {}
+        self.loaded = False
+        self._pending = None
+
+        self.bind("<KeyRelease>", self._on_key)
+        self.bind("<<ComboboxSelected>>", lambda event: self._selected())
+
+    def load(self):
+        """Builds the index in the background, then fills in the first suggestions."""
+        if self.loaded:
+            self.refresh()
+            return
+        self._submit("", self._on_loaded)
+
+    def refresh(self):
+        """Re-runs the lookup for the current text, keeping the selection if it still matches."""
+        current = self.get_patient()
+        self._submit(self._query(), lambda patients: self._on_refreshed(current, patients))
+
+    def _on_refreshed(self, current, patients):
+        self.show_matches(patients)
+        if current is None and self.matches and not self.var.get():
+            self.select_first()
+
+    def show_matches(self, patients):
+        self.matches = {f"{p.get_summary()} [ID {p.id}]": p for p in patients}
+        self['values'] = list(self.matches.keys())
+
+    def select_first(self):
+        if self.matches:
+            self.current(0)
+            self._selected()
+
+    def get_patient(self):
+        """Returns the Patient whose label is in the box, or None."""
+        return self.matches.get(self.var.get())
+
+    def _on_loaded(self, patients):
+        self.loaded = True
+        self.show_matches(patients)
+        if self.get_patient() is None:
+            self.select_first()
+
+    def _on_key(self, event):
+        if not self.loaded or event.keysym in self.NAVIGATION_KEYS:
+            return
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(self.delay_ms, self._lookup)
+
+    def _lookup(self):
+        self._pending = None
+        self._submit(self._query(), self._on_looked_up)
+
+    def _on_looked_up(self, patients):
+        self.show_matches(patients)
+        if self.get_patient() is not None:
+            self._selected()
+
+    def _submit(self, text, on_success):
+        # One key for every lookup, so only the latest one's results are shown
+        TaskRunner.for_widget(self).submit(
+            self.search, text, self.max_results,
+            on_success=on_success,
+            on_error=lambda e: messagebox.showerror("Error", f"Could not search patients: {e}"),
+            key=("patient-picker", id(self)),
+        )
+
+    def _query(self) -> str:
+        # A full label from the list should not be treated as search text
+        text = self.var.get()
+        if text in self.matches:
+            return self.matches[text].name
+        return text.strip()
+
+    def _selected(self):
+        if self.on_select:
+            self.on_select(self.get_patient())
+
+
+class PagedTreeview(ttk.Frame):
+    """A Treeview with scrollbar that pulls rows from a keyset-paginated source on demand.
+
+    Only the first page is loaded up front; the next page is fetched when the
+    visible area gets close to the last loaded row, so large tables open
+    immediately and rows the user never scrolls to are never queried. Pages are
+    fetched on a worker thread and inserted in chunks, with a loading indicator
+    shown meanwhile.
+
+    fetch_page(after_key, limit) returns a list of items, key_func(item) returns
+    the keyset key of an item and row_values(item) the tuple shown in the tree;
+    its first value must be the row's database id, which keys the tree items.
+    refresh() re-reads the first page and applies only the changes; rows further
+    down are dropped and load again as the user scrolls.
+    """
+
+    def __init__(self, parent, columns, fetch_page, key_func, row_values, page_size=PAGE_SIZE,
+                 tree_cls=ttk.Treeview, prefetch_threshold=0.9, **tree_options):
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.key_func = key_func
+        self.row_values = row_values
+        self.page_size = page_size
+        self.prefetch_threshold = prefetch_threshold
+
+        self._last_key = None
+        self._exhausted = False
+        self._loading = False
+        self._generation = 0  # bumped by reload()/refresh() so late pages from an older load are dropped
+
+        self.tree = tree_cls(self, columns=columns, show="headings", **tree_options)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+        self.loading_label = ttk.Label(self, text="Loading...")
+        self.sync = TreeviewSync(self.tree)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+    def set_source(self, fetch_page, key_func=None):
+        """Switches to a different row source (e.g. search results) and reloads."""
+        self.fetch_page = fetch_page
+        if key_func is not None:
+            self.key_func = key_func
+        self.reload()
+
+    def reload(self):
+        """Clears the tree and loads the first page again."""
+        self._generation += 1
+        self.sync.clear()
+        self._last_key = None
+        self._exhausted = False
+        self._loading = False
+        self.load_more()
+
+    def refresh(self):
+        """Re-reads the first page and updates the tree in place.
+
+        Rows past the first page are dropped and the keyset cursor starts over
+        after it, so an edit costs one page query however far the user had
+        scrolled. Falls back to reload() when nothing has been loaded yet.
+        """
+        if not len(self.sync):
+            self.reload()
+            return
+        self._generation += 1
+        self._loading = True
+        self.loading_label.place(relx=0.5, rely=1.0, anchor="s", y=-4)
+
+        generation = self._generation
+        TaskRunner.for_widget(self).submit(
+            self.fetch_page, None, self.page_size,
+            on_success=lambda items: self._on_refreshed(generation, items),
+            on_error=lambda error: self._on_page_failed(generation, error),
+            key=("paged-treeview", id(self)),
+        )
+
+    def _on_refreshed(self, generation, items):
+        if generation != self._generation:
+            return
+        self._last_key = self.key_func(items[-1]) if items else None
+        self._exhausted = len(items) < self.page_size
+        self.sync.sync([self.row_values(item) for item in items])
+        self._finish_loading()
+
+    def load_more(self):
+        """Fetches the next page in the background, if there is one."""
+        if self._exhausted or self._loading:
+            return
+        self._loading = True
+        self.loading_label.place(relx=0.5, rely=1.0, anchor="s", y=-4)
+
+        generation = self._generation
+        TaskRunner.for_widget(self).submit(
+            self.fetch_page, self._last_key, self.page_size,
+            on_success=lambda items: self._on_page_loaded(generation, items),
+            on_error=lambda error: self._on_page_failed(generation, error),
+            key=("paged-treeview", id(self)),
+        )
+
+    def _on_page_loaded(self, generation, items):
+        if generation != self._generation:
+            return
+        if items:
+            self._last_key = self.key_func(items[-1])
+        self._exhausted = len(items) < self.page_size
+        insert_rows_in_chunks(
+            self.tree, items, self.row_values,
+            on_done=self._finish_loading,
+            is_current=lambda: generation == self._generation,
+            insert=self.sync.append,
+        )
+
+    def _on_page_failed(self, generation, error):
+        if generation == self._generation:
+            print(f"[DB ERROR] Could not load rows: {error}")
+            self._finish_loading()
+
+    def _finish_loading(self):
+        self._loading = False
+        self.loading_label.place_forget()
+        # A short page may not fill the view, in which case no scroll event will ask for more
+        if not self._exhausted and self.tree.yview()[1] >= self.prefetch_threshold:
+            self.after_idle(self.load_more)
+
+    def _on_tree_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self._exhausted and float(last) >= self.prefetch_threshold:
+            self.after_idle(self.load_more)
@@ -1,19 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
-from services.patient_service import PatientService
-from services.appointment_service import AppointmentService
-from services.doctor_service import DoctorService
-from services.billing_service import BillingService
+from ui.backend import get_service
+from ui.background import TaskRunner
 
 class DashboardPage(tk.Frame):
     def __init__(self, parent, *args, **kwargs):
         self.controller = kwargs.pop('controller', None)
         super().__init__(parent, *args, **kwargs)
 
-        self.patient_service = PatientService()
-        self.appointment_service = AppointmentService()
-        self.doctor_service = DoctorService()
-        self.billing_service = BillingService()
+        self.stats_service = get_service("StatsService")
 
         self.create_widgets()
         self.load_summary()
@@ -37,9 +32,14 @@ class DashboardPage(tk.Frame):
         self.doctor_count_label = self._create_summary_card(summary_frame, "Total Doctors", 2)
         self.billing_count_label = self._create_summary_card(summary_frame, "Total Billings", 3)
 
-    def _create_summary_card(self, parent, title, column):
+        self.today_count_label = self._create_summary_card(summary_frame, "Today's Appointments", 0, row=1)
+        self.unpaid_count_label = self._create_summary_card(summary_frame, "Unpaid Bills", 1, row=1)
+        self.unpaid_amount_label = self._create_summary_card(summary_frame, "Outstanding Amount", 2, row=1)
+        self.collected_label = self._create_summary_card(summary_frame, "Collected This Month", 3, row=1)
+
+    def _create_summary_card(self, parent, title, column, row=0):
         frame = ttk.Frame(parent, relief="ridge", borderwidth=2, padding=10)
-        frame.grid(row=0, column=column, padx=10, pady=10, sticky="nsew")
+        frame.grid(row=row, column=column, padx=10, pady=10, sticky="nsew")
 
         ttk.Label(frame, text=title, font=("Arial", 12)).pack()
         count_label = ttk.Label(frame, text="0", font=("Arial", 24, "bold"), foreground="blue")
@@ -47,12 +47,18 @@ class DashboardPage(tk.Frame):
         return count_label
 
     def load_summary(self):
-        patient_count = len(self.patient_service.get_all_patients())
-        appointment_count = len(self.appointment_service.get_all_appointments())
-        doctor_count = len(self.doctor_service.get_all_doctors())
-        billing_count = len(self.billing_service.get_all_billings())
-
-        self.patient_count_label.config(text=str(patient_count))
-        self.appointment_count_label.config(text=str(appointment_count))
-        self.doctor_count_label.config(text=str(doctor_count))
-        self.billing_count_label.config(text=str(billing_count))
+        TaskRunner.for_widget(self).submit(
+            self.stats_service.get_summary,
+            on_success=self.show_summary,
+            key="dashboard-summary",
+        )
+
+    def show_summary(self, summary):
+        self.patient_count_label.config(text=str(summary["patients"]))
+        self.appointment_count_label.config(text=str(summary["appointments"]))
+        self.doctor_count_label.config(text=str(summary["doctors"]))
+        self.billing_count_label.config(text=str(summary["billings"]))
+        self.today_count_label.config(text=str(summary["appointments_today"]))
+        self.unpaid_count_label.config(text=str(summary["unpaid_billings"]))
+        self.unpaid_amount_label.config(text=f"{summary['unpaid_amount']:.2f}")
+        self.collected_label.config(text=f"{summary['collected_this_month']:.2f}")
@@ -3,14 +3,15 @@ from ttkbootstrap.constants import *
 from tkinter import messagebox
 
 from models.doctor import Doctor
-from services.doctor_service import DoctorService
+from ui.backend import get_service
+from ui.custom_widgets import PagedTreeview
 
 class DoctorPage(ttkb.Frame):
     def __init__(self, parent, *args, **kwargs):
         self.controller = kwargs.pop('controller', None)
         super().__init__(parent, *args, **kwargs)
 
-        self.doctor_service = DoctorService()
+        self.doctor_service = get_service("DoctorService")
         self.selected_id = None
 
         self.create_widgets()
@@ -47,19 +48,26 @@ class DoctorPage(ttkb.Frame):
         ttkb.Button(button_frame, text="Delete", command=self.delete_doctor, bootstyle="danger").grid(row=0, column=2, padx=10)
 
         # Doctor list
-        self.tree = ttkb.Treeview(self, columns=("ID", "Name", "Specialty", "Contact"), show="headings", height=8, bootstyle="info")
+        self.table = PagedTreeview(
+            self,
+            columns=("ID", "Name", "Specialty", "Contact"),
+            fetch_page=self.doctor_service.get_doctors_page,
+            key_func=self.doctor_service.page_key,
+            row_values=lambda d: (d.id, d.name, d.specialty, d.contact_info),
+            tree_cls=ttkb.Treeview,
+            height=8,
+            bootstyle="info",
+        )
+        self.tree = self.table.tree
         for col in ("ID", "Name", "Specialty", "Contact"):
             self.tree.heading(col, text=col)
             self.tree.column(col, width=150)
-        self.tree.pack(pady=10, fill="x", padx=20)
+        self.table.pack(pady=10, fill="x", padx=20)
 
         self.tree.bind("<<TreeviewSelect>>", self.on_doctor_select)
 
     def load_doctor_data(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        for doctor in self.doctor_service.get_all_doctors():
-            self.tree.insert("", "end", values=(doctor.id, doctor.name, doctor.specialty, doctor.contact_info))
+        self.table.refresh()
 
     def save_doctor(self):
         name = self.name_entry.get().strip()
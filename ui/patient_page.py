@@ -1,7 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from models.patient import Patient
-from services.patient_service import PatientService
+from ui.backend import get_service
+from ui.custom_widgets import PagedTreeview, SearchBox
 from datetime import datetime
 
 class PatientPage(tk.Frame):
@@ -9,7 +10,7 @@ class PatientPage(tk.Frame):
         self.controller = kwargs.pop('controller', None )
         super().__init__(parent, *args, **kwargs)
 
-        self.patient_service = PatientService()
+        self.patient_service = get_service("PatientService")
 
         self.create_widgets()
         self.load_patients()
@@ -48,42 +49,40 @@ class PatientPage(tk.Frame):
         self.refresh_btn = tk.Button(self, text="Refresh List", command=self.load_patients)
         self.refresh_btn.grid(row=4, column=1, pady=10)
 
-        # Patient List Treeview
+        self.search_box = SearchBox(self, on_search=self.search_patients, label_text="Search name / contact / address:")
+        self.search_box.grid(row=4, column=2, columnspan=2, sticky="ew", padx=5)
+
+        # Patient List Treeview (rows are fetched page by page as the user scrolls)
         columns = ("id", "name", "dob", "gender", "contact", "address")
-        self.tree = ttk.Treeview(self, columns=columns, show="headings")
+        self.table = PagedTreeview(
+            self,
+            columns=columns,
+            fetch_page=self.patient_service.get_patients_page,
+            key_func=self.patient_service.page_key,
+            row_values=lambda p: (p.id, p.name, p.dob, p.gender, p.contact_info, p.address),
+        )
+        self.tree = self.table.tree
         for col in columns:
             self.tree.heading(col, text=col.title())
             self.tree.column(col, width=120, anchor="center")
 
-        self.tree.grid(row=5, column=0, columnspan=4, sticky="nsew", pady=10)
-
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=scrollbar.set)
-        scrollbar.grid(row=5, column=4, sticky="ns")
+        self.table.grid(row=5, column=0, columnspan=5, sticky="nsew", pady=10)
 
         # Configure grid weights for resizing
         self.grid_rowconfigure(5, weight=1)
         self.grid_columnconfigure(3, weight=1)
 
     def load_patients(self):
-        for row in self.tree.get_children():
-            self.tree.delete(row)
-
-        patients = self.patient_service.get_all_patients()
-        for p in patients:
-            self.tree.insert(
-                "",
-                "end",
-                values=(
-                    p.id,
-                    p.name,
-                    p.dob,
-                    p.gender,
-                    p.contact_info,
-                    p.address,
-                )
-            )
+        self.table.refresh()
+
+    def search_patients(self, text):
+        if not text:
+            self.table.set_source(self.patient_service.get_patients_page)
+            return
+        # Ranked results come back as a single page, so there is nothing after the first
+        self.table.set_source(
+            lambda after_key, limit: self.patient_service.search_patients(text) if after_key is None else []
+        )
 
     def add_patient(self):
         try:
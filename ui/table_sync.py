@@ -0,0 +1,140 @@
+from bisect import bisect_left
+
+class TreeviewSync:
+    """Keeps a Treeview in step with an ordered list of rows, keyed by database id.
+
+    Each row's id becomes its Treeview item id, so sync() can apply just the
+    inserts, updates, moves and deletes between the rows on screen and a fresh
+    query result. Tk calls are only made for rows that changed; selection and
+    scroll position survive because unchanged items are never recreated.
+    """
+
+    def __init__(self, tree, id_func=lambda values: values[0]):
+        self.tree = tree
+        self.id_func = id_func
+        self._values = {}  # iid -> values tuple currently shown
+        self._order = []   # iids in display order
+
+    def __len__(self):
+        return len(self._order)
+
+    def clear(self):
+        if self._order:
+            self.tree.delete(*self._order)
+        self._values.clear()
+        self._order.clear()
+
+    def append(self, values):
+        iid = str(self.id_func(values))
+        if iid in self._values:
+            # A row can straddle two keyset pages if it was edited between fetches
+            self.tree.item(iid, values=values)
+        else:
+            self.tree.insert("", "end", iid=iid, values=values)
+            self._order.append(iid)
+        self._values[iid] = values
+
+    def sync(self, rows) -> dict:
+        """Makes the tree show exactly `rows`, in order. Returns counts of each kind of change."""
+        changes = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0}
+        anchor = self._top_visible()
+
+        new_order = [str(self.id_func(values)) for values in rows]
+        new_ids = set(new_order)
+
+        stale = [iid for iid in self._order if iid not in new_ids]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self._values[iid]
+            changes["deleted"] = len(stale)
+
+        current = [iid for iid in self._order if iid in new_ids]
+        old_index = {iid: i for i, iid in enumerate(current)}
+        # Rows on the longest run that is already in order stay put; only the rest are moved
+        keep = _longest_increasing_run(current, new_order)
+        # Rows still waiting to be moved sit at their old places and push later positions down
+        waiting = _PositionCounts(len(current))
+        for iid in current:
+            if iid not in keep:
+                waiting.add(old_index[iid], 1)
+
+        last_kept = 0  # old position just past the last kept row placed so far
+        for index, (iid, values) in enumerate(zip(new_order, rows)):
+            if iid in keep:
+                last_kept = old_index[iid] + 1
+            else:
+                # The rows placed so far are contiguous up to this row's slot, with only
+                # waiting rows from above the last kept row still in front of them
+                if iid in self._values:
+                    waiting.add(old_index[iid], -1)
+                position = index + waiting.before(last_kept)
+                if iid in self._values:
+                    self.tree.move(iid, "", position)
+                    changes["moved"] += 1
+                else:
+                    self.tree.insert("", position, iid=iid, values=values)
+                    changes["inserted"] += 1
+            if iid in self._values and self._values[iid] != values:
+                self.tree.item(iid, values=values)
+                changes["updated"] += 1
+            self._values[iid] = values
+
+        self._order = new_order
+        self._restore_top(anchor)
+        return changes
+
+    def _top_visible(self):
+        iid = self.tree.identify_row(1)
+        return iid or None
+
+    def _restore_top(self, anchor):
+        if anchor and anchor in self._values and self._order:
+            self.tree.yview_moveto(self.tree.index(anchor) / len(self._order))
+
+
+def _longest_increasing_run(current, new_order) -> set:
+    """Returns the largest set of ids whose relative order is the same in both lists."""
+    old_index = {iid: i for i, iid in enumerate(current)}
+    sequence = [iid for iid in new_order if iid in old_index]
+
+    tails = []        # tails[k] = position in sequence ending the best run of length k + 1
+    previous = [None] * len(sequence)
+    tail_values = []
+    for pos, iid in enumerate(sequence):
+        value = old_index[iid]
+        k = bisect_left(tail_values, value)
+        if k == len(tail_values):
+            tails.append(pos)
+            tail_values.append(value)
+        else:
+            tails[k] = pos
+            tail_values[k] = value
+        previous[pos] = tails[k - 1] if k else None
+
+    keep = set()
+    pos = tails[-1] if tails else None
+    while pos is not None:
+        keep.add(sequence[pos])
+        pos = previous[pos]
+    return keep
+
+
+class _PositionCounts:
+    """Counts marked positions before a given one (a Fenwick tree), each step in O(log n)."""
+
+    def __init__(self, size):
+        self._tree = [0] * (size + 1)
+
+    def add(self, position, delta):
+        position += 1
+        while position < len(self._tree):
+            self._tree[position] += delta
+            position += position & -position
+
+    def before(self, position):
+        total = 0
+        while position > 0:
+            total += self._tree[position]
+            position -= position & -position
+        return total
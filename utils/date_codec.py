@@ -0,0 +1,81 @@
+"""Cached conversions between the stored date/time strings and Python values.
+
+Dates are stored as "YYYY-MM-DD" and times as "HH:MM". The same few
+thousand values (visit days, birthdays) are parsed over and over, so
+each parse is memoised, and the common zero-padded form is sliced
+directly instead of going through strptime.
+
+The integer forms match the generated columns added by migration 8:
+ordinals are date.toordinal() (billing.date_ord) and epochs are seconds
+since 1970-01-01 for the naive local time (appointments.start_ts).
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from config import DATE_CODEC_CACHE_SIZE, DEFAULT_DATE_FORMAT, DEFAULT_TIME_FORMAT
+
+EPOCH = datetime(1970, 1, 1)
+
+@lru_cache(maxsize=DATE_CODEC_CACHE_SIZE)
+def parse_date(value):
+    """Returns the date for "YYYY-MM-DD" text, or None if it isn't a valid date."""
+    if not isinstance(value, str):
+        return None
+    try:
+        if len(value) == 10 and value[4] == "-" and value[7] == "-":
+            return date(int(value[:4]), int(value[5:7]), int(value[8:]))
+        # Unpadded forms such as "1972-6-4" are still accepted, as strptime does
+        return datetime.strptime(value, DEFAULT_DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+@lru_cache(maxsize=DATE_CODEC_CACHE_SIZE)
+def parse_time(value):
+    """Returns (hour, minute) for "HH:MM" text, or None if it isn't a valid time."""
+    if not isinstance(value, str):
+        return None
+    try:
+        if len(value) == 5 and value[2] == ":":
+            hour, minute = int(value[:2]), int(value[3:])
+        else:
+            parsed = datetime.strptime(value, DEFAULT_TIME_FORMAT)
+            hour, minute = parsed.hour, parsed.minute
+    except ValueError:
+        return None
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour, minute
+    return None
+
+def parse_datetime(date_value, time_value):
+    """Combines stored date and time text into a datetime, or None if either is invalid."""
+    day = parse_date(date_value)
+    hour_minute = parse_time(time_value)
+    if day is None or hour_minute is None:
+        return None
+    return datetime(day.year, day.month, day.day, *hour_minute)
+
+def format_date(value):
+    return value.strftime(DEFAULT_DATE_FORMAT)
+
+def format_time(value):
+    return f"{value.hour:02d}:{value.minute:02d}"
+
+def to_ordinal(value):
+    """date (or "YYYY-MM-DD" text) -> date.toordinal(), or None."""
+    if isinstance(value, str):
+        value = parse_date(value)
+    return value.toordinal() if value is not None else None
+
+def from_ordinal(ordinal):
+    return date.fromordinal(ordinal)
+
+def to_epoch(value):
+    """Naive datetime -> whole seconds since 1970-01-01."""
+    return (value - EPOCH) // timedelta(seconds=1)
+
+def from_epoch(seconds):
+    return EPOCH + timedelta(seconds=seconds)
+
+def cache_info():
+    """Hit/miss counts for the date and time caches, for tuning DATE_CODEC_CACHE_SIZE."""
+    return {"dates": parse_date.cache_info(), "times": parse_time.cache_info()}
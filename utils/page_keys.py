@@ -0,0 +1,32 @@
+"""Keyset page keys: the sort columns of the last item on a page, passed back as after_key.
+
+They are pure functions of an item, kept out of the DAO modules (which open
+the database on import) so a terminal on a clinic server computes them itself
+instead of asking the server.
+"""
+
+
+def patient_key(patient) -> tuple:
+    return (patient.name, patient.id)
+
+
+def doctor_key(doctor) -> tuple:
+    return (doctor.name, doctor.id)
+
+
+def appointment_key(appointment) -> tuple:
+    return (appointment.date, appointment.time, appointment.id)
+
+
+def appointment_row_key(row) -> tuple:
+    # (id, patient, doctor, date, time, reason, status)
+    return (row[3], row[4], row[0])
+
+
+def billing_key(billing) -> tuple:
+    return (billing.date, billing.id)
+
+
+def billing_row_key(row) -> tuple:
+    # (id, patient, appointment, amount, date, status, services)
+    return (row[4], row[0])
@@ -0,0 +1,146 @@
+"""Profiling for `app.py --profile`: timed handler spans and a Tk event-loop watchdog.
+
+UIProfiler wraps page handlers so every call is timed and run under cProfile.
+Only the Tk thread is profiled, which is the time the window cannot repaint;
+queries on the background workers show up in the query log instead.
+
+LatencyWatchdog schedules an after() tick every few milliseconds and records
+how late each one fires. A helper thread watches for ticks that stop
+altogether, and when the UI has been blocked for longer than UI_STALL_MS it
+logs a stack sample of the Tk thread while the stall is still in progress.
+"""
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+from config import UI_STALL_MS, UI_WATCHDOG_INTERVAL_MS
+from utils.query_monitor import get_logger
+
+
+class UIProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.spans = {}  # name -> [calls, total_ms, max_ms]
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name):
+        """Times the block; the outermost open span also turns cProfile on."""
+        outermost = self._depth == 0
+        self._depth += 1
+        if outermost:
+            self.profile.enable()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ms = (time.perf_counter() - started) * 1000
+            self._depth -= 1
+            if outermost:
+                self.profile.disable()
+            span = self.spans.setdefault(name, [0, 0.0, 0.0])
+            span[0] += 1
+            span[1] += ms
+            span[2] = max(span[2], ms)
+
+    def wrap(self, cls, method_names):
+        """Replaces each named method on `cls` with one that runs inside a span.
+
+        Must run before instances bind the methods as widget commands.
+        """
+        for name in method_names:
+            method = getattr(cls, name, None)
+            if method is None or getattr(method, "__profiled__", False):
+                continue
+            setattr(cls, name, self._spanned(f"{cls.__name__}.{name}", method))
+
+    def _spanned(self, span_name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.span(span_name):
+                return method(*args, **kwargs)
+        wrapper.__profiled__ = True
+        return wrapper
+
+    def report(self, top=25) -> str:
+        lines = ["[PROFILE] Handler spans on the Tk thread:"]
+        for name, (calls, total, worst) in sorted(self.spans.items(), key=lambda item: item[1][1], reverse=True):
+            lines.append(f"  {name:<45} {calls:5d} calls {total:9.1f} ms total {worst:8.1f} ms max")
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        lines.append(out.getvalue())
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Writes the raw cProfile data, for snakeviz or `python -m pstats`."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.profile.dump_stats(path)
+
+
+class LatencyWatchdog:
+    def __init__(self, root, stall_ms=UI_STALL_MS, interval_ms=UI_WATCHDOG_INTERVAL_MS):
+        self.root = root
+        self.stall_ms = stall_ms
+        self.interval_ms = interval_ms
+        self.ticks = 0
+        self.late_ticks = 0   # ticks that fired more than stall_ms late
+        self.max_lateness_ms = 0.0
+        self.total_lateness_ms = 0.0
+        self.stalls = 0
+
+        self._main_thread = threading.main_thread().ident
+        self._last_tick = time.perf_counter()
+        self._sampled = False  # a stack has already been logged for the current stall
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self.root.after(self.interval_ms, self._tick)
+        self._thread = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _tick(self):
+        now = time.perf_counter()
+        lateness = max(0.0, (now - self._expected) * 1000)
+        self.ticks += 1
+        self.total_lateness_ms += lateness
+        if lateness > self.max_lateness_ms:
+            self.max_lateness_ms = lateness
+        if lateness > self.stall_ms:
+            self.late_ticks += 1
+            get_logger("clinic.ui").warning("[UI STALL] event loop blocked for %.0f ms", lateness)
+        self._last_tick = now
+        self._sampled = False
+        if not self._stop.is_set():
+            self._expected = now + self.interval_ms / 1000
+            self.root.after(self.interval_ms, self._tick)
+
+    def _watch(self):
+        # Checks several times per stall window so the sample lands inside the stall
+        period = self.stall_ms / 4000
+        while not self._stop.wait(period):
+            blocked_ms = (time.perf_counter() - self._last_tick) * 1000 - self.interval_ms
+            if blocked_ms > self.stall_ms and not self._sampled:
+                self._sampled = True
+                self.stalls += 1
+                frame = sys._current_frames().get(self._main_thread)
+                stack = "".join(traceback.format_stack(frame)) if frame is not None else "(no frame)\n"
+                get_logger("clinic.ui").warning(
+                    "[UI STALL] Tk thread blocked for %.0f ms so far, stack sample:\n%s", blocked_ms, stack)
+
+    def report(self) -> str:
+        mean = self.total_lateness_ms / self.ticks if self.ticks else 0.0
+        return (f"[WATCHDOG] {self.ticks} ticks, mean lateness {mean:.1f} ms, max {self.max_lateness_ms:.0f} ms, "
+                f"{self.late_ticks} late by more than {self.stall_ms} ms, {self.stalls} stack samples")
@@ -0,0 +1,196 @@
+"""Per-statement timing for Database, the slow-query log and per-action query counts.
+
+Every statement run through Database is recorded against the DAO or service
+method that issued it (duration, calls, rows). Statements slower than
+SLOW_QUERY_MS are written to config.LOG_FILE together with their EXPLAIN QUERY
+PLAN. A UI action opened with QueryMonitor.action() counts the queries issued
+on its behalf, including ones run by background tasks it started, and is
+logged as a likely N+1 pattern when it goes over ACTION_QUERY_BUDGET.
+"""
+import contextvars
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from config import ACTION_QUERY_BUDGET, LOG_FILE, SLOW_QUERY_MS
+
+logger = logging.getLogger("clinic")
+
+# Frames from these modules are plumbing, not the code that asked for the query
+_SKIP_MODULES = ("database", "contextlib", __name__)
+
+_current_action = contextvars.ContextVar("query_action", default=None)
+_logging_ready = False
+_logging_lock = threading.Lock()
+
+
+def get_logger(name="clinic.db"):
+    """Returns a logger under "clinic", attaching the LOG_FILE handler on first use."""
+    global _logging_ready
+    if not _logging_ready:
+        with _logging_lock:
+            if not _logging_ready:
+                try:
+                    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+                    handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+                except OSError as e:
+                    print(f"[LOG ERROR] Could not open {LOG_FILE}: {e}")
+                    handler = logging.StreamHandler()
+                handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+                logger.addHandler(handler)
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                _logging_ready = True
+    return logging.getLogger(name)
+
+
+def calling_method():
+    """Returns the qualified name of the first function outside the database plumbing."""
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_globals.get("__name__") in _SKIP_MODULES:
+        frame = frame.f_back
+    return frame.f_code.co_qualname if frame is not None else "?"
+
+
+def compact_sql(query):
+    return " ".join(query.split())
+
+
+class QueryStats:
+    __slots__ = ("calls", "total_ms", "max_ms", "rows")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+
+class QueryAction:
+    """Query count for one UI action, reported once the action and all its background tasks finish."""
+
+    def __init__(self, name, budget):
+        self.name = name
+        self.budget = budget
+        self.count = 0
+        self.statements = Counter()  # (caller, sql) -> times issued
+        self.started = time.perf_counter()
+        self._open = 1  # the with-block itself, plus one per background task still running
+        self._lock = threading.Lock()
+
+    def add(self, caller, query):
+        with self._lock:
+            self.count += 1
+            self.statements[(caller, query)] += 1
+
+    def hold(self):
+        with self._lock:
+            self._open += 1
+
+    def release(self):
+        with self._lock:
+            self._open -= 1
+            finished = self._open == 0
+        if finished and self.count > self.budget:
+            (caller, query), repeats = self.statements.most_common(1)[0]
+            elapsed = (time.perf_counter() - self.started) * 1000
+            get_logger().warning(
+                "[N+1] %s issued %d queries (budget %d) in %.0f ms; most repeated: %dx from %s: %s",
+                self.name, self.count, self.budget, elapsed, repeats, caller, compact_sql(query),
+            )
+
+
+class QueryMonitor:
+    def __init__(self, slow_ms=SLOW_QUERY_MS, action_budget=ACTION_QUERY_BUDGET):
+        self.slow_ms = slow_ms
+        self.action_budget = action_budget
+        self._stats = {}  # (caller, sql) -> QueryStats
+        self._lock = threading.Lock()
+
+    def record(self, conn, query, params, seconds, rows, caller=None):
+        """Called by Database after every statement. `params` is None for executemany batches."""
+        ms = seconds * 1000
+        caller = caller or calling_method()
+        key = (caller, query)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = QueryStats()
+            stats.calls += 1
+            stats.total_ms += ms
+            stats.rows += rows
+            if ms > stats.max_ms:
+                stats.max_ms = ms
+
+        action = _current_action.get()
+        if action is not None:
+            action.add(caller, query)
+        if ms >= self.slow_ms:
+            self._log_slow(conn, query, params, ms, rows, caller)
+
+    def _log_slow(self, conn, query, params, ms, rows, caller):
+        plan = ""
+        if params is not None:
+            try:
+                steps = conn.execute("EXPLAIN QUERY PLAN " + query, params).fetchall()
+                plan = "\n".join(f"    {detail}" for _, _, _, detail in steps)
+            except sqlite3.Error as e:
+                plan = f"    (no plan: {e})"
+        get_logger().warning("[SLOW QUERY] %.1f ms, %d rows, from %s: %s\n%s",
+                             ms, rows, caller, compact_sql(query), plan)
+
+    def log_error(self, error, query=None):
+        """Prints a database error and writes it, with its caller, to the log file."""
+        print(f"[DB ERROR] {error}")
+        get_logger().error("[DB ERROR] %s from %s: %s", error, calling_method(), compact_sql(query or ""))
+
+    @contextmanager
+    def action(self, name, budget=None):
+        """Counts the queries issued while the block runs, and by background tasks it submits."""
+        action = QueryAction(name, self.action_budget if budget is None else budget)
+        token = _current_action.set(action)
+        try:
+            yield action
+        finally:
+            _current_action.reset(token)
+            action.release()
+
+    @staticmethod
+    def hold_current_action():
+        """Keeps the current action open until release() is called; returns it, or None."""
+        action = _current_action.get()
+        if action is not None:
+            action.hold()
+        return action
+
+    def stats(self) -> list[dict]:
+        """Per-statement totals, slowest overall first."""
+        with self._lock:
+            items = [(key, stats.calls, stats.total_ms, stats.max_ms, stats.rows)
+                     for key, stats in self._stats.items()]
+        items.sort(key=lambda item: item[2], reverse=True)
+        return [
+            {"caller": caller, "query": compact_sql(query), "calls": calls,
+             "total_ms": round(total, 3), "mean_ms": round(total / calls, 3),
+             "max_ms": round(worst, 3), "rows": rows}
+            for (caller, query), calls, total, worst, rows in items
+        ]
+
+    def report(self, limit=15) -> str:
+        lines = ["[QUERIES] Most expensive statements this session:"]
+        for entry in self.stats()[:limit]:
+            lines.append(f"  {entry['total_ms']:9.1f} ms total {entry['calls']:6d} calls "
+                         f"{entry['max_ms']:8.1f} ms max  {entry['caller']}")
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_monitor = QueryMonitor()
@@ -0,0 +1,29 @@
+import time
+
+from config import STARTUP_BUDGET_MS
+
+class StartupTimer:
+    """Records named checkpoints during startup and reports time spent in each phase."""
+
+    def __init__(self, budget_ms=STARTUP_BUDGET_MS, start=None):
+        self.budget_ms = budget_ms
+        self.start = start if start is not None else time.perf_counter()
+        self.marks = []
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def total_ms(self):
+        end = self.marks[-1][1] if self.marks else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def report(self) -> str:
+        lines = ["[STARTUP] Cold-start timing:"]
+        previous = self.start
+        for label, at in self.marks:
+            lines.append(f"  {label:<28} {(at - previous) * 1000:8.1f} ms")
+            previous = at
+        total = self.total_ms()
+        status = "within" if total <= self.budget_ms else "OVER"
+        lines.append(f"  {'total':<28} {total:8.1f} ms ({status} budget of {self.budget_ms} ms)")
+        return "\n".join(lines)